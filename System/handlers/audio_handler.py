@@ -2,11 +2,14 @@
 # This code is for educational use only.
 # Do not reuse, copy, modify, or redistribute.
 
-import sounddevice as sd
 import wave
 import tempfile
 import os
-from tkinter import Tk, filedialog
+import numpy as np
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("audio")
 
 class AudioHandler:
     """
@@ -17,6 +20,7 @@ class AudioHandler:
     - Record audio using the system's microphone.
     - Delete a specified audio file.
     - Open a file dialog to select an audio file.
+    - Split long audio at silences into overlapping chunks for parallel decoding.
 
     Methods:
         audio_record(duration: int = 5, sample_rate: int = 16000) -> str:
@@ -25,6 +29,8 @@ class AudioHandler:
             Deletes the specified audio file if it exists.
         audio_select() -> str:
             Opens a file dialog to select an audio file and returns the file path.
+        audio_chunks(audio, sample_rate=16000, chunk_seconds=30.0, overlap_seconds=2.0, search_seconds=5.0) -> list:
+            Splits audio at its quietest points into overlapping chunks.
     """
     @staticmethod
     def audio_record(duration: int = 10, sample_rate: int = 16000) -> str:
@@ -38,7 +44,9 @@ class AudioHandler:
         Returns:
             str: Path to the saved audio file.
         """
-        print(f"Recording {duration} seconds of audio...")
+        import sounddevice as sd  # Imported on first recording, so sessions without a microphone start faster
+
+        logger.info("Recording %s seconds of audio...", duration)
         audio_data = sd.rec(int(duration * sample_rate), samplerate=sample_rate, channels=1, dtype='int16')
         sd.wait()
 
@@ -49,7 +57,7 @@ class AudioHandler:
             wf.setframerate(sample_rate)
             wf.writeframes(audio_data.tobytes())
 
-        print(f"Audio recorded...")
+        logger.info("Audio recorded...")
         return temp_file.name
 
     @staticmethod
@@ -71,6 +79,8 @@ class AudioHandler:
         Returns:
             str: Path to the selected audio file or an error message if no file is selected.
         """
+        from tkinter import Tk, filedialog
+
         root = Tk()
         root.withdraw()
         root.attributes('-topmost', True)
@@ -81,3 +91,47 @@ class AudioHandler:
             return audio_path
         else:
             return "Error: No file selected or this files doesnt exist"
+
+    @staticmethod
+    def audio_chunks(audio, sample_rate: int = 16000, chunk_seconds: float = 30.0, overlap_seconds: float = 2.0,
+                     search_seconds: float = 5.0, frame_seconds: float = 0.02) -> list:
+        """
+        Splits audio into chunks of at most chunk_seconds that overlap around their cut points.
+
+        Every cut is placed in the quietest frame (lowest RMS energy) of the last search_seconds a chunk can reach, so
+        cuts fall into pauses between words whenever there are any. Consecutive chunks share overlap_seconds of audio
+        centered on the cut, so a word cut in half by a chunk border is still complete in one of them.
+
+        Args:
+            audio (numpy.ndarray): Mono samples.
+            sample_rate (int): Sample rate of the audio.
+            chunk_seconds (float): Maximum length of a chunk.
+            overlap_seconds (float): Length of the audio shared by consecutive chunks.
+            search_seconds (float): Length of the window searched for the quietest frame before each chunk end.
+            frame_seconds (float): Length of the frames the energy is measured on.
+
+        Returns:
+            list of tuple: (start, end, cut) sample positions of every chunk, where cut is the cut point shared with the
+            next chunk (the end of the audio for the last chunk).
+        """
+        total = len(audio)
+        chunk = int(chunk_seconds * sample_rate)
+        half_overlap = int(overlap_seconds * sample_rate) // 2
+        frame = max(1, int(frame_seconds * sample_rate))
+        if total <= chunk:
+            return [(0, total, total)]
+
+        frames = total // frame
+        energy = np.sqrt(np.mean(np.square(audio[:frames * frame].reshape(frames, frame), dtype=np.float64), axis=1))
+
+        chunks, start = [], 0
+        while total - start > chunk:
+            latest = start + chunk - half_overlap  # A cut after this would make the chunk too long
+            first_frame = max(start + 2 * half_overlap + frame, latest - int(search_seconds * sample_rate)) // frame
+            last_frame = max(first_frame + 1, latest // frame)
+            cut = (first_frame + int(np.argmin(energy[first_frame:last_frame]))) * frame + frame // 2
+            cut = min(cut, latest)
+            chunks.append((start, cut + half_overlap, cut))
+            start = cut - half_overlap
+        chunks.append((start, total, total))
+        return chunks
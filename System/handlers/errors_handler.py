@@ -2,8 +2,13 @@
 # This code is for educational use only.
 # Do not reuse, copy, modify, or redistribute.
 
+import numpy as np
 from collections import Counter, defaultdict
 
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("errors")
+
 class ErrorsHandler:
     """
     A utility class for analyzing and handling character-level errors in text.
@@ -13,54 +18,271 @@ class ErrorsHandler:
     - Generate substitution rules based on the frequency of character-level errors.
 
     Methods:
-        errors_analyze(incorrect_words, correct_words) -> dict:
-            Analyzes character-level mismatches and creates a frequency map of substitutions.
-        errors_rules_generate(errors, threshold=0.7) -> dict:
+        errors_align(incorrect_words, correct_words) -> tuple:
+            Computes the optimal edit scripts of a batch of word pairs with NumPy.
+        errors_align_batch(pairs) -> tuple:
+            Computes the edit scripts of one length-homogeneous batch of word pairs.
+        errors_analyze(incorrect_words, correct_words, max_gram=3) -> dict:
+            Analyzes character-level substitutions, insertions, deletions and multi-character confusions and creates
+            a frequency map of them.
+        errors_ngrams(pair_ops, positions, correct_ops, incorrect_ops, max_gram) -> list:
+            Extracts multi-character confusions from edit scripts.
+        errors_merge(total, errors) -> dict:
+            Adds the counts of one error analysis to accumulated counts.
+        errors_rules_generate(errors, threshold=0.7, min_count=2) -> dict:
             Generates substitution rules based on the frequency of errors, applying a minimum threshold.
     """
     @staticmethod
-    def errors_analyze(incorrect_words, correct_words):
+    def errors_align(incorrect_words, correct_words, max_cells=16_000_000, max_batch=4096):
+        """
+        Computes the optimal (Levenshtein) edit script of every (incorrect, correct) word pair.
+
+        Pairs are sorted by length and processed in batches. For each batch the whole dynamic-programming table is
+        filled with NumPy, one row at a time: substitutions and deletions are vectorized over the row, and chains of
+        insertions are resolved with a cumulative minimum. The backtrace is vectorized over the batch as well.
+
+        Args:
+            incorrect_words (list of str): A list of misspelled words.
+            correct_words (list of str): A list of corresponding correctly spelled words.
+            max_cells (int): Upper bound on the size of the table of one batch.
+            max_batch (int): Upper bound on the number of pairs in one batch.
+
+        Returns:
+            tuple: Four int arrays (pairs, positions, correct_codes, incorrect_codes) with one entry per edit
+            operation, matches included. pairs numbers the aligned pairs, positions orders the operations of a pair
+            from the end of the words (higher values come first). Code points are used for characters and -1 marks
+            the missing side of an insertion or deletion.
+        """
+        pairs = [(i, c) for i, c in zip(incorrect_words, correct_words)
+                 if isinstance(i, str) and isinstance(c, str) and i != c]
+        if not pairs:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty, empty
+
+        lengths = np.array([max(len(i), len(c)) for i, c in pairs])
+        order = np.argsort(lengths, kind="stable")
+
+        results = []
+        start = 0
+        while start < len(order):
+            size = max_batch
+            while size > 1 and lengths[order[min(start + size, len(order)) - 1]] ** 2 * size > max_cells:
+                size //= 2
+            batch = [pairs[k] for k in order[start:start + size]]
+
+            pair_ops, positions, c_ops, i_ops = ErrorsHandler.errors_align_batch(batch)
+            results.append((pair_ops + start, positions, c_ops, i_ops))
+            start += size
+
+        return tuple(np.concatenate(column) for column in zip(*results))
+
+    @staticmethod
+    def errors_align_batch(pairs):
+        """
+        Computes the edit scripts of one batch of (incorrect, correct) word pairs.
+
+        Args:
+            pairs (list of tuple): (incorrect, correct) word pairs.
+
+        Returns:
+            tuple: Four int arrays (pairs, positions, correct_codes, incorrect_codes) of the edit operations, with
+            pairs numbered within the batch.
+        """
+        batch = len(pairs)
+        i_lengths = np.array([len(i) for i, _ in pairs])
+        c_lengths = np.array([len(c) for _, c in pairs])
+        rows, cols = int(i_lengths.max()), int(c_lengths.max())
+
+        # Padding values differ between the two sides, so padding never counts as a match
+        incorrect = np.full((batch, rows + 1), -2, dtype=np.int64)
+        correct = np.full((batch, cols + 1), -3, dtype=np.int64)
+        for b, (i_word, c_word) in enumerate(pairs):
+            incorrect[b, :len(i_word)] = [ord(ch) for ch in i_word]
+            correct[b, :len(c_word)] = [ord(ch) for ch in c_word]
+
+        # distance[b, i, j]: edit distance between incorrect[b, :i] and correct[b, :j]
+        steps = np.arange(cols + 1, dtype=np.int32)
+        distance = np.empty((batch, rows + 1, cols + 1), dtype=np.int32)
+        distance[:, 0, :] = steps
+        for i in range(1, rows + 1):
+            previous = distance[:, i - 1, :]
+            row = np.empty((batch, cols + 1), dtype=np.int32)
+            row[:, 0] = i
+            row[:, 1:] = np.minimum(
+                previous[:, :-1] + (incorrect[:, i - 1:i] != correct[:, :cols]),
+                previous[:, 1:] + 1,
+            )
+            distance[:, i, :] = np.minimum.accumulate(row - steps, axis=1) + steps
+
+        # Walk back from the bottom-right corner of every table at once
+        index = np.arange(batch)
+        i, j = i_lengths.copy(), c_lengths.copy()
+        pair_ops, positions, correct_ops, incorrect_ops = [], [], [], []
+        step = 0
+        while True:
+            active = (i > 0) | (j > 0)
+            if not active.any():
+                break
+            ii, jj = np.maximum(i - 1, 0), np.maximum(j - 1, 0)
+            current = distance[index, i, j]
+            mismatch = incorrect[index, ii] != correct[index, jj]
+
+            diagonal = active & (i > 0) & (j > 0) & (distance[index, ii, jj] + mismatch == current)
+            extra = active & ~diagonal & (i > 0) & (distance[index, ii, j] + 1 == current)
+            missing = active & ~diagonal & ~extra
+
+            pair_ops.append(index[active])
+            positions.append(np.full(active.sum(), step, dtype=np.int64))
+            correct_ops.append(np.where(diagonal | missing, correct[index, jj], -1)[active])
+            incorrect_ops.append(np.where(diagonal | extra, incorrect[index, ii], -1)[active])
+
+            i = i - (diagonal | extra)
+            j = j - (diagonal | missing)
+            step += 1
+
+        return (np.concatenate(pair_ops), np.concatenate(positions),
+                np.concatenate(correct_ops), np.concatenate(incorrect_ops))
+
+    @staticmethod
+    def errors_analyze(incorrect_words, correct_words, max_gram=3):
         """
         Analyzes character-level errors between incorrect and correct word pairs.
 
+        Characters are aligned with the optimal edit script of each pair, so an inserted or missing letter is counted
+        once instead of shifting every following position. Missing letters are counted under the incorrect character
+        "" and extra letters under the correct character "".
+
+        Consecutive edits of up to max_gram operations are also counted as multi-character confusions (e.g. "f" for
+        "ph"). Pure insertions and deletions are extended by one neighbouring character, so doubled letters become
+        confusions such as "l" for "ll".
+
         Args:
             incorrect_words (list of str): A list of misspelled words.
             correct_words (list of str): A list of corresponding correctly spelled words.
+            max_gram (int): Maximum number of consecutive edit operations counted as one confusion.
 
         Returns:
-            errors: A dictionary where keys are correct characters, and values are counters of incorrect characters.
+            errors: A dictionary where keys are correct characters or character sequences, and values are counters of
+            incorrect characters or character sequences.
         """
-        print("Started analysis of character-level errors...")
+        logger.info("Started analysis of character-level errors...")
         errors = defaultdict(Counter)
-        for incorrect, correct in zip(incorrect_words, correct_words):
-            for i in range(min(len(incorrect), len(correct))):
-                i_char = incorrect[i]
-                c_char = correct[i]
-                if i_char != c_char:
-                    errors[c_char][i_char] += 1
-        print("Error analysis completed...")
+        pair_ops, positions, correct_ops, incorrect_ops = ErrorsHandler.errors_align(incorrect_words, correct_words)
+
+        edits = correct_ops != incorrect_ops
+        if edits.any():
+            ops, counts = np.unique(np.stack([correct_ops[edits], incorrect_ops[edits]], axis=1),
+                                    axis=0, return_counts=True)
+            for (c_code, i_code), count in zip(ops.tolist(), counts.tolist()):
+                c_char = chr(c_code) if c_code >= 0 else ""
+                i_char = chr(i_code) if i_code >= 0 else ""
+                errors[c_char][i_char] += count
+
+        if edits.any() and max_gram > 1:
+            for c_gram, i_gram in ErrorsHandler.errors_ngrams(pair_ops, positions, correct_ops, incorrect_ops, max_gram):
+                errors[c_gram][i_gram] += 1
+
+        logger.info("Error analysis completed...")
         return errors
 
     @staticmethod
-    def errors_rules_generate(errors, threshold=0.7):
+    def errors_ngrams(pair_ops, positions, correct_ops, incorrect_ops, max_gram):
+        """
+        Extracts multi-character confusions from edit scripts. Runs of consecutive edits are found with NumPy; only
+        the runs themselves are turned into strings.
+
+        Args:
+            pair_ops (numpy.ndarray): Pair number of every operation, as returned by errors_align.
+            positions (numpy.ndarray): Position of every operation, counted from the end of the words.
+            correct_ops (numpy.ndarray): Correct code point of every operation, or -1.
+            incorrect_ops (numpy.ndarray): Incorrect code point of every operation, or -1.
+            max_gram (int): Maximum number of operations in a run.
+
+        Returns:
+            list of tuple: (correct, incorrect) character sequences of every run that is not a single substitution.
+        """
+        # Put the operations in reading order: by pair, then from the start of the words
+        order = np.lexsort((-positions, pair_ops))
+        pairs, c_codes, i_codes = pair_ops[order], correct_ops[order], incorrect_ops[order]
+        edits = c_codes != i_codes
+
+        same_pair = np.concatenate([[False], pairs[1:] == pairs[:-1]])
+        starts = np.flatnonzero(edits & ~(np.concatenate([[False], edits[:-1]]) & same_pair))
+        ends = np.flatnonzero(edits & ~(np.concatenate([edits[1:], [False]]) & np.concatenate([same_pair[1:], [False]])))
+
+        ngrams = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if end - start + 1 > max_gram:
+                continue
+            c_gram = "".join(chr(code) for code in c_codes[start:end + 1] if code >= 0)
+            i_gram = "".join(chr(code) for code in i_codes[start:end + 1] if code >= 0)
+
+            if not c_gram or not i_gram:
+                # Anchor a pure insertion or deletion on the matching character before it, or else after it
+                if start > 0 and same_pair[start]:
+                    neighbour = chr(c_codes[start - 1])
+                    c_gram, i_gram = neighbour + c_gram, neighbour + i_gram
+                elif end + 1 < len(pairs) and same_pair[end + 1]:
+                    neighbour = chr(c_codes[end + 1])
+                    c_gram, i_gram = c_gram + neighbour, i_gram + neighbour
+                else:
+                    continue
+
+            if len(c_gram) > 1 or len(i_gram) > 1:
+                ngrams.append((c_gram, i_gram))
+        return ngrams
+
+    @staticmethod
+    def errors_merge(total, errors):
+        """
+        Adds character-level error counts to accumulated counts, so statistics can be kept up to date incrementally
+        instead of re-analyzing the whole error log.
+
+        Args:
+            total (dict): Accumulated counts, correct characters mapped to counters of incorrect characters.
+            errors (dict): Counts of the same shape to add.
+
+        Returns:
+            total: The updated accumulated counts.
+        """
+        for correct_letter, incorrect_counts in errors.items():
+            if correct_letter not in total:
+                total[correct_letter] = Counter()
+            total[correct_letter].update(incorrect_counts)
+        return total
+
+    @staticmethod
+    def errors_rules_generate(errors, threshold=0.7, min_count=2):
         """
         Generates substitution rules based on character-level error analysis.
 
+        Rules map an incorrect character or character sequence to its correction. Multi-character rules are only
+        generated from confusions seen at least min_count times, so one-off typos do not become rules. When several
+        corrections qualify for the same incorrect sequence, the most frequent one wins, and on a tie the longer one,
+        which carries more context (e.g. "f" -> "ph" over "f" -> "h").
+
         Args:
             errors (dict): A dictionary of character substitution frequencies.
             threshold (float): The minimum frequency threshold for generating a substitution rule.
+            min_count (int): The minimum number of occurrences of a multi-character confusion.
 
         Returns:
-            rules: A dictionary of substitution rules where keys are incorrect characters,
+            rules: A dictionary of substitution rules where keys are incorrect characters or character sequences,
                   and values are their corrected counterparts.
         """
-        print(f"Creating Replacement Rules with a Threshold: {threshold}")
-        rules = {}
+        logger.info("Creating Replacement Rules with a Threshold: %s", threshold)
+        rules, scores = {}, {}
         for correct_letter, incorrect_counts in errors.items():
             total_errors = sum(incorrect_counts.values())
             for incorrect_letter, count in incorrect_counts.items():
+                if not correct_letter or not incorrect_letter:
+                    continue  # Insertions and deletions are covered by the anchored multi-character confusions
+                if (len(correct_letter) > 1 or len(incorrect_letter) > 1) and count < min_count:
+                    continue
                 weight = count / total_errors
-                if weight > threshold:
+                score = (count, len(correct_letter))
+                if weight > threshold and score > scores.get(incorrect_letter, (0, 0)):
                     rules[incorrect_letter] = correct_letter
-        print(f"Substitution rules successfully created... Number of rules: {len(rules)}")
+                    scores[incorrect_letter] = score
+        logger.info("Substitution rules successfully created... Number of rules: %d", len(rules))
         return rules
@@ -0,0 +1,259 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import csv
+import math
+import os
+import shutil
+import struct
+import threading
+import time
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("errors_log")
+
+class ErrorsLogHandler:
+    """
+    An append-only binary log of (incorrect, correct) word pairs.
+
+    The file starts with a 5-byte header (b"SAEL" followed by the format version). Each record is a little-endian pair
+    of unsigned 16-bit byte lengths followed by the UTF-8 encoded incorrect and correct words. Records are only ever
+    appended, so a writer never rewrites existing data and a reader can stream the log in fixed-size chunks. A record
+    cut short by a crash is ignored by the reader.
+
+    A handler instance is a buffered writer for one log file: records are collected in the file buffer and flushed
+    and fsync'ed to disk every sync_records records or sync_seconds seconds, whichever comes first. A timer started by
+    the first unsynced append syncs the records after sync_seconds even if nothing else is appended, so the last
+    records of a burst don't wait for the next utterance.
+
+    Attributes:
+        file_path (str): Path to the log file.
+        sync_records (int): Number of appended records after which the log is synced.
+        sync_seconds (float): Time after which pending records are synced.
+
+    Methods:
+        errors_log_init(file_path):
+            Creates an empty log file with a header if it does not exist.
+        errors_log_append(rows) -> int:
+            Appends (incorrect, correct) pairs to the log.
+        errors_log_encode(text) -> bytes:
+            Encodes a word as UTF-8, truncated to the longest record field at a character boundary.
+        errors_log_flush(sync=True):
+            Writes buffered records to the file and optionally fsyncs it.
+        errors_log_close():
+            Flushes, syncs and closes the log.
+        errors_log_read(file_path, chunk_bytes=1048576) -> generator:
+            Streams the log as (incorrect, correct) list chunks in bounded memory.
+        errors_log_scan(file_path, start=0, chunk_bytes=1048576) -> generator:
+            Streams the log from a byte offset, with the offset reached after every chunk.
+        errors_log_migrate(csv_path, file_path) -> int:
+            Appends the rows of a legacy CSV error file to the log, replacing the file atomically.
+    """
+    magic = b"SAEL"
+    version = 1
+    header = magic + bytes([version])
+    record = struct.Struct("<HH")
+
+    def __init__(self, file_path: str, sync_records: int = 64, sync_seconds: float = 5.0):
+        """
+        Opens the log for appending.
+
+        Args:
+            file_path (str): Path to the log file. It is created if it does not exist.
+            sync_records (int): Number of appended records after which the log is synced.
+            sync_seconds (float): Time after which pending records are synced.
+        """
+        ErrorsLogHandler.errors_log_init(file_path)
+        self.file_path = file_path
+        self.sync_records = sync_records
+        self.sync_seconds = sync_seconds
+        self.file = open(file_path, 'ab', buffering=64 * 1024)
+        self.pending = 0
+        self.last_sync = time.monotonic()
+        self.lock = threading.RLock()
+        self.timer = None
+
+    @staticmethod
+    def errors_log_init(file_path: str):
+        """
+        Creates an empty log file with a header if it does not exist.
+
+        Args:
+            file_path (str): Path to the log file.
+        """
+        if not os.path.exists(file_path):
+            with open(file_path, 'wb') as f:
+                f.write(ErrorsLogHandler.header)
+
+    def errors_log_append(self, rows) -> int:
+        """
+        Appends (incorrect, correct) word pairs to the log.
+
+        Args:
+            rows (iterable of tuple): (incorrect, correct) word pairs.
+
+        Returns:
+            int: Number of appended records.
+        """
+        count = 0
+        with self.lock:
+            for incorrect, correct in rows:
+                incorrect_bytes = ErrorsLogHandler.errors_log_encode(incorrect)
+                correct_bytes = ErrorsLogHandler.errors_log_encode(correct)
+                self.file.write(ErrorsLogHandler.record.pack(len(incorrect_bytes), len(correct_bytes)))
+                self.file.write(incorrect_bytes)
+                self.file.write(correct_bytes)
+                count += 1
+
+            self.pending += count
+            if self.pending >= self.sync_records or time.monotonic() - self.last_sync >= self.sync_seconds:
+                self.errors_log_flush()
+            elif self.pending and self.timer is None and math.isfinite(self.sync_seconds):
+                self.timer = threading.Timer(self.sync_seconds, self.errors_log_flush)
+                self.timer.daemon = True
+                self.timer.start()
+        return count
+
+    @staticmethod
+    def errors_log_encode(text) -> bytes:
+        """
+        Encodes a word as UTF-8 for a record. A word longer than a record field (0xFFFF bytes) is truncated at a
+        character boundary, so the log never holds a broken multibyte character.
+
+        Args:
+            text (str): The word.
+
+        Returns:
+            bytes: The encoded word.
+        """
+        encoded = str(text).encode('utf-8')
+        if len(encoded) > 0xFFFF:
+            encoded = encoded[:0xFFFF].decode('utf-8', 'ignore').encode('utf-8')
+        return encoded
+
+    def errors_log_flush(self, sync: bool = True):
+        """
+        Writes buffered records to the file. Also called by the sync timer.
+
+        Args:
+            sync (bool): Whether to also fsync the file so that the records survive a crash.
+        """
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.flush()
+            if sync and self.pending:
+                os.fsync(self.file.fileno())
+                self.pending = 0
+                self.last_sync = time.monotonic()
+            if not self.pending and self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+
+    def errors_log_close(self):
+        """
+        Flushes, syncs and closes the log.
+        """
+        with self.lock:
+            if not self.file.closed:
+                self.errors_log_flush()
+                self.file.close()
+
+    @staticmethod
+    def errors_log_read(file_path: str, chunk_bytes: int = 1024 * 1024):
+        """
+        Streams the log in chunks. Only about chunk_bytes of the file are held in memory at a time.
+
+        Args:
+            file_path (str): Path to the log file.
+            chunk_bytes (int): Number of bytes read from the file per chunk.
+
+        Yields:
+            tuple: (incorrect, correct) lists of the records completed by each chunk.
+        """
+        for incorrect, correct, _ in ErrorsLogHandler.errors_log_scan(file_path, chunk_bytes=chunk_bytes):
+            yield incorrect, correct
+
+    @staticmethod
+    def errors_log_scan(file_path: str, start: int = 0, chunk_bytes: int = 1024 * 1024):
+        """
+        Streams the log from a byte offset, e.g. the end of the records a reader has already processed.
+
+        Args:
+            file_path (str): Path to the log file.
+            start (int): Offset of the first record to read. The header is skipped if it is 0.
+            chunk_bytes (int): Number of bytes read from the file per chunk.
+
+        Yields:
+            tuple: (incorrect, correct, end), the lists of the records completed by each chunk and the offset right
+            after the last of them.
+        """
+        record = ErrorsLogHandler.record
+        with open(file_path, 'rb') as f:
+            if f.read(len(ErrorsLogHandler.header)) != ErrorsLogHandler.header:
+                raise ValueError(f"'{file_path}' is not an errors log of version {ErrorsLogHandler.version}")
+            offset = max(start, len(ErrorsLogHandler.header))
+            f.seek(offset)
+
+            buffer = b""
+            while True:
+                data = f.read(chunk_bytes)
+                if not data:
+                    break
+                buffer += data
+
+                incorrect, correct = [], []
+                position = 0
+                while position + record.size <= len(buffer):
+                    incorrect_length, correct_length = record.unpack_from(buffer, position)
+                    end = position + record.size + incorrect_length + correct_length
+                    if end > len(buffer):
+                        break
+                    field = position + record.size
+                    incorrect.append(buffer[field:field + incorrect_length].decode('utf-8'))
+                    correct.append(buffer[field + incorrect_length:end].decode('utf-8'))
+                    position = end
+
+                buffer = buffer[position:]
+                offset += position
+                if incorrect:
+                    yield incorrect, correct, offset
+
+        if buffer:
+            logger.warning("Ignoring %d bytes of an incomplete record at the end of %s", len(buffer), file_path)
+
+    @staticmethod
+    def errors_log_migrate(csv_path: str, file_path: str) -> int:
+        """
+        Appends the rows of a legacy CSV error file ("Incorrect", "Correct" columns) to the log. The CSV is read row
+        by row, so its size does not matter. The records are written to a copy of the log that replaces it atomically,
+        so an interrupted migration leaves the log as it was.
+
+        Args:
+            csv_path (str): Path to the legacy CSV file.
+            file_path (str): Path to the log file.
+
+        Returns:
+            int: Number of migrated records.
+        """
+        temp_path = f"{file_path}.{os.getpid()}.tmp"
+        if os.path.exists(file_path):
+            shutil.copyfile(file_path, temp_path)
+        try:
+            writer = ErrorsLogHandler(temp_path, sync_records=1 << 30, sync_seconds=float("inf"))
+            try:
+                with open(csv_path, mode='r', newline='', encoding='utf-8') as file:
+                    reader = csv.reader(file)
+                    next(reader, None)  # Skip the header
+                    count = writer.errors_log_append((row[0], row[1]) for row in reader if len(row) >= 2)
+            finally:
+                writer.errors_log_close()
+            os.replace(temp_path, file_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        logger.info("Migrated %d error records from %s", count, csv_path)
+        return count
@@ -2,10 +2,19 @@
 # This code is for educational use only.
 # Do not reuse, copy, modify, or redistribute.
 
-import csv
+import atexit
+import hashlib
+import json
 import os
-import pickle
-import pandas as pd
+import threading
+from collections import Counter, defaultdict
+
+from System.handlers.log_handler import LogHandler
+from System.handlers.errors_handler import ErrorsHandler
+from System.handlers.errors_log_handler import ErrorsLogHandler
+from System.models.rules_model import RulesModel
+
+logger = LogHandler.log_get("files")
 
 class FileHandler:
     """
@@ -13,30 +22,65 @@ class FileHandler:
 
     This class provides methods for:
     - Creating and managing directories and files for error logs.
-    - Appending data to error log files.
-    - Loading data from CSV files into pandas structures.
-    - Saving and loading models using pickle serialization.
+    - Appending data to append-only binary error logs.
+    - Streaming error logs in bounded memory.
+    - Persisting incrementally updated character confusion counts.
+    - Saving and loading models as versioned rules files.
 
     Methods:
         file_errors_create(language, user_name, user_dir) -> str:
-            Creates a directory and CSV file for error logging if it doesn't exist.
+            Creates a directory and errors log if it doesn't exist, migrating a legacy CSV file.
         file_errors_update(file_path, rows):
-            Appends error data to an existing CSV file.
-        file_errors_load(file_path) -> tuple:
-            Loads data from a CSV file into pandas Series.
+            Appends error data to an errors log through a buffered writer.
+        file_errors_close():
+            Flushes and closes all open errors logs.
+        file_errors_load(file_path) -> generator:
+            Streams data from an errors log as (incorrect, correct) chunks.
+        file_errors_hash(file_path) -> str:
+            Computes the content hash of an errors log.
+        file_errors_discover(user_dir) -> list:
+            Finds the errors logs of every user and language.
+        file_stats_create(language, user_name, user_dir) -> str:
+            Creates the confusion-count store next to the error log if it doesn't exist, counting the existing log.
+        file_stats_update(file_path, errors, records, offset):
+            Atomically saves confusion counts, the number of error records and the log offset they cover.
+        file_stats_read(file_path) -> tuple:
+            Reads confusion counts with the number of records and the log offset they cover.
+        file_stats_load(file_path) -> tuple:
+            Loads confusion counts and the number of error records they cover.
+        file_stats_lock(file_path) -> threading.Lock:
+            Returns the lock serializing the writers of a stats file.
+        file_stats_count(errors_path, errors, records, offset, job=None) -> tuple:
+            Adds the records of an errors log from a byte offset on to confusion counts.
+        file_stats_sync(stats_path, errors_path) -> tuple:
+            Counts the records appended to the errors log since the store was last updated.
+        file_stats_rebuild(errors_path, stats_path, job=None) -> tuple:
+            Recounts the whole errors log and replaces the store.
         file_model_create(language, user_name, user_dir) -> str:
             Creates a directory for model files and returns the path for the model file.
-        file_model_update(file_path, data):
-            Saves data to a file using pickle serialization.
-        file_model_load(file_path) -> object:
-            Loads data from a pickle file.
+        file_lexicon_create(language, user_name, user_dir) -> str:
+            Creates the rules directory and returns the path for the personal vocabulary overlay.
+        file_bigram_create(language, user_dir) -> str:
+            Creates the shared lexicons directory and returns the path for the bigram model of a language.
+        file_wordlist_create(language, user_dir) -> str:
+            Creates the shared lexicons directory and returns the path for the imported word list of a language.
+        file_store_create(user_dir) -> str:
+            Creates the shared cache directory and returns the path for the persistent correction store.
+        file_model_update(file_path, data, errors=None, source_hash=None):
+            Compiles rules and saves them to a versioned rules file.
+        file_model_load(file_path) -> RulesModel:
+            Loads rules from a versioned rules file.
     """
+    errors_writers = {}
+    stats_locks = {}
+    stats_lock = threading.Lock()
+
     @staticmethod
     def file_errors_create(language: str, user_name: str, user_dir: str) -> str:
         """
-        Creates the UserErrorsFiles directory with CSV errors file for each user with logging errors if it does not exist.
+        Creates the UserErrorsFiles directory with an errors log for each user with logging errors if it does not exist.
 
-        If the errors file already exists, it loads the file using file_errors_load.
+        If a legacy CSV errors file exists and the log does not, its rows are migrated into the new log.
 
         Args:
             language (str): Language code (e.g., "en").
@@ -44,66 +88,330 @@ class FileHandler:
             user_dir (str): Directory path for user files.
 
         Returns:
-            str: Path to the created or existing CSV file.
+            str: Path to the created or existing errors log.
         """
         path = os.path.join(user_dir, "UserFiles", user_name, "errors")
         if not os.path.exists(path):
             os.makedirs(path)
 
+        errors_path = os.path.join(path, f"errors_{language}.bin")
         csv_path = os.path.join(path, f"errors_{language}.csv")
 
-        if os.path.exists(csv_path):
-            FileHandler.file_errors_load(csv_path)
-        else:
-            with open(csv_path, mode='w', newline='', encoding='utf-8') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Incorrect", "Correct"])
-            print(f"Errors data created successfully...")
+        if not os.path.exists(errors_path):
+            if os.path.exists(csv_path):
+                ErrorsLogHandler.errors_log_migrate(csv_path, errors_path)
+            else:
+                ErrorsLogHandler.errors_log_init(errors_path)
+                logger.info("Errors data created successfully...")
 
-        return csv_path
+        return errors_path
 
     @staticmethod
     def file_errors_update(file_path: str, rows: list):
         """
-        Appends error rows to a CSV errors file.
+        Appends error rows to an errors log. The log stays open between calls and is synced to disk periodically.
 
         Args:
-            file_path (str): Path to the CSV file.
+            file_path (str): Path to the errors log.
             rows (list): Rows to append.
         """
-        with open(file_path, mode='a', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerows(rows)
+        writer = FileHandler.errors_writers.get(file_path)
+        if writer is None:
+            writer = ErrorsLogHandler(file_path)
+            FileHandler.errors_writers[file_path] = writer
+        writer.errors_log_append(rows)
 
-        print(f"Errors data updated successfully...")
+        logger.debug("Errors data updated successfully...")
 
     @staticmethod
-    def file_errors_load(file_path):
+    def file_errors_close():
         """
-        Loads incorrect and correct data from a CSV file. The CSV file is expected to have at least two columns:
-        'incorrect' and 'correct'. These columns will be returned as separate data structures.
+        Flushes, syncs and closes every errors log opened by file_errors_update.
+        """
+        for writer in FileHandler.errors_writers.values():
+            writer.errors_log_close()
+        FileHandler.errors_writers.clear()
+
+    @staticmethod
+    def file_errors_load(file_path, chunk_bytes: int = 1024 * 1024):
+        """
+        Streams incorrect and correct words from an errors log in chunks, so logs of any size load in bounded memory.
 
         Args:
-            file_path (str): The path to the CSV file containing the data.
+            file_path (str): The path to the errors log.
+            chunk_bytes (int): Number of bytes read from the file per chunk.
+
+        Yields:
+            tuple: Two lists per chunk: (incorrect, correct).
+        """
+        if not os.path.exists(file_path):
+            logger.warning("File not found. Please create it first..")
+            return
+
+        # Records still buffered by a writer of this process must be visible to the reader
+        writer = FileHandler.errors_writers.get(file_path)
+        if writer is not None:
+            writer.errors_log_flush(sync=False)
+
+        records = 0
+        for incorrect, correct in ErrorsLogHandler.errors_log_read(file_path, chunk_bytes):
+            records += len(incorrect)
+            yield incorrect, correct
+
+        logger.info("Errors data loaded successfully. Number of records: %d", records)
+
+    @staticmethod
+    def file_errors_hash(file_path: str, chunk_bytes: int = 1024 * 1024) -> str:
+        """
+        Computes the SHA-256 content hash of an errors log, reading it in chunks.
+
+        Args:
+            file_path (str): The path to the errors log.
+            chunk_bytes (int): Number of bytes read from the file per chunk.
+
+        Returns:
+            str: Hex digest of the file content.
+        """
+        writer = FileHandler.errors_writers.get(file_path)
+        if writer is not None:
+            writer.errors_log_flush(sync=False)
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_bytes), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    @staticmethod
+    def file_errors_discover(user_dir: str) -> list:
+        """
+        Finds the errors files of every user and language under UserFiles. Legacy CSV files are included, they are
+        migrated when the errors log is created.
+
+        Args:
+            user_dir (str): Directory path for user files.
+
+        Returns:
+            list of tuple: Sorted (user_name, language) pairs.
+        """
+        root = os.path.join(user_dir, "UserFiles")
+        if not os.path.isdir(root):
+            return []
+
+        found = set()
+        for user_name in os.listdir(root):
+            path = os.path.join(root, user_name, "errors")
+            if not os.path.isdir(path):
+                continue
+            for name in os.listdir(path):
+                stem, extension = os.path.splitext(name)
+                if stem.startswith("errors_") and extension in (".bin", ".csv"):
+                    found.add((user_name, stem[len("errors_"):]))
+        return sorted(found)
+
+    @staticmethod
+    def file_stats_create(language: str, user_name: str, user_dir: str) -> str:
+        """
+        Creates the confusion-count store for a user and language if it does not exist. The store keeps the
+        character-level error counts produced by ErrorsHandler.errors_analyze, so rules can be generated without
+        reloading the whole error log.
+
+        A new store, or a store of an older format that does not record which part of the log it covers, is built from
+        the errors log that already exists, so the history logged before the store is counted.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            user_name (str): Name of the user.
+            user_dir (str): Directory path for user files.
 
         Returns:
-            tuple: A tuple containing two pandas Series: (incorrect, correct).
+            str: Path to the created or existing JSON stats file.
         """
+        path = os.path.join(user_dir, "UserFiles", user_name, "errors")
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        stats_path = os.path.join(path, f"stats_{language}.json")
+        errors_path = os.path.join(path, f"errors_{language}.bin")
+
+        if FileHandler.file_stats_read(stats_path)[2] is None:
+            if os.path.exists(errors_path):
+                FileHandler.file_stats_rebuild(errors_path, stats_path)
+            else:
+                FileHandler.file_stats_update(stats_path, {}, 0, 0)
+            logger.info("Errors statistics created successfully...")
+
+        return stats_path
+
+    @staticmethod
+    def file_stats_update(file_path: str, errors: dict, records: int, offset: int):
+        """
+        Saves confusion counts to a JSON file. The file is written to a temporary path first and then renamed,
+        so readers never see a partially written store.
+
+        Args:
+            file_path (str): Path to the JSON stats file.
+            errors (dict): Correct characters mapped to counters of incorrect characters.
+            records (int): Number of error records the counts were built from.
+            offset (int): Byte offset in the errors log up to which the records were counted.
+        """
+        data = {
+            "version": 2,
+            "records": records,
+            "offset": offset,
+            "errors": {correct: dict(counts) for correct, counts in errors.items()},
+        }
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, file_path)
+
+        logger.debug("Errors statistics updated successfully...")
+
+    @staticmethod
+    def file_stats_read(file_path):
+        """
+        Reads confusion counts and the part of the errors log they cover.
+
+        Args:
+            file_path (str): Path to the JSON stats file.
+
+        Returns:
+            tuple: (errors, records, offset). offset is None if the file does not exist or has an older format, which
+            doesn't record the part of the log it covers; errors are then empty and records is 0.
+        """
+        errors = defaultdict(Counter)
         if not os.path.exists(file_path):
-            print("File not found. Please create it first..")
-            return None
+            return errors, 0, None
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version", 1) < 2:
+            return errors, 0, None
+
+        for correct, counts in data["errors"].items():
+            errors[correct].update(counts)
+        return errors, data["records"], data["offset"]
+
+    @staticmethod
+    def file_stats_load(file_path):
+        """
+        Loads confusion counts from a JSON stats file.
+
+        Args:
+            file_path (str): Path to the JSON stats file.
+
+        Returns:
+            tuple: (errors, records), where errors maps correct characters to counters of incorrect characters.
+            Returns (empty errors, 0) if the file does not exist.
+        """
+        if not os.path.exists(file_path):
+            logger.warning("Errors statistics not found. Please create it first...")
+        errors, records, _ = FileHandler.file_stats_read(file_path)
+        logger.info("Errors statistics loaded successfully. Number of records: %d", records)
+        return errors, records
+
+    @staticmethod
+    def file_stats_lock(file_path: str):
+        """
+        Returns the lock serializing the writers of a stats file within this process.
 
-        data = pd.read_csv(file_path)
+        Args:
+            file_path (str): Path to the JSON stats file.
 
-        print(f"Errors data loaded successfully. Number of records: {len(data)}")
-        return data['Incorrect'], data['Correct']
+        Returns:
+            threading.Lock: The lock of the file.
+        """
+        with FileHandler.stats_lock:
+            return FileHandler.stats_locks.setdefault(os.path.abspath(file_path), threading.Lock())
+
+    @staticmethod
+    def file_stats_count(errors_path: str, errors: dict, records: int, offset: int, job=None):
+        """
+        Adds the records of an errors log from a byte offset on to confusion counts.
+
+        Args:
+            errors_path (str): Path to the errors log.
+            errors (dict): Counts to add to. Modified in place.
+            records (int): Number of records already counted.
+            offset (int): Byte offset of the first record to count.
+            job (Job, optional): Scheduler job used to report progress and check for cancellation.
+
+        Returns:
+            tuple: (records, offset) after the last counted record, or None if the job was cancelled.
+        """
+        # Records still buffered by a writer of this process must be visible to the reader
+        writer = FileHandler.errors_writers.get(errors_path)
+        if writer is not None:
+            writer.errors_log_flush(sync=False)
+
+        for incorrect, correct, offset in ErrorsLogHandler.errors_log_scan(errors_path, offset):
+            if job and job.job_cancelled():
+                return None
+            ErrorsHandler.errors_merge(errors, ErrorsHandler.errors_analyze(incorrect, correct))
+            records += len(incorrect)
+            if job:
+                job.job_progress(records)
+        return records, offset
+
+    @staticmethod
+    def file_stats_sync(stats_path: str, errors_path: str):
+        """
+        Brings confusion counts up to date with the errors log by counting only the records appended since the offset
+        the store covers.
+
+        The store always holds the counts of the log up to its offset, so writers never double count or lose records:
+        a store overwritten by another writer at worst covers less of the log, and the next sync catches up.
+
+        Args:
+            stats_path (str): Path to the JSON stats file.
+            errors_path (str): Path to the errors log.
+
+        Returns:
+            tuple: (errors, records) of the whole log.
+        """
+        with FileHandler.file_stats_lock(stats_path):
+            errors, records, offset = FileHandler.file_stats_read(stats_path)
+            if offset is None or not os.path.exists(errors_path) or offset > os.path.getsize(errors_path):
+                errors, records, offset = defaultdict(Counter), 0, 0  # Missing store, or the log was replaced
+            if os.path.exists(errors_path):
+                records, new_offset = FileHandler.file_stats_count(errors_path, errors, records, offset)
+                if new_offset != offset:
+                    FileHandler.file_stats_update(stats_path, errors, records, new_offset)
+            return errors, records
+
+    @staticmethod
+    def file_stats_rebuild(errors_path: str, stats_path: str, job=None):
+        """
+        Recounts the confusion counts of the whole errors log and replaces the store with them. The log is counted
+        without holding the lock, so live sessions keep updating the store meanwhile; the records they appended after
+        the recount are then counted on top of it.
+
+        Args:
+            errors_path (str): Path to the errors log.
+            stats_path (str): Path to the JSON stats file.
+            job (Job, optional): Scheduler job used to report progress and check for cancellation.
+
+        Returns:
+            tuple: (errors, records) of the whole log, or None if the job was cancelled.
+        """
+        errors = defaultdict(Counter)
+        counted = FileHandler.file_stats_count(errors_path, errors, 0, 0, job=job)
+        if counted is None:
+            return None
+
+        with FileHandler.file_stats_lock(stats_path):
+            records, offset = counted
+            records, new_offset = FileHandler.file_stats_count(errors_path, errors, records, offset)
+            FileHandler.file_stats_update(stats_path, errors, records, new_offset)
+        return errors, records
 
     @staticmethod
     def file_model_create(language: str, user_name: str, user_dir: str) -> str:
         """
         Creates a directory for model files and defines the path for the model file.
 
-        If the model file already exists, it loads the model using file_model_load.
+        If a legacy pickled model exists and the rules file does not, the pickle is converted into the rules file.
 
         Args:
             language (str): Language code (e.g., "en").
@@ -117,47 +425,130 @@ class FileHandler:
         if not os.path.exists(path):
             os.makedirs(path)
 
-        model_path = os.path.join(path, f"rules_model_{language}.pkl")
+        model_path = os.path.join(path, f"rules_model_{language}.json")
+        pickle_path = os.path.join(path, f"rules_model_{language}.pkl")
 
-        if os.path.exists(model_path):
-            FileHandler.file_model_load(model_path)
-        else:
-            print("Model file was created successfully...")
+        if not os.path.exists(model_path) and os.path.exists(pickle_path):
+            try:
+                RulesModel.rules_convert(pickle_path, model_path)
+            except ValueError as e:
+                logger.warning("Legacy rules model was not converted: %s", e)
+        elif not os.path.exists(model_path):
+            logger.info("Model file was created successfully...")
         return model_path
 
     @staticmethod
-    def file_model_update(file_path: str, data):
+    def file_lexicon_create(language: str, user_name: str, user_dir: str) -> str:
+        """
+        Creates a directory for model files and defines the path for the personal vocabulary overlay of the user.
+        The overlay file itself is created when the first word is added.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            user_name (str): Name of the user.
+            user_dir (str): Directory path for user files.
+
+        Returns:
+            str: Path to the overlay file.
+        """
+        path = os.path.join(user_dir, "UserFiles", user_name, "rules")
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        return os.path.join(path, f"lexicon_{language}.json")
+
+    @staticmethod
+    def file_bigram_create(language: str, user_dir: str) -> str:
         """
-        Saves the provided data to a file using pickle serialization.
+        Creates the directory of the lexicons shared by all users and defines the path for the bigram model of a
+        language. The model file itself is written when the model is first built.
 
         Args:
-            file_path (str): The path where the data will be saved.
-            data (object): The data to be serialized and saved.
+            language (str): Language code (e.g., "en").
+            user_dir (str): Directory path for user files.
+
+        Returns:
+            str: Path to the bigram model file.
+        """
+        path = os.path.join(user_dir, "Lexicons")
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        return os.path.join(path, f"bigram_{language}.npz")
+
+    @staticmethod
+    def file_wordlist_create(language: str, user_dir: str) -> str:
+        """
+        Creates the directory of the lexicons shared by all users and defines the path for the imported word frequency
+        list of a language. The file itself is written by LexiconHandler.lexicon_import.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            user_dir (str): Directory path for user files.
+
+        Returns:
+            str: Path to the word list file.
+        """
+        path = os.path.join(user_dir, "Lexicons")
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        return os.path.join(path, f"lexicon_{language}.tsv")
+
+    @staticmethod
+    def file_store_create(user_dir: str) -> str:
+        """
+        Creates the cache directory shared by all users and defines the path for the persistent correction store. The
+        database itself is created by StoreModel when it is first opened.
+
+        Args:
+            user_dir (str): Directory path for user files.
+
+        Returns:
+            str: Path to the correction store.
+        """
+        path = os.path.join(user_dir, "Cache")
+        if not os.path.exists(path):
+            os.makedirs(path)
+
+        return os.path.join(path, "corrections.sqlite")
+
+    @staticmethod
+    def file_model_update(file_path: str, data, errors=None, source_hash=None):
+        """
+        Saves replacement rules to a versioned rules file.
+
+        Args:
+            file_path (str): The path where the rules will be saved.
+            data (dict): A RulesModel or a plain rules dictionary, which is compiled before saving.
+            errors (dict, optional): Error statistics the rules were generated from, stored as confusion weights.
+            source_hash (str, optional): Content hash of the errors log the rules were generated from.
 
         Returns:
             None
         """
-        with open(file_path, 'wb') as f:
-            pickle.dump(data, f)
-        print(f"Model file was saved successfully...")
+        model = data if isinstance(data, RulesModel) else RulesModel.rules_compile(data, errors, source_hash)
+        model.rules_dump(file_path)
+        logger.info("Model file was saved successfully...")
 
     @staticmethod
     def file_model_load(file_path):
         """
-        Loads data from a file saved using pickle serialization.
+        Loads replacement rules from a versioned rules file.
 
         Args:
             file_path (str): The path to the file to be loaded.
 
         Returns:
-            object: The deserialized data from the file. Returns None if the file does not exist.
+            RulesModel: The loaded rules. Returns None if the file does not exist.
         """
         if not os.path.exists(file_path):
-            print("Model file not found. Please create it first...")
+            logger.warning("Model file not found. Please create it first...")
             return None
 
-        with open(file_path, 'rb') as f:
-            data = pickle.load(f)
+        data = RulesModel.rules_load(file_path)
 
-        print("Model file was uploaded successfully...")
+        logger.info("Model file was uploaded successfully...")
         return data
+
+atexit.register(FileHandler.file_errors_close)
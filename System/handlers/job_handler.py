@@ -0,0 +1,281 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import heapq
+import itertools
+import threading
+import time
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("jobs")
+
+class Job:
+    """
+    A unit of work run by the JobHandler.
+
+    The target is called as target(*args, job=job), so it can report progress with job_progress and stop early when
+    job_cancelled returns True. Cancelling a queued job removes it before it starts; cancelling a running job only
+    sets the flag the target is expected to check.
+
+    Attributes:
+        job_id (int): Sequential id of the job.
+        name (str): Human-readable name.
+        priority (int): Lower values run first.
+        interactive (bool): Whether the job serves a user waiting at the console.
+        status (str): "queued", "running", "done", "failed" or "cancelled".
+        done (int): Amount of work completed, as reported by the target.
+        total (int): Total amount of work, if known.
+        result (object): Return value of the target.
+        error (Exception): Exception raised by the target, if any.
+
+    Methods:
+        job_progress(done, total=None):
+            Reports the progress of the job.
+        job_cancel():
+            Requests cancellation of the job.
+        job_cancelled() -> bool:
+            Returns whether cancellation was requested.
+        job_wait(timeout=None) -> bool:
+            Waits until the job has finished.
+        job_describe() -> str:
+            Returns a one-line description of the job state.
+    """
+    def __init__(self, job_id: int, name: str, target, args: tuple, priority: int, interactive: bool):
+        self.job_id = job_id
+        self.name = name
+        self.target = target
+        self.args = args
+        self.priority = priority
+        self.interactive = interactive
+        self.status = "queued"
+        self.done = 0
+        self.total = None
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+        self.cancel_event = threading.Event()
+        self.done_event = threading.Event()
+
+    def job_progress(self, done: int, total: int = None):
+        """
+        Reports the progress of the job.
+
+        Args:
+            done (int): Amount of work completed.
+            total (int, optional): Total amount of work, if known.
+        """
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    def job_cancel(self):
+        """
+        Requests cancellation of the job.
+        """
+        self.cancel_event.set()
+
+    def job_cancelled(self) -> bool:
+        """
+        Returns whether cancellation of the job was requested.
+        """
+        return self.cancel_event.is_set()
+
+    def job_wait(self, timeout: float = None) -> bool:
+        """
+        Waits until the job has finished.
+
+        Args:
+            timeout (float, optional): Maximum time to wait in seconds.
+
+        Returns:
+            bool: True if the job has finished.
+        """
+        return self.done_event.wait(timeout)
+
+    def job_describe(self) -> str:
+        """
+        Returns a one-line description of the job state.
+        """
+        progress = f"{self.done}/{self.total}" if self.total else f"{self.done}"
+        elapsed = ""
+        if self.started is not None:
+            elapsed = f", {(self.finished or time.monotonic()) - self.started:.1f}s"
+        kind = "interactive" if self.interactive else "background"
+        return f"#{self.job_id} {self.name} [{kind}, priority {self.priority}]: {self.status}, progress {progress}{elapsed}"
+
+class JobHandler:
+    """
+    A small scheduler running jobs on a bounded pool of worker threads.
+
+    Jobs wait in a priority queue (lower priority values first, then submission order). One worker is always kept
+    free of background jobs, so an interactive job (a use-mode or training session waiting for the user) starts
+    immediately even while background jobs such as rule retraining or batch re-transcription keep the rest of the pool
+    busy.
+
+    Attributes:
+        priority_interactive (int): Default priority of interactive jobs.
+        priority_background (int): Default priority of background jobs.
+
+    Methods:
+        job_submit(name, target, args=(), priority=None, interactive=False) -> Job:
+            Queues a job.
+        job_list() -> list:
+            Returns all submitted jobs.
+        job_get(job_id) -> Job:
+            Returns a job by id.
+        job_cancel(job_id) -> bool:
+            Cancels a job by id.
+        job_shutdown(wait=True):
+            Cancels queued jobs and stops the workers.
+    """
+    priority_interactive = 0
+    priority_background = 10
+
+    def __init__(self, workers: int = 2):
+        """
+        Starts the worker pool.
+
+        Args:
+            workers (int): Number of worker threads. At least two, so that one is kept for interactive jobs.
+        """
+        self.workers = max(2, workers)
+        self.background_limit = self.workers - 1
+        self.background_running = 0
+        self.queue = []
+        self.jobs = {}
+        self.counter = itertools.count(1)
+        self.condition = threading.Condition()
+        self.stopping = False
+        self.threads = [threading.Thread(target=self.job_worker, name=f"job-worker-{i}", daemon=True)
+                        for i in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def job_submit(self, name: str, target, args: tuple = (), priority: int = None, interactive: bool = False) -> Job:
+        """
+        Queues a job.
+
+        Args:
+            name (str): Human-readable name.
+            target (callable): Function called as target(*args, job=job).
+            args (tuple): Positional arguments of the target.
+            priority (int, optional): Lower values run first. Defaults by kind of job.
+            interactive (bool): Whether the job serves a user waiting at the console.
+
+        Returns:
+            Job: The queued job.
+        """
+        if priority is None:
+            priority = JobHandler.priority_interactive if interactive else JobHandler.priority_background
+
+        with self.condition:
+            if self.stopping:
+                raise RuntimeError("Job scheduler is shut down")
+            job = Job(next(self.counter), name, target, args, priority, interactive)
+            self.jobs[job.job_id] = job
+            heapq.heappush(self.queue, (priority, job.job_id, job))
+            self.condition.notify_all()
+
+        logger.info("Job queued: %s", job.job_describe())
+        return job
+
+    def job_list(self) -> list:
+        """
+        Returns all submitted jobs in submission order.
+        """
+        with self.condition:
+            return list(self.jobs.values())
+
+    def job_get(self, job_id: int):
+        """
+        Returns a job by id, or None if there is no such job.
+        """
+        with self.condition:
+            return self.jobs.get(job_id)
+
+    def job_cancel(self, job_id: int) -> bool:
+        """
+        Cancels a job. A queued job is finished as cancelled right away, a running job is asked to stop.
+
+        Args:
+            job_id (int): Id of the job.
+
+        Returns:
+            bool: False if there is no such unfinished job.
+        """
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None or job.done_event.is_set():
+                return False
+            job.job_cancel()
+            if job.status == "queued":
+                self.queue = [entry for entry in self.queue if entry[2] is not job]
+                heapq.heapify(self.queue)
+                job.status = "cancelled"
+                job.done_event.set()
+        return True
+
+    def job_shutdown(self, wait: bool = True):
+        """
+        Cancels all queued and running jobs and stops the workers.
+
+        Args:
+            wait (bool): Whether to wait for running jobs to return.
+        """
+        with self.condition:
+            self.stopping = True
+            pending = [job for job in self.jobs.values() if not job.done_event.is_set()]
+            self.condition.notify_all()
+        for job in pending:
+            self.job_cancel(job.job_id)
+        if wait:
+            for thread in self.threads:
+                thread.join()
+
+    def job_next(self):
+        """
+        Removes and returns the first queued job that may start now, or None. Must be called with the condition held.
+        """
+        for _, _, job in sorted(self.queue):
+            if job.interactive or self.background_running < self.background_limit:
+                self.queue.remove((job.priority, job.job_id, job))
+                heapq.heapify(self.queue)
+                return job
+        return None
+
+    def job_worker(self):
+        """
+        Worker loop: takes the next runnable job from the queue and runs it.
+        """
+        while True:
+            with self.condition:
+                job = self.job_next()
+                while job is None:
+                    if self.stopping:
+                        return
+                    self.condition.wait()
+                    job = self.job_next()
+                if not job.interactive:
+                    self.background_running += 1
+                job.status = "running"
+                job.started = time.monotonic()
+
+            try:
+                job.result = job.target(*job.args, job=job)
+                job.status = "cancelled" if job.job_cancelled() else "done"
+            except Exception as e:
+                job.error = e
+                job.status = "failed"
+                logger.exception("Job failed: %s", job.job_describe())
+            finally:
+                job.finished = time.monotonic()
+                with self.condition:
+                    if not job.interactive:
+                        self.background_running -= 1
+                    self.condition.notify_all()
+                job.done_event.set()
+
+            logger.info("Job finished: %s", job.job_describe())
@@ -0,0 +1,139 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import os
+
+import numpy as np
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("lexicon_import")
+
+class LexiconHandler:
+    """
+    A utility class for importing large word frequency lists into the shared lexicon of a language.
+
+    Frequency lists are plain text files with one "word<TAB>count" entry per line (a space also separates the fields),
+    such as the lists derived from OpenSubtitles or Wikipedia. They are streamed line by line, so a file of any size can
+    be imported. Words are lowercased and kept only if they are alphabetic, at least min_length characters long and
+    seen at least min_count times.
+
+    Memory is bounded by max_words: whenever twice that many distinct words are held, exactly the max_words most frequent
+    are kept (ties broken alphabetically, as in the lexicon file) and every later new word not more frequent than the
+    least frequent kept one is skipped. Each pruning halves the dictionary, so it runs at most once per max_words new
+    words. The lexicon of a language is a
+    text file in the same format, sorted by descending count; importing into an existing lexicon merges its words with
+    the new lists.
+
+    Methods:
+        lexicon_import(source_paths, target_path, min_count=2, max_words=1000000, min_length=2) -> int:
+            Streams frequency lists into a lexicon file.
+        lexicon_read(file_path, chunk_lines=100000) -> generator:
+            Streams (word, count) chunks from a frequency list.
+        lexicon_prune(totals, max_words) -> int:
+            Keeps only the most frequent words of a count dictionary.
+    """
+    @staticmethod
+    def lexicon_read(file_path: str, chunk_lines: int = 100000):
+        """
+        Streams a word frequency list. Lines that don't have a word and an integer count are skipped.
+
+        Args:
+            file_path (str): Path to the frequency list.
+            chunk_lines (int): Number of entries per chunk.
+
+        Yields:
+            tuple: (words, counts) lists of the entries of each chunk.
+        """
+        words, counts = [], []
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                fields = line.split("\t") if "\t" in line else line.split()
+                if len(fields) < 2:
+                    continue
+                try:
+                    count = int(fields[1])
+                except ValueError:
+                    continue
+                words.append(fields[0].strip())
+                counts.append(count)
+                if len(words) >= chunk_lines:
+                    yield words, counts
+                    words, counts = [], []
+        if words:
+            yield words, counts
+
+    @staticmethod
+    def lexicon_import(source_paths, target_path: str, min_count: int = 2, max_words: int = 1000000,
+                       min_length: int = 2) -> int:
+        """
+        Streams word frequency lists into a lexicon file, merged with the words already in it.
+
+        Args:
+            source_paths (list of str): Paths to the frequency lists.
+            target_path (str): Path to the lexicon file. It is replaced atomically.
+            min_count (int): Minimum count of a kept word.
+            max_words (int): Maximum number of words in the lexicon.
+            min_length (int): Minimum length of a kept word.
+
+        Returns:
+            int: Number of words in the lexicon.
+        """
+        sources = list(source_paths)
+        if os.path.exists(target_path):
+            sources.insert(0, target_path)
+
+        totals, floor, lines = {}, 0, 0
+        for source_path in sources:
+            logger.info("Importing word frequencies from %s...", source_path)
+            for words, counts in LexiconHandler.lexicon_read(source_path):
+                lines += len(words)
+                for word, count in zip(words, counts):
+                    word = word.lower()
+                    if len(word) < min_length or not word.isalpha():
+                        continue
+                    if count <= floor and word not in totals:
+                        continue
+                    totals[word] = totals.get(word, 0) + count
+
+                if len(totals) > 2 * max_words:
+                    floor = LexiconHandler.lexicon_prune(totals, max_words)
+
+        kept = sorted(((word, count) for word, count in totals.items() if count >= min_count),
+                      key=lambda x: (-x[1], x[0]))[:max_words]
+
+        directory = os.path.dirname(target_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temp_path = f"{target_path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for word, count in kept:
+                f.write(f"{word}\t{count}\n")
+        os.replace(temp_path, target_path)
+
+        logger.info("Lexicon imported... Lines read: %d, words kept: %d", lines, len(kept))
+        return len(kept)
+
+    @staticmethod
+    def lexicon_prune(totals: dict, max_words: int) -> int:
+        """
+        Keeps exactly the max_words most frequent words of a count dictionary. Words tied at the smallest kept count are
+        kept in alphabetical order until max_words is reached.
+
+        Args:
+            totals (dict): Words mapped to their counts. Modified in place.
+            max_words (int): Number of words to keep.
+
+        Returns:
+            int: The smallest kept count; new words must be more frequent to be admitted.
+        """
+        if len(totals) <= max_words:
+            return 0
+        counts = np.fromiter(totals.values(), dtype=np.int64, count=len(totals))
+        floor = int(np.partition(counts, len(counts) - max_words)[len(counts) - max_words])
+        above = int(np.count_nonzero(counts > floor))
+        tied = sorted(word for word, count in totals.items() if count == floor)
+        for word in [word for word, count in totals.items() if count < floor] + tied[max_words - above:]:
+            del totals[word]
+        return floor
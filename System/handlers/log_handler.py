@@ -0,0 +1,115 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import json
+import logging
+import os
+import random
+import sys
+
+from System.handlers.metrics_handler import MetricsHandler
+
+class _SampleFilter(logging.Filter):
+    """
+    Lets through only a fraction of the DEBUG records. Records of any other level always pass.
+    """
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno != logging.DEBUG or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+class _JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, including the active trace id if there is one.
+    """
+    def format(self, record):
+        data = {
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        trace_id = MetricsHandler.trace_id.get()
+        if trace_id is not None:
+            data["trace_id"] = trace_id
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+class LogHandler:
+    """
+    A utility class that routes the console output of the system through the standard logging module.
+
+    Every component logs through a child of the "speech_aligner" logger. Messages use lazy %-style arguments, so a
+    disabled level costs only a level check. The output is configured through environment variables:
+    - SPEECH_ALIGNER_LOG_LEVEL: Minimum level (DEBUG, INFO, WARNING, ERROR). Defaults to INFO, which is also used with
+      a warning if the value is not a level name.
+    - SPEECH_ALIGNER_LOG_FORMAT: "text" (plain messages) or "json" (structured records). Defaults to "text".
+    - SPEECH_ALIGNER_LOG_SAMPLE: Fraction of DEBUG records to emit, for diagnosing production runs. Defaults to 1.0,
+      also if the value is not a number.
+
+    Methods:
+        log_get(name) -> logging.Logger:
+            Returns the logger of a component, configuring the root logger of the system on first use.
+        log_configure(level=None, fmt=None, sample_rate=None):
+            (Re)configures level, format and debug sampling of the system logger.
+    """
+    root_name = "speech_aligner"
+    configured = False
+
+    @staticmethod
+    def log_get(name: str) -> logging.Logger:
+        """
+        Returns the logger of a component.
+
+        Args:
+            name (str): Name of the component (e.g., "correction").
+
+        Returns:
+            logging.Logger: The logger "speech_aligner.<name>".
+        """
+        if not LogHandler.configured:
+            LogHandler.log_configure()
+        return logging.getLogger(f"{LogHandler.root_name}.{name}")
+
+    @staticmethod
+    def log_configure(level: str = None, fmt: str = None, sample_rate: float = None):
+        """
+        Configures the system logger. Arguments that are not given are read from the environment. An invalid level or
+        sample rate falls back to its default with a warning, so a typo in the environment never stops the system.
+
+        Args:
+            level (str, optional): Minimum level to emit.
+            fmt (str, optional): "text" or "json".
+            sample_rate (float, optional): Fraction of DEBUG records to emit.
+        """
+        warnings = []
+        level = (level or os.environ.get("SPEECH_ALIGNER_LOG_LEVEL", "INFO")).strip().upper()
+        if not isinstance(logging.getLevelName(level), int):
+            warnings.append(f"Unknown log level '{level}', using INFO...")
+            level = "INFO"
+        fmt = fmt or os.environ.get("SPEECH_ALIGNER_LOG_FORMAT", "text")
+        if sample_rate is None:
+            try:
+                sample_rate = float(os.environ.get("SPEECH_ALIGNER_LOG_SAMPLE", "1.0"))
+            except ValueError:
+                warnings.append(f"Invalid log sample rate '{os.environ['SPEECH_ALIGNER_LOG_SAMPLE']}', using 1.0...")
+                sample_rate = 1.0
+
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(_JsonFormatter() if fmt == "json" else logging.Formatter("%(message)s"))
+        handler.addFilter(_SampleFilter(sample_rate))
+
+        logger = logging.getLogger(LogHandler.root_name)
+        for old_handler in list(logger.handlers):
+            logger.removeHandler(old_handler)
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        logger.propagate = False
+        LogHandler.configured = True
+        for warning in warnings:
+            logger.warning(warning)
@@ -0,0 +1,256 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import bisect
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+class _NullSpan:
+    """
+    A span that does nothing. Returned by metrics_span while metrics are disabled so that the instrumented code
+    pays only for one attribute check and an empty context manager.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    """
+    A timing span around a single pipeline stage. On exit the elapsed time is recorded in the stage histogram and,
+    when a trace is active, in the list of recent trace events.
+    """
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        MetricsHandler.metrics_observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+class MetricsHandler:
+    """
+    A utility class for measuring the latency of each stage of the speech alignment pipeline.
+
+    Every stage (model loading, audio decoding, Whisper decoding, candidate generation, GPT call, TTS) is wrapped in a
+    timing span. Span durations are collected into a process-wide registry of histograms that can be exported as
+    Prometheus text or JSON. Metrics are disabled by default; set SPEECH_ALIGNER_METRICS=1 to enable them and
+    SPEECH_ALIGNER_METRICS_PATH to a ".prom" or ".json" file to dump them when a mode finishes.
+
+    Attributes:
+        enabled (bool): Whether spans are recorded.
+        buckets (tuple of float): Upper bounds (in seconds) of the histogram buckets.
+        histograms (dict): Stage name mapped to {"buckets": [...], "sum": float, "count": int}.
+        events (deque): Recent spans recorded under a trace id.
+        counters (dict): Counter name mapped to its total.
+
+    Methods:
+        metrics_enable(enabled=True):
+            Enables or disables span recording.
+        metrics_span(stage):
+            Returns a context manager timing the given stage.
+        metrics_observe(stage, seconds):
+            Records a single duration for a stage.
+        metrics_count(name, value=1):
+            Adds to a counter.
+        metrics_trace_start(trace_id=None) -> tuple:
+            Starts a per-request trace and returns its id and reset token.
+        metrics_trace_end(token):
+            Ends the trace started with metrics_trace_start.
+        metrics_export_prometheus() -> str:
+            Exports the histograms and counters in the Prometheus text exposition format.
+        metrics_export_json() -> str:
+            Exports the histograms, counters and recent trace events as JSON.
+        metrics_dump(file_path=None):
+            Writes the metrics to a file in the format implied by its extension.
+        metrics_reset():
+            Clears all collected metrics.
+    """
+    enabled = os.environ.get("SPEECH_ALIGNER_METRICS", "0") == "1"
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    histograms = {}
+    events = deque(maxlen=1000)
+    counters = {}
+    lock = threading.Lock()
+    trace_id = contextvars.ContextVar("speech_aligner_trace_id", default=None)
+
+    @staticmethod
+    def metrics_enable(enabled: bool = True):
+        """
+        Enables or disables span recording.
+
+        Args:
+            enabled (bool): True to record spans, False to turn every span into a no-op.
+        """
+        MetricsHandler.enabled = enabled
+
+    @staticmethod
+    def metrics_span(stage: str):
+        """
+        Returns a context manager that measures the time spent in a pipeline stage.
+
+        Args:
+            stage (str): Name of the stage (e.g., "whisper_decode").
+
+        Returns:
+            A context manager. While metrics are disabled a shared no-op span is returned.
+        """
+        if not MetricsHandler.enabled:
+            return _NULL_SPAN
+        return _Span(stage)
+
+    @staticmethod
+    def metrics_observe(stage: str, seconds: float):
+        """
+        Records a single duration in the histogram of a stage.
+
+        Args:
+            stage (str): Name of the stage.
+            seconds (float): Measured duration in seconds.
+        """
+        if not MetricsHandler.enabled:
+            return
+
+        index = bisect.bisect_left(MetricsHandler.buckets, seconds)
+        trace_id = MetricsHandler.trace_id.get()
+        with MetricsHandler.lock:
+            histogram = MetricsHandler.histograms.get(stage)
+            if histogram is None:
+                histogram = {"buckets": [0] * (len(MetricsHandler.buckets) + 1), "sum": 0.0, "count": 0}
+                MetricsHandler.histograms[stage] = histogram
+            histogram["buckets"][index] += 1
+            histogram["sum"] += seconds
+            histogram["count"] += 1
+            if trace_id is not None:
+                MetricsHandler.events.append({"trace_id": trace_id, "stage": stage, "seconds": seconds})
+
+    @staticmethod
+    def metrics_trace_start(trace_id: str = None):
+        """
+        Starts a per-request trace. Spans recorded until metrics_trace_end is called are tagged with the trace id.
+
+        Args:
+            trace_id (str, optional): Trace id to use. A random id is generated if not given.
+
+        Returns:
+            tuple: (trace_id, token), where the token must be passed to metrics_trace_end.
+        """
+        trace_id = trace_id or uuid.uuid4().hex[:16]
+        return trace_id, MetricsHandler.trace_id.set(trace_id)
+
+    @staticmethod
+    def metrics_trace_end(token):
+        """
+        Ends a trace started with metrics_trace_start.
+
+        Args:
+            token: The token returned by metrics_trace_start.
+        """
+        MetricsHandler.trace_id.reset(token)
+
+    @staticmethod
+    def metrics_count(name: str, value: int = 1):
+        """
+        Adds to a counter, e.g. the number of processed or skipped items.
+
+        Args:
+            name (str): Name of the counter.
+            value (int): Amount to add.
+        """
+        if not MetricsHandler.enabled:
+            return
+
+        with MetricsHandler.lock:
+            MetricsHandler.counters[name] = MetricsHandler.counters.get(name, 0) + value
+
+    @staticmethod
+    def metrics_export_prometheus() -> str:
+        """
+        Exports the stage histograms and counters in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics as Prometheus text.
+        """
+        lines = [
+            "# HELP speech_aligner_stage_seconds Time spent in each pipeline stage.",
+            "# TYPE speech_aligner_stage_seconds histogram",
+        ]
+        with MetricsHandler.lock:
+            for stage, histogram in sorted(MetricsHandler.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(MetricsHandler.buckets, histogram["buckets"]):
+                    cumulative += count
+                    lines.append(f'speech_aligner_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'speech_aligner_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+                lines.append(f'speech_aligner_stage_seconds_sum{{stage="{stage}"}} {histogram["sum"]:.6f}')
+                lines.append(f'speech_aligner_stage_seconds_count{{stage="{stage}"}} {histogram["count"]}')
+            for name, value in sorted(MetricsHandler.counters.items()):
+                lines.append(f"# TYPE speech_aligner_{name}_total counter")
+                lines.append(f"speech_aligner_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def metrics_export_json() -> str:
+        """
+        Exports the stage histograms, the counters and the recent trace events as JSON.
+
+        Returns:
+            str: The metrics as a JSON document.
+        """
+        with MetricsHandler.lock:
+            data = {
+                "buckets": list(MetricsHandler.buckets),
+                "stages": {stage: dict(histogram, buckets=list(histogram["buckets"]))
+                           for stage, histogram in MetricsHandler.histograms.items()},
+                "counters": dict(MetricsHandler.counters),
+                "events": list(MetricsHandler.events),
+            }
+        return json.dumps(data, indent=2)
+
+    @staticmethod
+    def metrics_dump(file_path: str = None):
+        """
+        Writes the collected metrics to a file. Files ending in ".json" receive JSON, any other extension receives
+        Prometheus text. Nothing is written while metrics are disabled or no path is configured.
+
+        Args:
+            file_path (str, optional): Output path. Defaults to SPEECH_ALIGNER_METRICS_PATH.
+        """
+        file_path = file_path or os.environ.get("SPEECH_ALIGNER_METRICS_PATH")
+        if not MetricsHandler.enabled or not file_path:
+            return
+
+        if file_path.endswith(".json"):
+            content = MetricsHandler.metrics_export_json()
+        else:
+            content = MetricsHandler.metrics_export_prometheus()
+
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    @staticmethod
+    def metrics_reset():
+        """
+        Clears all collected histograms, counters and trace events.
+        """
+        with MetricsHandler.lock:
+            MetricsHandler.histograms.clear()
+            MetricsHandler.counters.clear()
+            MetricsHandler.events.clear()
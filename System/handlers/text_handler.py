@@ -3,43 +3,164 @@
 # Do not reuse, copy, modify, or redistribute.
 
 import string
+import threading
 import unicodedata
+import numpy as np
+
+class NormalizeTable(dict):
+    """
+    A str.translate table of one language that maps every character to its normalized form on first use.
+
+    Punctuation is removed and letters are lowercased. Diacritics are then stripped except on the letters kept by the
+    language, and for ASCII-only languages every remaining non-ASCII character is dropped. Characters are mapped the
+    first time a text contains them and cached, so the table covers any script without listing it in advance.
+
+    Attributes:
+        kept (str): Letters whose diacritics are part of the letter (e.g., "ñ").
+        ascii_only (bool): Whether non-ASCII characters are dropped.
+    """
+    def __init__(self, kept: str = "", ascii_only: bool = False):
+        """
+        Initializes the table and precompiles ASCII and the kept letters.
+
+        Args:
+            kept (str): Letters that keep their diacritics.
+            ascii_only (bool): Whether non-ASCII characters are dropped.
+        """
+        super().__init__()
+        self.kept = kept
+        self.ascii_only = ascii_only
+        for char in [chr(code) for code in range(128)] + list(kept + kept.upper()):
+            self[ord(char)]
+
+    def __missing__(self, code):
+        char = chr(code)
+        if char in string.punctuation or unicodedata.category(char).startswith("P"):
+            mapped = None
+        elif char.isspace():
+            mapped = char if char.isascii() else " "
+        else:
+            parts = []
+            for letter in char.lower():
+                if letter not in self.kept:
+                    letter = "".join(c for c in unicodedata.normalize("NFD", letter) if not unicodedata.combining(c))
+                    if self.ascii_only:
+                        letter = letter.encode("ascii", "ignore").decode("ascii")
+                parts.append(letter)
+            mapped = "".join(parts)
+        self[code] = mapped
+        return mapped
 
 class TextHandler:
     """
     A utility class for handling text processing tasks, including normalization and comparison.
 
     This class provides methods to:
-    - Normalize text by removing punctuation, converting to lowercase, and standardizing characters.
+    - Normalize text by removing punctuation, converting to lowercase, and standardizing characters. The rules depend on
+      the language: English is reduced to ASCII, Spanish loses its accents but keeps "ñ", and Russian keeps its Cyrillic
+      letters (including "ё" and "й"). Other languages keep their script without diacritics.
     - Compare transcribed text with expected text to identify mismatches.
+    - Align long transcripts word by word and score them (WER, CER, similarity).
 
     Methods:
-        text_normalize(text: str) -> str:
+        text_table(language) -> NormalizeTable:
+            Returns the shared translation table of a language.
+        text_normalize(text: str, language="en") -> str:
             Normalizes input text for consistent processing.
+        text_normalize_batch(texts, language="en"):
+            Normalizes a list or pandas Series of texts in bulk.
         text_compare(transcribed: str, expected: str) -> tuple:
             Compares transcribed and expected text, identifying mismatched words.
+        text_substitutions(alignment, transcribed_words, expected_words) -> tuple:
+            Extracts the substituted word pairs of an alignment.
+        text_align(transcribed_words, expected_words) -> list:
+            Aligns two word sequences in linear memory (Hirschberg).
+        text_align_range(a, a_start, a_end, b, b_start, b_end, ops):
+            Recursively aligns two ranges of words.
+        text_align_costs(a, b) -> list:
+            Computes one row of the edit-distance table in linear memory.
+        text_align_small(a, a_start, a_end, b, b_start, b_end, ops):
+            Aligns ranges where one side has a single word.
+        text_score(alignment, transcribed_words, expected_words) -> dict:
+            Computes WER, CER and similarity from an alignment.
+        text_confidences(words, language="en") -> dict:
+            Maps the normalized words of a transcription to their confidence.
     """
+    languages = {
+        "en": ("", True),
+        "es": ("ñ", False),
+        "ru": ("ёй", False),
+    }
+    tables = {}
+    lock = threading.Lock()
+
     @staticmethod
-    def text_normalize(text: str) -> str:
+    def text_table(language: str):
+        """
+        Returns the translation table of a language, creating it on first use. Tables are shared by all callers.
+
+        Args:
+            language (str): Language code (e.g., "en").
+
+        Returns:
+            NormalizeTable: The translation table.
+        """
+        table = TextHandler.tables.get(language)
+        if table is None:
+            with TextHandler.lock:
+                table = TextHandler.tables.get(language)
+                if table is None:
+                    table = NormalizeTable(*TextHandler.languages.get(language, ("", False)))
+                    TextHandler.tables[language] = table
+        return table
+
+    @staticmethod
+    def text_normalize(text: str, language: str = "en") -> str:
         """
         Normalizes text by removing punctuation, converting to lowercase,
-        and standardizing characters.
+        and standardizing characters with the rules of a language.
 
         Args:
             text (str): Input text.
+            language (str): Language code (e.g., "en").
 
         Returns:
             str: Normalized text.
         """
-        translator = str.maketrans('', '', string.punctuation)
-        normalized = text.translate(translator).lower()
-        return unicodedata.normalize('NFD', normalized).encode('ascii', 'ignore').decode('utf-8')
+        return text.translate(TextHandler.text_table(language))
+
+    @staticmethod
+    def text_normalize_batch(texts, language: str = "en"):
+        """
+        Normalizes many texts at once, e.g. a transcript archive. A pandas Series is translated with its vectorized
+        string methods; a list is joined and translated in a single call, then split again.
+
+        Args:
+            texts (list of str or pandas.Series): Input texts.
+            language (str): Language code (e.g., "en").
+
+        Returns:
+            list of str or pandas.Series: Normalized texts, of the same kind as the input.
+        """
+        table = TextHandler.text_table(language)
+        if hasattr(texts, "str"):
+            return texts.str.translate(table)
+
+        texts = list(texts)
+        separator = "\x00"
+        joined = separator.join(texts)
+        if joined.count(separator) != len(texts) - 1:  # A text contains the separator itself
+            return [text.translate(table) for text in texts]
+        return joined.translate(table).split(separator) if texts else []
 
     @staticmethod
     def text_compare(transcribed: str, expected: str):
         """
         Compares transcribed text with expected text to identify mismatches or errors.
 
+        Words are paired through the word alignment of text_align, so a dropped or inserted word does not shift the
+        comparison of the rest of the utterance. Only substituted words are returned.
+
         Args:
             transcribed (str): Transcribed text.
             expected (str): Expected text.
@@ -49,6 +170,220 @@ class TextHandler:
         """
         transcribed_words = transcribed.split()
         expected_words = expected.split()
-        incorrect = [t for t, e in zip(transcribed_words, expected_words) if t != e]
-        correct = [e for t, e in zip(transcribed_words, expected_words) if t != e]
+        alignment = TextHandler.text_align(transcribed_words, expected_words)
+        return TextHandler.text_substitutions(alignment, transcribed_words, expected_words)
+
+    @staticmethod
+    def text_substitutions(alignment, transcribed_words, expected_words):
+        """
+        Extracts the substituted word pairs of an alignment.
+
+        Args:
+            alignment (list of tuple): Spans returned by text_align.
+            transcribed_words (list of str): Transcribed words.
+            expected_words (list of str): Expected words.
+
+        Returns:
+            tuple: Incorrect and correct word lists.
+        """
+        incorrect, correct = [], []
+        for op, t_start, t_end, e_start, e_end in alignment:
+            if op == "substitute":
+                incorrect.extend(transcribed_words[t_start:t_end])
+                correct.extend(expected_words[e_start:e_end])
         return incorrect, correct
+
+    @staticmethod
+    def text_align(transcribed_words, expected_words):
+        """
+        Aligns two word sequences with the minimum number of word substitutions, insertions and deletions.
+
+        Common prefixes and suffixes are matched directly, and the remainder is aligned with Hirschberg's
+        divide-and-conquer algorithm. Memory use is linear in the length of the texts, so hour-long transcripts can be
+        compared.
+
+        Args:
+            transcribed_words (list of str): Transcribed words.
+            expected_words (list of str): Expected words.
+
+        Returns:
+            list of tuple: Spans (op, t_start, t_end, e_start, e_end) covering both sequences in order, where op is
+            "equal", "substitute", "insert" (extra transcribed words) or "delete" (missing expected words).
+        """
+        # Words are replaced by integer ids so that rows of the edit-distance table can be computed with NumPy
+        vocabulary = {}
+        a = np.array([vocabulary.setdefault(w, len(vocabulary)) for w in transcribed_words], dtype=np.int64)
+        b = np.array([vocabulary.setdefault(w, len(vocabulary)) for w in expected_words], dtype=np.int64)
+
+        ops = []
+        TextHandler.text_align_range(a, 0, len(a), b, 0, len(b), ops)
+
+        # Merge consecutive single-word operations of the same kind into spans
+        spans = []
+        t_pos = e_pos = 0
+        for op in ops:
+            t_step = 0 if op == "delete" else 1
+            e_step = 0 if op == "insert" else 1
+            if spans and spans[-1][0] == op:
+                spans[-1][2] += t_step
+                spans[-1][4] += e_step
+            else:
+                spans.append([op, t_pos, t_pos + t_step, e_pos, e_pos + e_step])
+            t_pos += t_step
+            e_pos += e_step
+        return [tuple(span) for span in spans]
+
+    @staticmethod
+    def text_align_range(a, a_start, a_end, b, b_start, b_end, ops):
+        """
+        Appends the word operations aligning a[a_start:a_end] with b[b_start:b_end] to ops.
+
+        Args:
+            a (numpy.ndarray): Transcribed word ids.
+            a_start (int): Start of the transcribed range.
+            a_end (int): End of the transcribed range.
+            b (numpy.ndarray): Expected word ids.
+            b_start (int): Start of the expected range.
+            b_end (int): End of the expected range.
+            ops (list of str): Output list of "equal", "substitute", "insert" and "delete" operations.
+        """
+        # Matching prefixes and suffixes are always part of an optimal alignment
+        while a_start < a_end and b_start < b_end and a[a_start] == b[b_start]:
+            ops.append("equal")
+            a_start += 1
+            b_start += 1
+        suffix = 0
+        while a_start < a_end and b_start < b_end and a[a_end - 1] == b[b_end - 1]:
+            a_end -= 1
+            b_end -= 1
+            suffix += 1
+
+        if a_start == a_end:
+            ops.extend(["delete"] * (b_end - b_start))
+        elif b_start == b_end:
+            ops.extend(["insert"] * (a_end - a_start))
+        elif a_end - a_start == 1 or b_end - b_start == 1:
+            TextHandler.text_align_small(a, a_start, a_end, b, b_start, b_end, ops)
+        else:
+            middle = (a_start + a_end) // 2
+            forward = TextHandler.text_align_costs(a[a_start:middle], b[b_start:b_end])
+            backward = TextHandler.text_align_costs(a[middle:a_end][::-1], b[b_start:b_end][::-1])
+            split = int(np.argmin(forward + backward[::-1]))
+            TextHandler.text_align_range(a, a_start, middle, b, b_start, b_start + split, ops)
+            TextHandler.text_align_range(a, middle, a_end, b, b_start + split, b_end, ops)
+
+        ops.extend(["equal"] * suffix)
+
+    @staticmethod
+    def text_align_costs(a, b):
+        """
+        Computes the last row of the edit-distance table between a and every prefix of b in linear memory.
+
+        Each row is computed with NumPy: substitutions and deletions are vectorized over the row, and chains of
+        insertions are resolved with a cumulative minimum.
+
+        Args:
+            a (numpy.ndarray): First sequence of integer ids.
+            b (numpy.ndarray): Second sequence of integer ids.
+
+        Returns:
+            numpy.ndarray: Edit distance between a and b[:k] for every k.
+        """
+        steps = np.arange(len(b) + 1)
+        row = steps.copy()
+        for a_id in a:
+            previous = row
+            row = np.empty_like(previous)
+            row[0] = previous[0] + 1
+            row[1:] = np.minimum(previous[:-1] + (b != a_id), previous[1:] + 1)
+            row = np.minimum.accumulate(row - steps) + steps
+        return row
+
+    @staticmethod
+    def text_align_small(a, a_start, a_end, b, b_start, b_end, ops):
+        """
+        Aligns ranges where one side has a single word, which ends Hirschberg's recursion.
+
+        Args:
+            a (numpy.ndarray): Transcribed word ids.
+            a_start (int): Start of the transcribed range.
+            a_end (int): End of the transcribed range.
+            b (numpy.ndarray): Expected word ids.
+            b_start (int): Start of the expected range.
+            b_end (int): End of the expected range.
+            ops (list of str): Output list of operations.
+        """
+        if a_end - a_start == 1:
+            word = a[a_start]
+            others = b[b_start:b_end].tolist()
+            match = others.index(word) if word in others else 0
+            ops.extend(["delete"] * match)
+            ops.append("equal" if others[match] == word else "substitute")
+            ops.extend(["delete"] * (len(others) - match - 1))
+        else:
+            word = b[b_start]
+            others = a[a_start:a_end].tolist()
+            match = others.index(word) if word in others else 0
+            ops.extend(["insert"] * match)
+            ops.append("equal" if others[match] == word else "substitute")
+            ops.extend(["insert"] * (len(others) - match - 1))
+
+    @staticmethod
+    def text_score(alignment, transcribed_words, expected_words):
+        """
+        Computes word error rate, character error rate and similarity from a word alignment.
+
+        The character error rate is derived from the same alignment: substituted words contribute their character
+        edit distance, inserted and deleted words contribute their length.
+
+        Args:
+            alignment (list of tuple): Spans returned by text_align.
+            transcribed_words (list of str): Transcribed words.
+            expected_words (list of str): Expected words.
+
+        Returns:
+            dict: "wer", "cer" and "similarity" (share of matched words, as in difflib's ratio).
+        """
+        word_errors = char_errors = matched = 0
+        for op, t_start, t_end, e_start, e_end in alignment:
+            if op == "equal":
+                matched += t_end - t_start
+            elif op == "substitute":
+                word_errors += t_end - t_start
+                for t_word, e_word in zip(transcribed_words[t_start:t_end], expected_words[e_start:e_end]):
+                    t_codes = np.array([ord(ch) for ch in t_word])
+                    e_codes = np.array([ord(ch) for ch in e_word])
+                    char_errors += int(TextHandler.text_align_costs(t_codes, e_codes)[-1])
+            elif op == "insert":
+                word_errors += t_end - t_start
+                char_errors += sum(len(w) for w in transcribed_words[t_start:t_end])
+            else:
+                word_errors += e_end - e_start
+                char_errors += sum(len(w) for w in expected_words[e_start:e_end])
+
+        expected_chars = sum(len(w) for w in expected_words)
+        total_words = len(transcribed_words) + len(expected_words)
+        return {
+            "wer": word_errors / len(expected_words) if expected_words else float(bool(transcribed_words)),
+            "cer": char_errors / expected_chars if expected_chars else float(bool(transcribed_words)),
+            "similarity": 2 * matched / total_words if total_words else 1.0,
+        }
+
+    @staticmethod
+    def text_confidences(words, language: str = "en") -> dict:
+        """
+        Maps the words of a transcription, normalized like the transcribed text, to their confidence. A word that occurs
+        several times keeps its lowest confidence, so it is only trusted if every occurrence was recognized confidently.
+
+        Args:
+            words (list of tuple): (word, confidence) pairs, as returned by WhisperModel.whisper_transcribe_words.
+            language (str): Language code (e.g., "en").
+
+        Returns:
+            dict: Normalized words mapped to their confidence.
+        """
+        confidences = {}
+        for word, confidence in words:
+            for normalized in TextHandler.text_normalize(word, language).split():
+                confidences[normalized] = min(confidence, confidences.get(normalized, confidence))
+        return confidences
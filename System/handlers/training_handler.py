@@ -0,0 +1,98 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from System.handlers.log_handler import LogHandler
+from System.handlers.file_handler import FileHandler
+from System.handlers.errors_handler import ErrorsHandler
+from System.models.rules_model import RulesModel
+
+logger = LogHandler.log_get("training")
+
+class TrainingHandler:
+    """
+    A utility class for training the replacement rules of all users in bulk.
+
+    Every errors log under UserFiles/<user>/errors is trained in its own worker process. The content hash of the log
+    is stored in the rules file it produced, so logs that did not change since the last build are skipped. Rules files
+    are published atomically, so running sessions can hot-reload them at any time.
+
+    Methods:
+        training_user(user_dir, user_name, language, force=False) -> tuple:
+            Trains the rules of one user and language.
+        training_all(user_dir, workers=None, force=False) -> list:
+            Trains the rules of every user and language in parallel.
+    """
+    @staticmethod
+    def training_user(user_dir: str, user_name: str, language: str, force: bool = False):
+        """
+        Trains the replacement rules of one user and language from the whole errors log.
+
+        Args:
+            user_dir (str): Directory path for user files.
+            user_name (str): Name of the user.
+            language (str): Language code (e.g., "en").
+            force (bool): Retrain even if the errors log did not change since the last build.
+
+        Returns:
+            tuple: (user_name, language, status, records), where status is "trained" or "skipped".
+        """
+        errors_path = FileHandler.file_errors_create(language, user_name, user_dir)
+        stats_path = FileHandler.file_stats_create(language, user_name, user_dir)
+        model_path = FileHandler.file_model_create(language, user_name, user_dir)
+
+        source_hash = FileHandler.file_errors_hash(errors_path)
+        if not force and os.path.exists(model_path):
+            try:
+                if RulesModel.rules_load(model_path).source_hash == source_hash:
+                    return user_name, language, "skipped", 0
+            except ValueError as e:
+                logger.warning("Retraining unreadable rules file %s: %s", model_path, e)
+
+        # Only the errors logged since the last update of the statistics are streamed and counted
+        letter_errors, records = FileHandler.file_stats_sync(stats_path, errors_path)
+        replacement_rules = ErrorsHandler.errors_rules_generate(letter_errors)
+        FileHandler.file_model_update(model_path, replacement_rules, letter_errors, source_hash)
+        return user_name, language, "trained", records
+
+    @staticmethod
+    def training_all(user_dir: str, workers: int = None, force: bool = False) -> list:
+        """
+        Trains the replacement rules of every user and language found under UserFiles, in parallel processes.
+
+        Args:
+            user_dir (str): Directory path for user files.
+            workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+            force (bool): Retrain even the logs that did not change since the last build.
+
+        Returns:
+            list of tuple: (user_name, language, status, records) for every log, where status is "trained",
+            "skipped" or "failed".
+        """
+        targets = FileHandler.file_errors_discover(user_dir)
+        logger.info("Training rules for %d error logs...", len(targets))
+
+        results = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(TrainingHandler.training_user, user_dir, user_name, language, force): (user_name, language)
+                for user_name, language in targets
+            }
+            for future in as_completed(futures):
+                user_name, language = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error("Training failed for %s (%s): %s", user_name, language, e)
+                    result = (user_name, language, "failed", 0)
+                logger.info("%s (%s): %s, %d records", *result)
+                results.append(result)
+
+        trained = sum(1 for result in results if result[2] == "trained")
+        skipped = sum(1 for result in results if result[2] == "skipped")
+        logger.info("Bulk training completed... Trained: %d, skipped: %d, failed: %d",
+                    trained, skipped, len(results) - trained - skipped)
+        return sorted(results)
@@ -2,14 +2,19 @@
 # This code is for educational use only.
 # Do not reuse, copy, modify, or redistribute.
 
-from difflib import SequenceMatcher
-from melo.api import TTS
-
 from System.models.whisper_model import WhisperModel
 from System.models.correction_model import CorrectionModel
 from System.handlers.text_handler import TextHandler
 from System.handlers.audio_handler import AudioHandler
 from System.handlers.file_handler import FileHandler
+from System.handlers.metrics_handler import MetricsHandler
+from System.models.rules_model import RulesWatcher
+from System.models.lexicon_model import LexiconModel
+from System.models.bigram_model import BigramModel
+from System.models.store_model import StoreModel
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("system")
 
 class System:
     """
@@ -21,7 +26,7 @@ class System:
     Features:
     - Audio transcription using state-of-the-art models like Whisper.
     - Text normalization and comparison for identifying mismatched words.
-    - Error logging in CSV format for efficient debugging and review.
+    - Error logging in an append-only binary log for efficient debugging and review.
     - Interactive console-based interface for recording or loading audio.
     - Correction of transcribed text using predefined rules and models.
     - Synthesis of corrected text into speech using a TTS system.
@@ -30,12 +35,18 @@ class System:
     - WhisperModel: Handles speech-to-text transcription.
     - TextHandler: Provides text normalization and comparison utilities.
     - AudioHandler: Manages audio recording and selection.
-    - FileHandler: Manages file operations, such as logging errors.
+    - FileHandler: Manages file operations, such as logging errors and keeping the character confusion counts up to
+      date as errors are logged.
     - CorrectionModel: Applies error correction to transcribed text.
+    - LexiconModel: Combines the shared dictionary of a language with the personal vocabulary of the user.
+    - StoreModel: Keeps computed corrections on disk, shared by every session and worker.
     - TTS: Converts corrected text into audio.
+    - MetricsHandler: Records the latency of each pipeline stage.
 
     Methods:
     - __init__: Initializes default configuration for the Speech Aligner system.
+    - rules_swapped: Invalidates cached corrections after the replacement rules were reloaded.
+    - tts_get: Returns the TTS model of a language, importing and loading it on first use.
     - select_model: Selects and invokes the transcription model for audio processing.
     - process_audio: Normalizes and compares transcribed text against the expected text.
     - run_train_mode: Executes the main loop of the Speech Aligner system.
@@ -44,8 +55,10 @@ class System:
 
     Example:
         speech_aligner = System()
-        speech_aligner.run_train_mode(model_name="whisper", model_size="base", language="en", csv_path="errors.csv")
+        speech_aligner.run_train_mode(model_name="whisper", model_size="base", language="en", errors_path="errors.bin")
     """
+    tts_models = {}
+
     def __init__(self):
         """
         Initializes the Speech Aligner system (ASR-FA: Automatic Speech Recognition - Forced Alignment).
@@ -53,25 +66,95 @@ class System:
         self.model_name = None
         self.model_size = None
         self.language = "en"
-        self.csv_path = "errors_en.csv"
+        self.errors_path = "errors_en.bin"
+        self.stats_path = None
         self.expected_text = ""
+        self.word_confidences = False
+        self.confidences = None
+        self.teacher_forcing = False
+        self.word_timings = None
+        self.whisper = None
+
+    @staticmethod
+    def rules_swapped(old_rules, new_rules):
+        """
+        Invalidates the corrections cached for the previous replacement rules.
+
+        Args:
+            old_rules (RulesModel): Rules that were replaced.
+            new_rules (RulesModel): Rules now in use.
+        """
+        CorrectionModel.correction_cache_invalidate(old_rules.fingerprint)
+
+    @staticmethod
+    def tts_get(language: str, device: str = "cuda"):
+        """
+        Returns the MeloTTS model of a language. MeloTTS is imported and the model is loaded on the first synthesis, and
+        the model is reused by later utterances.
+
+        Args:
+            language (str): MeloTTS language code (e.g., "EN").
+            device (str): Device of the model. Use "cuda" if you have a GPU.
+
+        Returns:
+            melo.api.TTS: The model.
+        """
+        model = System.tts_models.get((language, device))
+        if model is None:
+            from melo.api import TTS
+
+            model = TTS(language=language, device=device)
+            System.tts_models[(language, device)] = model
+        return model
 
     def select_model(self, audio_path: str):
         """
         Selects the model to be used for transcribing audio to text.
 
+        In train mode the expected text is scored against the audio with teacher forcing, and only divergent spans are
+        decoded; recordings too long for that fall back to a full transcription. Recordings longer than one Whisper
+        window are split at silences and decoded in parallel chunks, keeping the word timestamps.
+
         Args:
             audio_path (str): Path to the audio file.
         """
         try:
             if self.model_name.lower() == "whisper":
-                model = WhisperModel(self.model_size)
-                transcribed_text = model.whisper_transcriber(audio_path, self.language)
+                if self.whisper is None or self.whisper.model_size != self.model_size:
+                    with MetricsHandler.metrics_span("model_load"):
+                        self.whisper = WhisperModel(self.model_size)
+                model = self.whisper
+                audio = WhisperModel.whisper_load(audio_path)  # Decoded once for every pass below
+                if self.teacher_forcing and self.expected_text:
+                    with MetricsHandler.metrics_span("transcribe"):
+                        scored = model.whisper_score(audio, self.language, self.expected_text)
+                    if scored is not None:
+                        transcribed_text, self.word_timings = scored
+                        return self.process_audio(transcribed_text)
+                    logger.info("Recording can't be scored against the expected text, running a full transcription...")
+
+                with MetricsHandler.metrics_span("transcribe"):
+                    decoded = model.whisper_transcribe_long(audio, self.language)
+                if decoded is not None:
+                    # Long recording, decoded in parallel chunks with word timestamps
+                    transcribed_text, chunks = decoded
+                    self.word_timings = [word for chunk in chunks for word in chunk["words"]]
+                    if self.word_confidences:
+                        self.confidences = TextHandler.text_confidences(
+                            [(word["word"], word["probability"]) for word in self.word_timings], self.language)
+                    return self.process_audio(transcribed_text)
+
+                with MetricsHandler.metrics_span("transcribe"):
+                    if self.word_confidences:
+                        transcribed_text, words = model.whisper_transcribe_words(audio, self.language)
+                        self.confidences = TextHandler.text_confidences(words, self.language)
+                    else:
+                        transcribed_text = model.whisper_transcriber(audio, self.language)
                 return self.process_audio(transcribed_text)
             else:
                 raise ValueError("Unsupported model. Select 'Whisper...'")
         except Exception as e:
-            print(f"Audio processing error: {e}")
+            logger.error("Audio processing error: %s", e)
             return None
 
     def process_audio(self, transcribed_text: str):
@@ -84,18 +167,30 @@ class System:
         Returns:
             str: Normalized transcribed text.
         """
-        normalized_transcribed = TextHandler.text_normalize(transcribed_text)
-        normalized_expected = TextHandler.text_normalize(self.expected_text)
+        with MetricsHandler.metrics_span("normalize"):
+            normalized_transcribed = TextHandler.text_normalize(transcribed_text, self.language)
+            normalized_expected = TextHandler.text_normalize(self.expected_text, self.language)
+
+        with MetricsHandler.metrics_span("compare"):
+            transcribed_words = normalized_transcribed.split()
+            expected_words = normalized_expected.split()
+            alignment = TextHandler.text_align(transcribed_words, expected_words)
+            incorrect, correct = TextHandler.text_substitutions(alignment, transcribed_words, expected_words)
+            score = TextHandler.text_score(alignment, transcribed_words, expected_words)
+
+        with MetricsHandler.metrics_span("errors_log"):
+            FileHandler.file_errors_update(self.errors_path, zip(incorrect, correct))
 
-        incorrect, correct = TextHandler.text_compare(normalized_transcribed, normalized_expected)
-        FileHandler.file_errors_update(self.csv_path, zip(incorrect, correct))
+        if self.stats_path and incorrect:
+            with MetricsHandler.metrics_span("errors_stats"):
+                FileHandler.file_stats_sync(self.stats_path, self.errors_path)
 
-        similarity = SequenceMatcher(None, normalized_expected, normalized_transcribed).ratio()
-        print(f"Similarity of text: {similarity * 100:.2f}%")
+        logger.info("Similarity of text: %.2f%% (WER: %.2f%%, CER: %.2f%%)",
+                    score["similarity"] * 100, score["wer"] * 100, score["cer"] * 100)
 
         return normalized_transcribed
 
-    def run_train_mode(self, model_name: str, model_size: str, language: str, csv_path: str):
+    def run_train_mode(self, model_name: str, model_size: str, language: str, errors_path: str, stats_path: str = None):
         """
         Runs the main loop for the Speech Aligner system (ASR-FA: Automatic Speech Recognition - Forced Alignment).
 
@@ -103,12 +198,17 @@ class System:
             model_name (str): The name of the model to use (e.g., "whisper").
             model_size (str): The size of the model to use (e.g., "turbo", "base").
             language (str): The language of the model to use (e.g., "en", "es", "ru").
-            csv_path (str): CSV file path.
+            errors_path (str): Errors log file path.
+            stats_path (str, optional): Path to the confusion-count store updated after every utterance.
         """
         self.language = language
         self.model_name = model_name
         self.model_size = model_size
-        self.csv_path = csv_path
+        self.errors_path = errors_path
+        self.stats_path = stats_path
+        self.teacher_forcing = True  # The expected text is known, so score it instead of decoding from scratch
+        if stats_path:
+            FileHandler.file_stats_sync(stats_path, errors_path)
 
         print("\nWelcome to the Speech Aligner System!")
         while True:
@@ -121,10 +221,12 @@ class System:
                 self.expected_text = input("Enter the expected text: ").strip()
                 duration = int(input("Enter recording duration (seconds): "))
                 audio_path = AudioHandler.audio_record(duration)
+                trace_id, token = MetricsHandler.metrics_trace_start()
                 try:
                     transcribed_text = self.select_model(audio_path)
-                    print(f"Transcribed: {transcribed_text}")
+                    logger.info("Transcribed: %s", transcribed_text)
                 finally:
+                    MetricsHandler.metrics_trace_end(token)
                     AudioHandler.audio_remove(audio_path)
 
             elif choice == "2":
@@ -132,17 +234,24 @@ class System:
                 audio_path = AudioHandler.audio_select()
 
                 if audio_path:
-                    transcribed_text = self.select_model(audio_path)
-                    print(f"Transcribed: {transcribed_text}")
+                    trace_id, token = MetricsHandler.metrics_trace_start()
+                    try:
+                        transcribed_text = self.select_model(audio_path)
+                        logger.info("Transcribed: %s", transcribed_text)
+                    finally:
+                        MetricsHandler.metrics_trace_end(token)
 
             elif choice == "3":
-                print("Saving data and exiting from Speech Aligner System... Goodbye!")
+                logger.info("Saving data and exiting from Speech Aligner System... Goodbye!")
+                MetricsHandler.metrics_dump()
+                FileHandler.file_errors_close()
+                WhisperModel.whisper_shutdown()
                 break
 
             else:
                 print("Invalid choice. Try again...")
 
-    def run_use_mode(self, model_name: str, model_size: str, language: str, model_path: str, method: str):
+    def run_use_mode(self, model_name: str, model_size: str, language: str, model_path: str, method: str, lexicon_path: str = None, bigram_path: str = None, base_path: str = None, store_path: str = None):
         """
         Processes real-time audio input, applies corrections, and synthesizes speech output.
 
@@ -152,36 +261,55 @@ class System:
             language (str): Language of the transcription model.
             model_path (str): Path to the correction model.
             method (str): Correction method to use.
+            lexicon_path (str, optional): Path to the personal vocabulary overlay of the user.
+            bigram_path (str, optional): Path to the bigram model used by the "beam" method.
+            base_path (str, optional): Path to the imported word list extending the shared dictionary.
+            store_path (str, optional): Path to the persistent correction store shared by all sessions.
         """
         self.language = language
         self.model_name = model_name
         self.model_size = model_size
+        self.word_confidences = True  # Confidently recognized words skip correction
+        lexicon = LexiconModel(language, lexicon_path, base_path)
+        bigram = BigramModel.bigram_get(language, bigram_path) if method == "beam" else None
+        store = StoreModel.store_get(store_path) if store_path else None
 
         replacement_rules = FileHandler.file_model_load(model_path)
         if replacement_rules is None:
-            print("Model is missing...")
+            logger.error("Model is missing...")
             exit()
+        watcher = RulesWatcher(model_path, replacement_rules, on_swap=System.rules_swapped)
 
         print("\nWelcome to the Speech Aligner System!")
         while True:
+            # Pick up rules published by a training run since the last utterance
+            replacement_rules = watcher.rules_poll()
+
             duration = int(input("Enter recording duration (seconds) or \"0\" to exit from system: "))
             if duration == 0:
+                MetricsHandler.metrics_dump()
+                FileHandler.file_errors_close()
+                WhisperModel.whisper_shutdown()
                 break
 
             audio_path = AudioHandler.audio_record(duration)
+            trace_id, token = MetricsHandler.metrics_trace_start()
             try:
                 transcribed_text = self.select_model(audio_path)
-                print(f"Transcribed text: {transcribed_text}")
+                logger.info("Transcribed text: %s", transcribed_text)
 
-                corrected_sentence = CorrectionModel.correction_start(transcribed_text, replacement_rules, method, language)
-                print("Corrected text:", corrected_sentence)
+                corrected_sentence = CorrectionModel.correction_text(transcribed_text, replacement_rules, method, language, lexicon=lexicon, bigram=bigram, confidences=self.confidences, store=store)
+                logger.info("Corrected text: %s", corrected_sentence)
 
-                model = TTS(language='EN', device='cuda')  # Use 'cuda', if you have GPU
-                model.tts_to_file(corrected_sentence, speaker_id=5, output_path="output.wav")
+                with MetricsHandler.metrics_span("tts_load"):
+                    model = System.tts_get('EN', device='cuda')  # Use 'cuda', if you have GPU
+                with MetricsHandler.metrics_span("tts_synthesize"):
+                    model.tts_to_file(corrected_sentence, speaker_id=5, output_path="output.wav")
             finally:
+                MetricsHandler.metrics_trace_end(token)
                 AudioHandler.audio_remove(audio_path)
 
-    def run_use_model_test(self, language: str, model_path: str, method: str):
+    def run_use_model_test(self, language: str, model_path: str, method: str, lexicon_path: str = None, bigram_path: str = None, base_path: str = None, store_path: str = None):
         """
         Allows testing of text correction rules and synthesis of corrected text.
 
@@ -189,23 +317,42 @@ class System:
             language (str): Language for the correction model.
             model_path (str): Path to the correction model.
             method (str): Correction method to use.
+            lexicon_path (str, optional): Path to the personal vocabulary overlay of the user.
+            bigram_path (str, optional): Path to the bigram model used by the "beam" method.
+            base_path (str, optional): Path to the imported word list extending the shared dictionary.
+            store_path (str, optional): Path to the persistent correction store shared by all sessions.
         """
         self.language = language
+        lexicon = LexiconModel(language, lexicon_path, base_path)
+        bigram = BigramModel.bigram_get(language, bigram_path) if method == "beam" else None
+        store = StoreModel.store_get(store_path) if store_path else None
 
         replacement_rules = FileHandler.file_model_load(model_path)
         if replacement_rules is None:
-            print("Model is missing...")
+            logger.error("Model is missing...")
             exit()
+        watcher = RulesWatcher(model_path, replacement_rules, on_swap=System.rules_swapped)
 
         print("\nWelcome to the Speech Aligner System!")
         while True:
+            replacement_rules = watcher.rules_poll()
+
             test_sentence = input("Enter a error suggestion for correction or \"exit\" to exit from system: ").strip()
             if test_sentence == "exit":
+                MetricsHandler.metrics_dump()
+                FileHandler.file_errors_close()
+                WhisperModel.whisper_shutdown()
                 break
 
-            corrected_sentence = CorrectionModel.correction_start(test_sentence, replacement_rules, method, language)
-            print("Corrected sentence: ", corrected_sentence)
+            trace_id, token = MetricsHandler.metrics_trace_start()
+            try:
+                corrected_sentence = CorrectionModel.correction_text(test_sentence, replacement_rules, method, language, lexicon=lexicon, bigram=bigram, store=store)
+                logger.info("Corrected sentence: %s", corrected_sentence)
 
-            model = TTS(language='ES', device='cuda')  # Use 'cuda', if you have GPU
-            model.tts_to_file(corrected_sentence, speaker_id=5, output_path="output.wav")
+                with MetricsHandler.metrics_span("tts_load"):
+                    model = System.tts_get('ES', device='cuda')  # Use 'cuda', if you have GPU
+                with MetricsHandler.metrics_span("tts_synthesize"):
+                    model.tts_to_file(corrected_sentence, speaker_id=5, output_path="output.wav")
+            finally:
+                MetricsHandler.metrics_trace_end(token)
 
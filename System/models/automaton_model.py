@@ -0,0 +1,87 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+from collections import deque
+
+class AutomatonModel:
+    """
+    An Aho–Corasick automaton over a fixed set of patterns, used to find every place in a word where a replacement rule
+    applies in a single left-to-right scan, however many rules there are.
+
+    The automaton is a trie of the patterns whose states are numbered from 0 (the root). Every state has a failure link
+    to the state of its longest proper suffix that is also a trie prefix, and the patterns ending at the state, including
+    the ones inherited through failure links.
+
+    Attributes:
+        patterns (tuple): The patterns the automaton was built from.
+        goto (list of dict): Trie transitions of every state.
+        fail (list of int): Failure link of every state.
+        output (list of tuple): Patterns ending at every state.
+
+    Methods:
+        automaton_search(text) -> list:
+            Finds all occurrences of the patterns in a text.
+    """
+    def __init__(self, patterns):
+        """
+        Builds the automaton.
+
+        Args:
+            patterns (iterable of str): The patterns to search for. Empty patterns are ignored.
+        """
+        self.patterns = tuple(sorted({pattern for pattern in patterns if pattern}))
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]
+
+        for pattern in self.patterns:
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] += (pattern,)
+
+        # Breadth-first, so the failure link of a state is final before its children are linked
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                link = self.fail[state]
+                while link and char not in self.goto[link]:
+                    link = self.fail[link]
+                link = self.goto[link].get(char, 0)
+                self.fail[next_state] = link if link != next_state else 0
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def __bool__(self):
+        return bool(self.patterns)
+
+    def automaton_search(self, text: str) -> list:
+        """
+        Finds all occurrences of the patterns in a text, overlapping ones included.
+
+        Args:
+            text (str): The text to scan.
+
+        Returns:
+            list of tuple: (start, pattern) of every occurrence, ordered by start position, then by pattern.
+        """
+        goto, fail, output = self.goto, self.fail, self.output
+        matches = []
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for pattern in output[state]:
+                matches.append((end - len(pattern), pattern))
+        matches.sort()
+        return matches
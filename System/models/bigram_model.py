@@ -0,0 +1,235 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import os
+import threading
+
+import numpy as np
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("bigram")
+
+class BigramModel:
+    """
+    A word bigram language model of one language, used to score corrections in the context of the previous word.
+
+    The model is built from the same corpora as the dictionaries of CorrectionModel (Brown for English, cess_esp for
+    Spanish, the UDHR for Russian) and stored compactly as NumPy arrays: word ids are positions in the vocabulary, unigram
+    counts are an int32 array indexed by id, and bigrams are a sorted uint64 array of keys (previous id * vocabulary size
+    + word id) with a parallel int32 array of counts, searched with binary search. Id 0 is the sentence start.
+
+    Probabilities interpolate the bigram estimate with an add-one unigram estimate:
+        P(word | previous) = lam * c(previous, word) / c(previous) + (1 - lam) * (c(word) + 1) / (N + V)
+
+    Attributes:
+        language (str): Language code of the model.
+        vocabulary (list of str): Words by id.
+        ids (dict): Words mapped to their ids.
+        unigrams (numpy.ndarray): Count of every word id.
+        keys (numpy.ndarray): Sorted bigram keys.
+        counts (numpy.ndarray): Count of every bigram key.
+        interpolation (float): Weight of the bigram estimate.
+
+    Methods:
+        bigram_get(language, file_path=None) -> BigramModel:
+            Returns the shared model of a language, loading or building it once per process.
+        bigram_build(language) -> BigramModel:
+            Builds the model of a language from its corpus.
+        bigram_dump(file_path):
+            Saves the model to a compressed NumPy archive.
+        bigram_load(file_path) -> BigramModel:
+            Loads a model from a compressed NumPy archive.
+        bigram_id(word) -> int:
+            Returns the id of a word, or -1 if it is unknown.
+        bigram_scores(previous_ids, word_ids) -> numpy.ndarray:
+            Returns the log probabilities of a batch of (previous, word) id pairs.
+    """
+    start = "<s>"
+    version = 1
+    bigram_models = {}
+    lock = threading.Lock()
+
+    def __init__(self, language: str, vocabulary, unigrams, keys, counts, interpolation: float = 0.7):
+        """
+        Initializes the model from its arrays.
+
+        Args:
+            language (str): Language code of the model.
+            vocabulary (list of str): Words by id, starting with the sentence start.
+            unigrams (numpy.ndarray): Count of every word id.
+            keys (numpy.ndarray): Sorted bigram keys.
+            counts (numpy.ndarray): Count of every bigram key.
+            interpolation (float): Weight of the bigram estimate.
+        """
+        self.language = language
+        self.vocabulary = list(vocabulary)
+        self.ids = {word: index for index, word in enumerate(self.vocabulary)}
+        self.unigrams = np.asarray(unigrams, dtype=np.int32)
+        self.keys = np.asarray(keys, dtype=np.uint64)
+        self.counts = np.asarray(counts, dtype=np.int32)
+        self.interpolation = interpolation
+
+        self.size = len(self.vocabulary)
+        self.unigram_log = np.log((self.unigrams.astype(np.float64) + 1) / (self.unigrams.sum() + self.size))
+        self.unknown_log = float(np.log(1 / (self.unigrams.sum() + self.size)))
+
+        # c(previous) counted as a left context, so the estimates of every previous word sum to one
+        self.contexts = np.bincount((self.keys // np.uint64(self.size)).astype(np.int64),
+                                    weights=self.counts, minlength=self.size)
+
+    @staticmethod
+    def bigram_get(language: str, file_path: str = None):
+        """
+        Returns the shared model of a language. It is loaded from file_path if the file exists, otherwise it is built
+        from the corpus and saved to file_path. Either happens once per process.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            file_path (str, optional): Path to the compressed model file.
+
+        Returns:
+            BigramModel: The model of the language.
+        """
+        with BigramModel.lock:
+            model = BigramModel.bigram_models.get(language)
+            if model is None:
+                if file_path and os.path.exists(file_path):
+                    model = BigramModel.bigram_load(file_path)
+                else:
+                    model = BigramModel.bigram_build(language)
+                    if file_path:
+                        model.bigram_dump(file_path)
+                BigramModel.bigram_models[language] = model
+        return model
+
+    @staticmethod
+    def bigram_sentences(language: str):
+        """
+        Yields the lowercase alphabetic words of every sentence of the corpus of a language.
+
+        Args:
+            language (str): Language code (e.g., "en").
+
+        Yields:
+            list of str: The words of one sentence.
+        """
+        from nltk.corpus import brown, cess_esp, udhr
+
+        if language == "en":
+            sentences = brown.sents()
+        elif language == "es":
+            sentences = cess_esp.sents()
+        elif language == "ru":
+            sentences = [udhr.words('Russian-Cyrillic')]  # The UDHR is not split into sentences
+        else:
+            raise ValueError(f"Language '{language}' is not supported...")
+
+        for sentence in sentences:
+            yield [w.lower() for w in sentence if w.isalpha()]
+
+    @staticmethod
+    def bigram_build(language: str):
+        """
+        Builds the model of a language from its corpus.
+
+        Args:
+            language (str): Language code (e.g., "en").
+
+        Returns:
+            BigramModel: The built model.
+        """
+        logger.info("Building the bigram model for '%s'...", language)
+        ids = {BigramModel.start: 0}
+        sequences = []
+        for sentence in BigramModel.bigram_sentences(language):
+            sequences.append([0] + [ids.setdefault(word, len(ids)) for word in sentence])
+
+        size = len(ids)
+        tokens = np.fromiter((token for sequence in sequences for token in sequence), dtype=np.int64)
+        # A bigram never crosses a sentence boundary: the first word of every sentence follows the start id
+        starts = np.cumsum([0] + [len(sequence) for sequence in sequences])[:-1]
+        follows = np.ones(len(tokens), dtype=bool)
+        follows[starts] = False
+        previous = np.concatenate([[0], tokens[:-1]])[follows]
+        keys, counts = np.unique(previous.astype(np.uint64) * np.uint64(size) + tokens[follows].astype(np.uint64),
+                                 return_counts=True)
+
+        vocabulary = sorted(ids, key=ids.get)
+        unigrams = np.bincount(tokens, minlength=size)
+        unigrams[0] = 0
+        logger.info("Bigram model built... Words: %d, bigrams: %d", size - 1, len(keys))
+        return BigramModel(language, vocabulary, unigrams, keys, counts)
+
+    def bigram_dump(self, file_path: str):
+        """
+        Saves the model to a compressed NumPy archive. The file is written to a temporary path and then renamed.
+
+        Args:
+            file_path (str): Path to the model file.
+        """
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        vocabulary = np.frombuffer("\n".join(self.vocabulary).encode('utf-8'), dtype=np.uint8)
+        temp_path = f"{file_path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(temp_path, version=np.array(BigramModel.version), language=np.array(self.language),
+                            vocabulary=vocabulary, unigrams=self.unigrams, keys=self.keys, counts=self.counts)
+        os.replace(temp_path, file_path)
+
+    @staticmethod
+    def bigram_load(file_path: str):
+        """
+        Loads a model from a compressed NumPy archive.
+
+        Args:
+            file_path (str): Path to the model file.
+
+        Returns:
+            BigramModel: The loaded model.
+
+        Raises:
+            ValueError: If the file is not a model of a supported version.
+        """
+        with np.load(file_path) as data:
+            if int(data["version"]) != BigramModel.version:
+                raise ValueError(f"'{file_path}' is not a bigram model of version {BigramModel.version}")
+            vocabulary = data["vocabulary"].tobytes().decode('utf-8').split("\n")
+            return BigramModel(str(data["language"]), vocabulary, data["unigrams"], data["keys"], data["counts"])
+
+    def bigram_id(self, word: str) -> int:
+        """
+        Returns the id of a word, or -1 if it is not in the vocabulary.
+        """
+        return self.ids.get(word, -1)
+
+    def bigram_scores(self, previous_ids, word_ids):
+        """
+        Returns the interpolated log probabilities of a batch of (previous, word) id pairs. Unknown words (id -1) get
+        the add-one probability of an unseen word; an unknown previous word falls back to the unigram estimate.
+
+        Args:
+            previous_ids (numpy.ndarray): Ids of the previous words.
+            word_ids (numpy.ndarray): Ids of the words.
+
+        Returns:
+            numpy.ndarray: Natural log probabilities.
+        """
+        previous_ids = np.asarray(previous_ids, dtype=np.int64)
+        word_ids = np.asarray(word_ids, dtype=np.int64)
+        known = word_ids >= 0
+        scores = np.full(len(word_ids), self.unknown_log)
+        scores[known] = self.unigram_log[word_ids[known]]
+
+        pairs = known & (previous_ids >= 0)
+        if pairs.any() and len(self.keys):
+            query = previous_ids[pairs].astype(np.uint64) * np.uint64(self.size) + word_ids[pairs].astype(np.uint64)
+            positions = np.minimum(np.searchsorted(self.keys, query), len(self.keys) - 1)
+            found = self.keys[positions] == query
+            bigram = np.where(found, self.counts[positions], 0) / np.maximum(self.contexts[previous_ids[pairs]], 1)
+            has_context = self.contexts[previous_ids[pairs]] > 0
+            lam = np.where(has_context, self.interpolation, 0.0)
+            scores[pairs] = np.log(lam * bigram + (1 - lam) * np.exp(scores[pairs]))
+        return scores
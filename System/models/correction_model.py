@@ -2,7 +2,8 @@
 # This code is for educational use only.
 # Do not reuse, copy, modify, or redistribute.
 
-from openai import OpenAI
+import os
+import threading
 from itertools import combinations, product
 from metaphone import doublemetaphone
 from collections import Counter
@@ -10,32 +11,115 @@ import nltk
 from nltk.corpus import brown, cess_esp, udhr # words
 from nltk.metrics.distance import edit_distance
 from nltk import pos_tag
-from nltk.tokenize import word_tokenize
+from nltk.tokenize import sent_tokenize, word_tokenize
+
+from System.handlers.metrics_handler import MetricsHandler
+from System.handlers.log_handler import LogHandler
+from System.models.rules_model import RulesModel
+from System.models.bigram_model import BigramModel
+from System.models.llm_model import LLMModel
+
+logger = LogHandler.log_get("correction")
+
+class CorpusTable(dict):
+    """
+    A per-language table whose entries are built on first access, so a language's corpus is only read when it is
+    first corrected, not when the module is imported.
+
+    Membership checks cover every supported language, loaded or not.
+
+    Attributes:
+        languages (tuple of str): Supported language codes.
+        build (callable): Builds the entry of a language.
+    """
+    def __init__(self, languages, build):
+        """
+        Initializes an empty table.
+
+        Args:
+            languages (tuple of str): Supported language codes.
+            build (callable): Called with a language code to build its entry.
+        """
+        super().__init__()
+        self.languages = tuple(languages)
+        self.build = build
+        self.lock = threading.RLock()
+
+    def __contains__(self, language):
+        return language in self.languages
+
+    def __missing__(self, language):
+        if language not in self.languages:
+            raise KeyError(language)
+        with self.lock:
+            if not dict.__contains__(self, language):
+                self[language] = self.build(language)
+        return dict.__getitem__(self, language)
 
 class CorrectionModel:
     """
     This class provides advanced spelling and grammar correction functionalities using various algorithms and external APIs.
     It includes methods for correction based on substitution rules, Levenshtein distance, phonetic similarity, and
-    context-aware approaches. The class leverages resources such as the NLTK library, the Brown corpus, and OpenAI's GPT API
-    to deliver accurate and context-sensitive corrections.
+    context-aware approaches. The class leverages resources such as the NLTK library, the Brown corpus, and a large language
+    model API to deliver accurate and context-sensitive corrections.
 
     Key Features:
     - Substitution rule-based corrections.
-    - Integration with OpenAI GPT API for grammar and spelling enhancements.
+    - Integration with a pooled, batched and cached LLM backend (LLMModel) for grammar and spelling enhancements.
     - Use of Levenshtein distance and phonetic similarity for word corrections.
     - Handling of common typographical errors (e.g., missing or extra letters, adjacent letter swaps).
     - Dictionary-based validation using the NLTK Brown corpus.
 
     Attributes:
-        word_freqs (Counter): A frequency counter of words in the Brown corpus, used for word frequency analysis.
-        dictionaries (set): A set of valid dictionary words derived from the Brown corpus with frequency > 1 and length > 1.
+        word_freqs (CorpusTable): Word frequency counters by language (Brown, cess_esp, UDHR), read on first access.
+        dictionaries (CorpusTable): Sets of valid dictionary words by language, the words with frequency > 1 and
+            length > 1, built on first access.
+        correction_cache (dict): Corrected words keyed by (language, rules fingerprint, lexicon fingerprint, lexicon
+            layers, dictionary size, kind, word). It is layered over the persistent StoreModel given to correction_start, if any.
+        correction_beam_width (int): Number of hypotheses kept by the beam decoder (env SPEECH_ALIGNER_BEAM_WIDTH).
+        correction_lattice_size (int): Number of candidates kept per word by the beam decoder.
+        correction_confidence_threshold (float): Transcription confidence from which a word is kept without
+            correction (env SPEECH_ALIGNER_CONFIDENCE).
 
     Methods:
-        correction_start(sentence, rules, model):
-            Corrects a given sentence using substitution rules and an optional model.
+        correction_resources():
+            Makes sure the NLTK corpora and models are downloaded, once per process.
+
+        correction_corpus(language) -> Counter:
+            Counts the words of the corpus of a language.
+
+        correction_dictionary(language) -> set:
+            Builds the dictionary of a language from its word frequencies.
+
+        correction_start(sentence, rules, model, language, lexicon=None, bigram=None, beam_width=None, confidences=None,
+                         store=None):
+            Corrects a given sentence using substitution rules, an optional model and an optional user lexicon.
+
+        correction_batch(sentences, rules, model, language, lexicon=None, bigram=None, beam_width=None,
+                         confidences=None, store=None) -> list:
+            Corrects a list of sentences, sending them to the LLM together for the "gpt" model.
+
+        correction_text(text, rules, model, language, lexicon=None, bigram=None, beam_width=None, confidences=None,
+                        store=None) -> str:
+            Corrects a text of one or more sentences.
+
+        correction_cached(words, rules, model, language, lexicon=None, store=None) -> dict:
+            Returns the corrections (or beam candidates) of words from the caches, computing the missing ones.
 
-        correction_gpt(sentence, api_key):
-            Corrects the grammar and spelling of a given sentence using OpenAI's GPT API.
+        correction_prefill(words, rules, model, language, store, lexicon=None, batch_size=1000) -> int:
+            Computes and stores the corrections of historical words ahead of time.
+
+        correction_lattice(word, rules, dictionary, word_freq, size):
+            Builds the scored candidate list of one word for the beam decoder.
+
+        correction_beam(lattices, bigram, beam_width):
+            Finds the most probable sentence through the candidate lattices with a bigram language model.
+
+        correction_cache_invalidate(fingerprint=None):
+            Drops cached corrections made with the given rules, or all of them.
+
+        correction_gpt(sentences):
+            Corrects the grammar and spelling of sentences with the configured LLM backend.
 
         correction_levenshtein(word):
             Finds the most probable correction using Levenshtein distance.
@@ -67,43 +151,111 @@ class CorrectionModel:
         correction_sentence(word, rules):
             Corrects a given word based on a set of transformation rules and dictionary validation.
     """
-    try:
-        nltk.data.find('corpora/words.zip')
-        nltk.data.find('corpora/brown.zip')
-        nltk.data.find('corpora/udhr.zip')
-        nltk.data.find('corpora/cess_esp.zip')
-        nltk.data.find('tokenizers/punkt_tab.zip')
-        nltk.data.find('taggers/averaged_perceptron_tagger_eng.zip')
-    except LookupError:
-        nltk.download('cess_esp')
-        nltk.download('udhr')
-        nltk.download('words')
-        nltk.download('brown')
-        nltk.download('punkt_tab')
-        nltk.download('averaged_perceptron_tagger_eng')
-
-    word_freqs = {
-        "en": Counter(w.lower() for w in brown.words() if w.isalpha()), # word_freq = Counter(brown.words())
-        "es": Counter(w.lower() for w in cess_esp.words() if w.isalpha()),
-        "ru": Counter(w.lower() for w in udhr.words('Russian-Cyrillic') if w.isalpha()),
-    }
-
-    dictionaries = {
-        "en": {word for word, freq in word_freqs["en"].items() if freq > 1 and len(word) > 1}, # dictionary = set(words.words())
-        "es": {word for word, freq in word_freqs["es"].items() if freq > 1 and len(word) > 1},
-        "ru": {word for word, freq in word_freqs["ru"].items() if freq > 1 and len(word) > 1},
-    }
+    languages = ("en", "es", "ru")
+    resources_ready = False
+    resources_lock = threading.Lock()
+
+    word_freqs = CorpusTable(languages, lambda language: CorrectionModel.correction_corpus(language))
+    dictionaries = CorpusTable(languages, lambda language: CorrectionModel.correction_dictionary(language))
+
+    correction_cache = {}
+    correction_cache_size = 50000
+    correction_max_changes = 3
+    correction_beam_width = int(os.environ.get("SPEECH_ALIGNER_BEAM_WIDTH", "8"))
+    correction_lattice_size = 5
+    correction_edit_penalty = 2.0
+    correction_confidence_threshold = float(os.environ.get("SPEECH_ALIGNER_CONFIDENCE", "0.9"))
+
+    @staticmethod
+    def correction_resources():
+        """
+        Makes sure the NLTK corpora, tokenizer and tagger are downloaded. The check runs once per process, on the first
+        correction or corpus access.
+        """
+        with CorrectionModel.resources_lock:
+            if CorrectionModel.resources_ready:
+                return
+            try:
+                nltk.data.find('corpora/words.zip')
+                nltk.data.find('corpora/brown.zip')
+                nltk.data.find('corpora/udhr.zip')
+                nltk.data.find('corpora/cess_esp.zip')
+                nltk.data.find('tokenizers/punkt_tab.zip')
+                nltk.data.find('taggers/averaged_perceptron_tagger_eng.zip')
+            except LookupError:
+                nltk.download('cess_esp')
+                nltk.download('udhr')
+                nltk.download('words')
+                nltk.download('brown')
+                nltk.download('punkt_tab')
+                nltk.download('averaged_perceptron_tagger_eng')
+            CorrectionModel.resources_ready = True
+
+    @staticmethod
+    def correction_corpus(language: str) -> Counter:
+        """
+        Counts the lowercase alphabetic words of the corpus of a language: Brown for English, cess_esp for Spanish and
+        the Russian UDHR.
+
+        Args:
+            language (str): Language code (e.g., "en").
+
+        Returns:
+            Counter: Word frequencies.
+        """
+        CorrectionModel.correction_resources()
+        with MetricsHandler.metrics_span("corpus_load"):
+            if language == "en":
+                words = brown.words()  # word_freq = Counter(brown.words())
+            elif language == "es":
+                words = cess_esp.words()
+            else:
+                words = udhr.words('Russian-Cyrillic')
+            word_freq = Counter(w.lower() for w in words if w.isalpha())
+        logger.info("Corpus loaded for '%s'... Number of words: %d", language, len(word_freq))
+        return word_freq
+
+    @staticmethod
+    def correction_dictionary(language: str) -> set:
+        """
+        Builds the dictionary of a language: the words of its corpus seen more than once and longer than one letter.
+
+        Args:
+            language (str): Language code (e.g., "en").
+
+        Returns:
+            set of str: Valid dictionary words.
+        """
+        word_freq = CorrectionModel.word_freqs[language]
+        return {word for word, freq in word_freq.items() if freq > 1 and len(word) > 1}  # dictionary = set(words.words())
 
     @staticmethod
-    def correction_start(sentence, rules, model, language):
+    def correction_start(sentence, rules, model, language, lexicon=None, bigram=None, beam_width=None, confidences=None,
+                         store=None):
         """
         Corrects a given sentence using substitution rules and an optional model.
 
+        With the "beam" model every word gets a small list of scored candidates and the sentence is decoded as a whole
+        with a bigram language model, so the previous word decides between candidates. Otherwise every word is
+        corrected independently.
+
+        If transcription confidences are given, words recognized with a confidence of at least
+        correction_confidence_threshold are kept as they are, without any candidate search. The share of skipped words
+        is logged and counted in the correction_words and correction_skipped metrics.
+
+        Corrections are looked up in the in-memory cache, then in the persistent store, and only computed if both miss.
+
         Args:
             sentence (str): The sentence to be corrected.
             rules (dict): A dictionary of substitution rules for character corrections.
-            model (str): The correction model to use. Can be "gpt" or any other for default correction.
+            model (str): The correction model to use. Can be "gpt", "beam" or any other for default correction.
             language (str): Language for correction (en, es, ru).
+            lexicon (LexiconModel, optional): Layered lexicon of the user, used instead of the base dictionary.
+            bigram (BigramModel, optional): Language model of the beam decoder. Defaults to the shared model.
+            beam_width (int, optional): Number of hypotheses kept by the beam decoder. Defaults to
+                correction_beam_width.
+            confidences (dict, optional): Normalized words of the transcription mapped to their confidence.
+            store (StoreModel, optional): Persistent correction cache shared with other processes.
 
         Returns:
             str: The corrected sentence.
@@ -111,54 +263,234 @@ class CorrectionModel:
         if language not in CorrectionModel.dictionaries:
             raise ValueError(f"Language '{language}' is not supported...")
 
-        word_freq = CorrectionModel.word_freqs[language]
-        dictionary = CorrectionModel.dictionaries[language]
-
-        print(f"Start of sentence correction: {sentence}")
-        word = word_tokenize(sentence)
-        tagged = pos_tag(word)
-
-        corrected_words = []
-        for word, tag in tagged:
-            corrected_word = CorrectionModel.correction_sentence(word, rules, dictionary, word_freq)
-            corrected_words.append(corrected_word)
-
+        CorrectionModel.correction_resources()
+        logger.debug("Start of sentence correction: %s", sentence)
+        with MetricsHandler.metrics_span("correction_tokenize"):
+            word = word_tokenize(sentence)
+            tagged = pos_tag(word)
+
+        threshold = CorrectionModel.correction_confidence_threshold
+        confident = [confidences is not None and confidences.get(word, 0.0) >= threshold for word, tag in tagged]
+        if confidences is not None:
+            skipped = sum(confident)
+            MetricsHandler.metrics_count("correction_words", len(tagged))
+            MetricsHandler.metrics_count("correction_skipped", skipped)
+            logger.info("Confident words kept without correction: %d of %d (%.1f%%)",
+                        skipped, len(tagged), 100 * skipped / max(len(tagged), 1))
+
+        words = [word for (word, tag), keep in zip(tagged, confident) if not keep]
+        with MetricsHandler.metrics_span("correction_candidates"):
+            corrections = CorrectionModel.correction_cached(words, rules, model, language, lexicon, store)
+
+        if model == "beam":
+            lattices = [[(word, 0.0)] if keep else corrections[word] for (word, tag), keep in zip(tagged, confident)]
+
+            with MetricsHandler.metrics_span("correction_beam"):
+                bigram = bigram or BigramModel.bigram_get(language)
+                corrected_words = CorrectionModel.correction_beam(
+                    lattices, bigram, beam_width or CorrectionModel.correction_beam_width)
+            return ' '.join(corrected_words)
+
+        corrected_words = [word if keep else corrections[word] for (word, tag), keep in zip(tagged, confident)]
         correct_sentence = ' '.join(corrected_words)
 
         if model == "gpt":
-            key = "sk-proj-sV-TBJnmbemdbeKqbjYeqpXqCQOqsKJC99qPEJfTR2FjLjMaZunqYe7YY-FXo_xBsod5-PinbT3BlbkFJIyJixWGUikAatS4teAgNc_o4xnqLQb-JHLboPRDFAAGRMSZ4EppfkqL-mi1FyfdyHDOOfI4k8A"
-            return CorrectionModel.correction_gpt(correct_sentence, key)
+            with MetricsHandler.metrics_span("correction_gpt"):
+                return CorrectionModel.correction_gpt([correct_sentence])[0]
         else:
             return correct_sentence
 
     @staticmethod
-    def correction_gpt(sentence, api_key):
+    def correction_batch(sentences, rules, model, language, lexicon=None, bigram=None, beam_width=None,
+                         confidences=None, store=None) -> list:
         """
-        Corrects the grammar and spelling of a given sentence using OpenAI's GPT API. This method uses OpenAI's
-        `text-davinci-003` model to perform grammar and spelling correction.
+        Corrects a list of sentences with correction_start. With the "gpt" model every sentence is corrected word by
+        word first and all of them go to the LLM backend in one correction_gpt call, so they share its batched requests
+        instead of sending one request per sentence.
 
         Args:
-            sentence (str): The input sentence to be corrected.
-            api_key (str): The API key required to authenticate with OpenAI's API.
+            sentences (list of str): The sentences to be corrected.
+            rules (dict): A dictionary of substitution rules for character corrections.
+            model (str): The correction model to use. Can be "gpt", "beam" or any other for default correction.
+            language (str): Language for correction (en, es, ru).
+            lexicon (LexiconModel, optional): Layered lexicon of the user, used instead of the base dictionary.
+            bigram (BigramModel, optional): Language model of the beam decoder. Defaults to the shared model.
+            beam_width (int, optional): Number of hypotheses kept by the beam decoder.
+            confidences (dict, optional): Normalized words of the transcription mapped to their confidence.
+            store (StoreModel, optional): Persistent correction cache shared with other processes.
 
         Returns:
-            str: The corrected sentence, as returned by the OpenAI API. If an error occurs,
-            the original sentence is returned.
+            list of str: The corrected sentences, in the order of the input.
+        """
+        word_model = "" if model == "gpt" else model
+        corrected_sentences = [
+            CorrectionModel.correction_start(sentence, rules, word_model, language, lexicon=lexicon, bigram=bigram,
+                                             beam_width=beam_width, confidences=confidences, store=store)
+            for sentence in sentences
+        ]
+        if model == "gpt" and corrected_sentences:
+            with MetricsHandler.metrics_span("correction_gpt"):
+                return CorrectionModel.correction_gpt(corrected_sentences)
+        return corrected_sentences
+
+    @staticmethod
+    def correction_text(text, rules, model, language, lexicon=None, bigram=None, beam_width=None, confidences=None,
+                        store=None) -> str:
+        """
+        Corrects a text of one or more sentences. The text is split into sentences, which are corrected together with
+        correction_batch, so a transcription of several sentences makes a single LLM call.
+
+        Args:
+            text (str): The text to be corrected.
+            rules (dict): A dictionary of substitution rules for character corrections.
+            model (str): The correction model to use. Can be "gpt", "beam" or any other for default correction.
+            language (str): Language for correction (en, es, ru).
+            lexicon (LexiconModel, optional): Layered lexicon of the user, used instead of the base dictionary.
+            bigram (BigramModel, optional): Language model of the beam decoder. Defaults to the shared model.
+            beam_width (int, optional): Number of hypotheses kept by the beam decoder.
+            confidences (dict, optional): Normalized words of the transcription mapped to their confidence.
+            store (StoreModel, optional): Persistent correction cache shared with other processes.
+
+        Returns:
+            str: The corrected text.
+        """
+        CorrectionModel.correction_resources()
+        sentences = sent_tokenize(text, language={"es": "spanish", "ru": "russian"}.get(language, "english")) or [text]
+        return ' '.join(CorrectionModel.correction_batch(sentences, rules, model, language, lexicon=lexicon,
+                                                         bigram=bigram, beam_width=beam_width,
+                                                         confidences=confidences, store=store))
+
+    @staticmethod
+    def correction_cached(words, rules, model, language, lexicon=None, store=None) -> dict:
+        """
+        Returns the correction of every word (or its beam candidates for the "beam" model). Words are looked up in the
+        in-memory cache first, the remaining ones in the persistent store with one batched query, and only the words
+        missing from both are computed. Computed entries are written to the store in one transaction.
+
+        Both keys cover the rules, the overlay of the user, the layers of the lexicon (none, a lexicon, or a lexicon
+        with a morphology) and the size of the shared dictionary (which grows when a word list is imported), so entries
+        are never reused with different rules or words.
+
+        Args:
+            words (list of str): Words to correct.
+            rules (dict): A dictionary of replacement rules.
+            model (str): The correction model; "beam" returns candidate lattices instead of corrected words.
+            language (str): Language for correction (en, es, ru).
+            lexicon (LexiconModel, optional): Layered lexicon of the user, used instead of the base dictionary.
+            store (StoreModel, optional): Persistent correction cache.
+
+        Returns:
+            dict: Words mapped to their correction or lattice.
+        """
+        word_freq = CorrectionModel.word_freqs[language] if lexicon is None else lexicon
+        dictionary = CorrectionModel.dictionaries[language] if lexicon is None else lexicon
+        cache = CorrectionModel.correction_cache
+        fingerprint = rules.fingerprint if isinstance(rules, RulesModel) else RulesModel.rules_fingerprint(rules, {})
+        lexicon_fingerprint = "" if lexicon is None else lexicon.fingerprint
+        layers = "base" if lexicon is None else "morphology" if lexicon.morphology is not None else "lexicon"
+        size = len(CorrectionModel.dictionaries[language])
+        kind = "lattice" if model == "beam" else "word"
+
+        corrections, missing = {}, []
+        for word in dict.fromkeys(words):
+            value = cache.get((language, fingerprint, lexicon_fingerprint, layers, size, kind, word))
+            if value is None:
+                missing.append(word)
+            else:
+                corrections[word] = value
+
+        found, computed = {}, {}
+        if store is not None and missing:
+            store_key = store.store_key(fingerprint, lexicon_fingerprint, layers, size, kind)
+            found = store.store_load(language, store_key, missing)
+            if kind == "lattice":
+                found = {word: [tuple(candidate) for candidate in lattice] for word, lattice in found.items()}
+            MetricsHandler.metrics_count("correction_store_hits", len(found))
+
+        for word in missing:
+            if word in found:
+                continue
+            if kind == "lattice":
+                computed[word] = CorrectionModel.correction_lattice(word, rules, dictionary, word_freq,
+                                                                    CorrectionModel.correction_lattice_size)
+            else:
+                computed[word] = CorrectionModel.correction_sentence(word, rules, dictionary, word_freq)
+
+        if store is not None and computed:
+            store.store_save(language, store_key, computed)
+
+        for word, value in {**found, **computed}.items():
+            if len(cache) >= CorrectionModel.correction_cache_size:
+                del cache[next(iter(cache))]  # Evict the oldest entry
+            cache[(language, fingerprint, lexicon_fingerprint, layers, size, kind, word)] = value
+            corrections[word] = value
+        return corrections
+
+    @staticmethod
+    def correction_prefill(words, rules, model, language, store, lexicon=None, batch_size: int = 1000) -> int:
+        """
+        Computes and stores the corrections of words ahead of time, e.g. of the incorrect words of historical error
+        logs, so new sessions find them in the store. Words already stored are skipped.
+
+        Args:
+            words (iterable of str): Words to correct. Duplicates are corrected once per batch.
+            rules (dict): A dictionary of replacement rules.
+            model (str): The correction model the entries are made for ("beam" or any other).
+            language (str): Language for correction (en, es, ru).
+            store (StoreModel): Persistent correction cache.
+            lexicon (LexiconModel, optional): Layered lexicon of the user.
+            batch_size (int): Number of distinct words corrected per batch.
+
+        Returns:
+            int: Number of distinct words processed.
+        """
+        processed, batch = 0, set()
+        for word in words:
+            if word.isalpha():
+                batch.add(word)
+            if len(batch) >= batch_size:
+                processed += len(CorrectionModel.correction_cached(list(batch), rules, model, language, lexicon, store))
+                batch = set()
+        if batch:
+            processed += len(CorrectionModel.correction_cached(list(batch), rules, model, language, lexicon, store))
+        return processed
+
+    @staticmethod
+    def correction_cache_invalidate(fingerprint=None):
+        """
+        Drops cached corrections made with the given rules, e.g. after the rules were reloaded.
+
+        Args:
+            fingerprint (str, optional): Fingerprint of the outdated rules. All entries are dropped if not given.
+        """
+        cache = CorrectionModel.correction_cache
+        if fingerprint is None:
+            cache.clear()
+            return
+        for key in [key for key in cache if key[1] == fingerprint]:
+            cache.pop(key, None)
+
+    @staticmethod
+    def correction_gpt(sentences):
+        """
+        Corrects the grammar and spelling of sentences with the configured LLM backend (see LLMModel). The backend
+        is shared, batches the sentences and caches the corrections.
+
+        Args:
+            sentences (list of str): The input sentences to be corrected.
+
+        Returns:
+            list of str: The corrected sentences. If the backend is not available, the original sentences are returned.
         """
-        client = OpenAI(api_key=api_key)
         try:
-            response = client.completions.create(
-                model="text-davinci-003",
-                prompt=f"Correct the grammar and spelling of this sentence: '{sentence}'",
-                max_tokens=100,
-                temperature=0.7
-            )
-            corrected_sentence = response.choices[0].text.strip()
-            print(f"Corrected proposal via GPT: {corrected_sentence}")
-            return corrected_sentence
+            backend = LLMModel.llm_get()
         except Exception as e:
-            print(f"Error while accessing OpenAI API: {e}")
-            return sentence
+            logger.error("LLM backend is not available: %s", e)
+            return list(sentences)
+
+        corrected_sentences = backend.llm_correct(sentences)
+        logger.info("Corrected proposal via LLM: %s", corrected_sentences)
+        return corrected_sentences
 
     @staticmethod
     def correction_levenshtein(word, dictionary, word_freq):
@@ -174,10 +506,13 @@ class CorrectionModel:
         Returns:
             str or None: The corrected word, or None if no correction is found.
         """
-        candidates_levenshtein = [
-            (w, edit_distance(word, w), word_freq[w])
-            for w in dictionary if abs(len(w) - len(word)) <= 2
-        ]
+        if hasattr(dictionary, "lexicon_similar"):
+            candidates_levenshtein = dictionary.lexicon_similar(word)  # Indexed lookup of a LexiconModel
+        else:
+            candidates_levenshtein = [
+                (w, edit_distance(word, w), word_freq[w])
+                for w in dictionary if abs(len(w) - len(word)) <= 2
+            ]
         candidates_levenshtein = sorted(candidates_levenshtein, key=lambda x: (x[1], -x[2]))
         if candidates_levenshtein:
             return candidates_levenshtein[0][0]
@@ -195,6 +530,9 @@ class CorrectionModel:
         Returns:
             str or None: The corrected word, or None if no correction is found.
         """
+        if hasattr(dictionary, "lexicon_phonetic"):
+            return dictionary.lexicon_phonetic(word)  # Indexed lookup of a LexiconModel
+
         metaphone_word = doublemetaphone(word)[0]
         phonetic_candidates = [
             w for w in dictionary if doublemetaphone(w)[0] == metaphone_word
@@ -263,24 +601,28 @@ class CorrectionModel:
         """
         matches = [w for w in possible_corrections if w in dictionary]
         if matches:
-            print(f"All matches in the dictionary: {matches}")
+            logger.debug("All matches in the dictionary: %s", matches)
             best_match = sorted(matches, key=lambda w: (word_freq[w], -len(w)), reverse=True)[0]
+            if hasattr(dictionary, "lexicon_listed") and not dictionary.lexicon_listed(best_match):
+                return best_match  # A form known only to the morphology, which the similarity indexes don't know
             corrected_word = CorrectionModel.correction_combined(best_match,dictionary, word_freq)
             if corrected_word:
-                print(f"The best candidate given the context: {corrected_word}")
+                logger.debug("The best candidate given the context: %s", corrected_word)
                 return corrected_word
             return best_match
         else:
-            print(f"No matches found, only combined algorithm used...")
+            logger.debug("No matches found, only combined algorithm used...")
             corrected_word = CorrectionModel.correction_combined(word, dictionary, word_freq)
             if corrected_word:
-                print(f"Best candidate by combined algorithm: {corrected_word}")
+                logger.debug("Best candidate by combined algorithm: %s", corrected_word)
                 return corrected_word
 
     @staticmethod
     def correction_insert_missing_letter(word, dictionary):
         """
-        Generates possible corrections by inserting missing letters into a word.
+        Generates possible corrections by inserting missing letters into a word. The letters are the alphabet of the
+        lexicon (English letters for a plain set), and insertions creating letter n-grams unseen in the lexicon are
+        rejected before the lookup.
 
         Args:
             word (str): The word to correct.
@@ -290,10 +632,13 @@ class CorrectionModel:
             set: A set of corrected words found in the dictionary.
         """
         corrections = set()
-        alphabet = "abcdefghijklmnopqrstuvwxyz"
+        alphabet = getattr(dictionary, "alphabet", "abcdefghijklmnopqrstuvwxyz")
+        ngrams = getattr(dictionary, "ngrams", None)
         for i in range(len(word) + 1):
             for char in alphabet:
                 temp = word[:i] + char + word[i:]
+                if ngrams is not None and not ngrams.ngram_allowed(temp, i, i + 1):
+                    continue
                 if temp in dictionary:
                     corrections.add(temp)
         return corrections
@@ -301,7 +646,8 @@ class CorrectionModel:
     @staticmethod
     def correction_remove_extra_letter(word, dictionary):
         """
-        Generates possible corrections by removing extra letters from a word.
+        Generates possible corrections by removing extra letters from a word. Removals joining letters into n-grams
+        unseen in the lexicon are rejected before the lookup.
 
         Args:
             word (str): The word to correct.
@@ -311,8 +657,11 @@ class CorrectionModel:
             set: A set of corrected words found in the dictionary.
         """
         corrections = set()
+        ngrams = getattr(dictionary, "ngrams", None)
         for i in range(len(word)):
             temp = word[:i] + word[i + 1:]
+            if ngrams is not None and not ngrams.ngram_allowed(temp, i, i):
+                continue
             if temp in dictionary:
                 corrections.add(temp)
         return corrections
@@ -320,7 +669,8 @@ class CorrectionModel:
     @staticmethod
     def correction_swap_adjacent_letter(word, dictionary):
         """
-        Generates possible corrections by swapping adjacent letters in a word.
+        Generates possible corrections by swapping adjacent letters in a word. Swaps creating letter n-grams unseen in
+        the lexicon are rejected before the lookup.
 
         Args:
             word (str): The word to correct.
@@ -330,10 +680,13 @@ class CorrectionModel:
             set: A set of corrected words found in the dictionary.
         """
         corrections = set()
+        ngrams = getattr(dictionary, "ngrams", None)
         for i in range(len(word) - 1):
             temp = list(word)
             temp[i], temp[i + 1] = temp[i + 1], temp[i]
             candidate = ''.join(temp)
+            if ngrams is not None and not ngrams.ngram_allowed(candidate, i, i + 2):
+                continue
             if candidate in dictionary:
                 corrections.add(candidate)
         return corrections
@@ -357,6 +710,12 @@ class CorrectionModel:
         """
         Generates all possible correction variants of a word based on given rules.
 
+        The rewrite sites of the word (every occurrence of an incorrect character or character sequence of the rules)
+        are found with one scan of the Aho–Corasick automaton of the rules. Candidates apply every combination of up to
+        correction_max_changes non-overlapping sites, so positions no rule applies to are never enumerated. When the
+        dictionary has letter n-grams (LexiconModel), a candidate whose rewritten regions contain an n-gram unseen in
+        the lexicon is not looked up.
+
         Args:
             word (str): The original word to modify.
             word_length (int): The maximum number of changes allowed.
@@ -367,22 +726,125 @@ class CorrectionModel:
         Returns:
             None: Modifies the possible_corrections set in place.
         """
-        for num_changes in range(1, word_length + 1):
-            for indices in combinations(range(len(word)), num_changes):
-                replacement_options = [rules.get(word[i], [word[i]]) for i in indices]
-                for replacements in product(*replacement_options):
-                    temp = list(word)
-                    for idx, replacement in zip(indices, replacements):
-                        temp[idx] = replacement
-                    candidate = ''.join(temp)
-                    if candidate in dictionary:
-                        possible_corrections.add(candidate)
-
-                    if not CorrectionModel.correction_pronoun_or_possessive(word):
+        replacements = RulesModel.rules_replacements(rules)
+        sites = RulesModel.rules_automaton(rules).automaton_search(word)
+        if not sites:
+            return
+
+        edit_candidates = not CorrectionModel.correction_pronoun_or_possessive(word)
+        ngrams = getattr(dictionary, "ngrams", None)
+        max_changes = min(word_length, CorrectionModel.correction_max_changes, len(sites))
+        for num_changes in range(1, max_changes + 1):
+            for chosen in combinations(sites, num_changes):
+                if any(start < previous_start + len(previous)
+                       for (previous_start, previous), (start, _) in zip(chosen, chosen[1:])):
+                    continue  # Overlapping sites cannot both be rewritten
+
+                for options in product(*(replacements[pattern] for _, pattern in chosen)):
+                    parts, regions, position, length = [], [], 0, 0
+                    for (start, pattern), replacement in zip(chosen, options):
+                        parts.append(word[position:start])
+                        parts.append(replacement)
+                        length += start - position
+                        regions.append((length, length + len(replacement)))
+                        length += len(replacement)
+                        position = start + len(pattern)
+                    parts.append(word[position:])
+                    candidate = ''.join(parts)
+                    if ngrams is None or all(ngrams.ngram_allowed(candidate, start, end) for start, end in regions):
+                        if candidate in dictionary:
+                            possible_corrections.add(candidate)
+
+                    if edit_candidates:
                         possible_corrections.update(CorrectionModel.correction_insert_missing_letter(candidate, dictionary))
                         possible_corrections.update(CorrectionModel.correction_remove_extra_letter(candidate, dictionary))
                         possible_corrections.update(CorrectionModel.correction_swap_adjacent_letter(candidate, dictionary))
 
+    @staticmethod
+    def correction_lattice(word, rules, dictionary, word_freq, size):
+        """
+        Builds the candidate list of one word for the beam decoder. The candidates are the ones correction_sentence
+        chooses from, plus the word itself, scored by a channel model: a penalty of correction_edit_penalty per edit
+        operation. Only the size best candidates, by channel score and then frequency, are kept.
+
+        Words that are not alphabetic (punctuation, numbers) are their only candidate.
+
+        Args:
+            word (str): The word to correct.
+            rules (dict): A dictionary of replacement rules.
+            dictionary (set of str): A set of valid words forming the dictionary.
+            word_freq (dict of str, int): A dictionary where keys are words and
+                values are their corresponding frequency scores.
+            size (int): Maximum number of candidates.
+
+        Returns:
+            list of tuple: (candidate, channel log score) pairs, best first.
+        """
+        if not word.isalpha():
+            return [(word, 0.0)]
+
+        possible_corrections = set()
+        CorrectionModel.correction_generate(word, len(word), rules, possible_corrections, dictionary)
+        if not CorrectionModel.correction_pronoun_or_possessive(word):
+            possible_corrections.update(CorrectionModel.correction_insert_missing_letter(word, dictionary))
+            possible_corrections.update(CorrectionModel.correction_remove_extra_letter(word, dictionary))
+            possible_corrections.update(CorrectionModel.correction_swap_adjacent_letter(word, dictionary))
+        if not possible_corrections:
+            combined = CorrectionModel.correction_combined(word, dictionary, word_freq)
+            if combined:
+                possible_corrections.add(combined)
+        possible_corrections.add(word)
+
+        penalty = CorrectionModel.correction_edit_penalty
+        lattice = [(w, -penalty * edit_distance(word, w), word_freq[w] if w in dictionary else 0)
+                   for w in possible_corrections]
+        lattice.sort(key=lambda x: (x[1], x[2]), reverse=True)
+        return [(w, score) for w, score, _ in lattice[:size]]
+
+    @staticmethod
+    def correction_beam(lattices, bigram, beam_width):
+        """
+        Finds the most probable sentence through the candidate lattices of its words.
+
+        Every hypothesis is scored by the channel scores of its candidates plus the bigram log probability of every
+        candidate given the previous one. Hypotheses ending in the same word are recombined (Viterbi), and only the
+        beam_width best are extended, so the cost per word is bounded by beam_width times the lattice size. Tokens that
+        are not words (punctuation, numbers) are passed through and don't change the context.
+
+        Args:
+            lattices (list of list): (candidate, channel log score) pairs of every token, as built by
+                correction_lattice.
+            bigram (BigramModel): The language model.
+            beam_width (int): Maximum number of hypotheses kept after every word.
+
+        Returns:
+            list of str: The decoded words.
+        """
+        # Hypotheses: (score, previous word id, back pointer), where the back pointer is (parent pointer, word)
+        beam = [(0.0, bigram.bigram_id(BigramModel.start), None)]
+        for lattice in lattices:
+            if not lattice[0][0].isalpha():
+                beam = [(score, previous, (pointer, lattice[0][0])) for score, previous, pointer in beam]
+                continue
+
+            candidate_ids = [bigram.bigram_id(candidate) for candidate, _ in lattice]
+            previous_ids = [previous for _, previous, _ in beam for _ in lattice]
+            scores = bigram.bigram_scores(previous_ids, candidate_ids * len(beam)).tolist()
+
+            best = {}
+            for h, (score, _, pointer) in enumerate(beam):
+                for c, (candidate, channel) in enumerate(lattice):
+                    total = score + channel + scores[h * len(lattice) + c]
+                    if candidate not in best or total > best[candidate][0]:
+                        best[candidate] = (total, candidate_ids[c], (pointer, candidate))
+            beam = sorted(best.values(), key=lambda x: x[0], reverse=True)[:beam_width]
+
+        words, pointer = [], max(beam, key=lambda x: x[0])[2]
+        while pointer is not None:
+            pointer, word = pointer
+            words.append(word)
+        return words[::-1]
+
     @staticmethod
     def correction_sentence(word, rules, dictionary, word_freq):
         """
@@ -393,6 +855,10 @@ class CorrectionModel:
             - Removing extra letters.
             - Swapping adjacent letters.
 
+        For languages with a morphology (see LexiconModel), a valid inflected form is kept unless a rule produces a more
+        frequent dictionary word; other forms of its lemma never compete with it. For other words the letter edits are
+        replaced by the forms of the plausible lemmas of the word.
+
         Filters candidates to retain only valid dictionary words. Prioritizes corrections based on:
             - Word frequency from the Brown corpus.
             - Word length (prefers longer matches).
@@ -409,14 +875,28 @@ class CorrectionModel:
         Returns:
             str: The corrected word or the original word if no better match is determined.
         """
-        print(f"Исправление слова: {word}")
+        logger.debug("Correcting word: %s", word)
         possible_corrections = set()
         CorrectionModel.correction_generate(word, len(word), rules, possible_corrections, dictionary)
 
+        if hasattr(dictionary, "lexicon_valid") and dictionary.lexicon_valid(word):
+            # A valid inflection, even if the corpus never saw it: only a more frequent rule correction of another
+            # lemma replaces it
+            lemmas = dictionary.morphology.morphology_lemmas(word)
+            ruled = [w for w in possible_corrections if w != word and w in dictionary
+                     and not lemmas & dictionary.morphology.morphology_lemmas(w)]
+            best_rule = max(ruled, key=lambda w: (word_freq[w], -len(w)), default=None)
+            if best_rule is not None and word_freq[best_rule] > word_freq[word]:
+                return best_rule
+            return word
+
         if word in dictionary:
             possible_corrections.add(word)
 
-        if not CorrectionModel.correction_pronoun_or_possessive(word):
+        forms = dictionary.lexicon_forms(word) if hasattr(dictionary, "lexicon_forms") else set()
+        if forms:
+            possible_corrections.update(forms)
+        elif not CorrectionModel.correction_pronoun_or_possessive(word):
             possible_corrections.update(CorrectionModel.correction_insert_missing_letter(word, dictionary))
             possible_corrections.update(CorrectionModel.correction_remove_extra_letter(word, dictionary))
             possible_corrections.update(CorrectionModel.correction_swap_adjacent_letter(word, dictionary))
@@ -425,5 +905,5 @@ class CorrectionModel:
         if matches:
             return matches
 
-        print(f"The word could not be corrected: {word}")
+        logger.debug("The word could not be corrected: %s", word)
         return word
@@ -0,0 +1,285 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import glob
+import hashlib
+import os
+import threading
+
+import numpy as np
+from metaphone import doublemetaphone
+from nltk.metrics.distance import edit_distance
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("index")
+
+class IndexModel:
+    """
+    Lookup indexes over a large word list, so finding similar words costs about the same for a thousand words as for
+    millions.
+
+    - Edit-distance index (SymSpell): every word is stored under its prefix of prefix_length characters and under every
+      deletion of up to max_distance characters from that prefix. The keys are kept as a sorted int64 array of string
+      hashes with a parallel int32 array of word ids, so the index is a few bytes per entry instead of a Python set of
+      strings. A query generates the deletions of its own prefix, looks them up with binary search and verifies the
+      few words found with a real edit distance. Every word within max_distance edits is found; a larger distance falls
+      back to scanning every word.
+    - Phonetic index: Double Metaphone code mapped to the most frequent word with that code. Encoding every word is
+      slow, so it is built on the first phonetic lookup.
+
+    Keys are hashed with a truncated BLAKE2b, which is the same in every process, so the index can be saved. Given a
+    path, the index is saved next to the dictionary it was built from as .npy files named after a fingerprint of the
+    words, their counts and the index parameters, and every other process memory-maps those files instead of building
+    the index again. The keys are hashed straight into arrays of chunk_words words each, so building the index holds
+    the deletions of a single word as Python strings on top of the arrays.
+
+    Attributes:
+        words (list of str): Words by id.
+        counts (numpy.ndarray): Frequency of every word id.
+        prefix_length (int): Number of leading characters indexed.
+        max_distance (int): Largest edit distance answered from the index (about 29 keys per word at distance 2).
+        chunk_words (int): Number of words whose keys are hashed at a time while building.
+        fingerprint (str): Content hash of the words, counts and index parameters.
+        hashes (numpy.ndarray): Sorted hashes of the index keys.
+        ids (numpy.ndarray): Word id of every key.
+
+    Methods:
+        index_hash(key) -> int:
+            Returns the stable 64-bit hash of an index key.
+        index_fingerprint() -> str:
+            Computes the content hash of the words, counts and index parameters.
+        index_build():
+            Builds the sorted key and id arrays.
+        index_paths(path) -> tuple:
+            Returns the paths of the saved arrays of this fingerprint.
+        index_load(path) -> bool:
+            Memory-maps the saved arrays of this fingerprint, if they exist.
+        index_save(path):
+            Atomically saves the arrays next to the dictionary.
+        index_deletes(word, distance) -> set:
+            Returns the strings obtained by deleting up to distance characters from a word.
+        index_similar(word, max_distance=2) -> list:
+            Returns the indexed words within an edit distance of a word.
+        index_phonetic(word) -> str:
+            Returns the most frequent indexed word that sounds like a word.
+    """
+    prefix_length = 7
+    max_distance = 2
+    chunk_words = 50000
+
+    def __init__(self, words, counts, path: str = None):
+        """
+        Loads the edit-distance index saved for these words, or builds it and saves it.
+
+        Args:
+            words (iterable of str): The words to index.
+            counts (iterable of int): Frequency of every word, in the same order.
+            path (str, optional): Path prefix of the saved index files, e.g. the word list without its extension. The
+                index is neither loaded nor saved without it.
+        """
+        self.words = list(words)
+        self.counts = np.fromiter(counts, dtype=np.int64, count=len(self.words))
+        self.phonetic = None
+        self.lock = threading.Lock()
+        self.fingerprint = self.index_fingerprint()
+
+        if path and self.index_load(path):
+            logger.info("Word index loaded... Words: %d, keys: %d", len(self.words), len(self.hashes))
+            return
+
+        self.index_build()
+        logger.info("Word index built... Words: %d, keys: %d", len(self.words), len(self.hashes))
+        if path:
+            try:
+                self.index_save(path)
+            except OSError as e:
+                logger.warning("Word index could not be saved to %s: %s", path, e)
+
+    @staticmethod
+    def index_hash(key: str) -> int:
+        """
+        Returns the hash of an index key, the first 8 bytes of its BLAKE2b digest as a signed integer.
+
+        Args:
+            key (str): The key.
+
+        Returns:
+            int: The hash, in the int64 range.
+        """
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), "little", signed=True)
+
+    def index_fingerprint(self) -> str:
+        """
+        Computes the content hash of the words, their counts and the index parameters.
+
+        Returns:
+            str: Hex digest naming the saved index files.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{IndexModel.prefix_length}:{IndexModel.max_distance}:{len(self.words)}".encode('utf-8'))
+        for start in range(0, len(self.words), IndexModel.chunk_words):
+            digest.update("\n".join(self.words[start:start + IndexModel.chunk_words]).encode('utf-8'))
+            digest.update(b"\n")
+        digest.update(self.counts.tobytes())
+        return digest.hexdigest()
+
+    def index_build(self):
+        """
+        Builds the sorted key and id arrays chunk by chunk. The deletions of one word at a time are held as strings.
+        """
+        def chunk_hashes(chunk, sizes):
+            for word in chunk:
+                deletes = IndexModel.index_deletes(word[:IndexModel.prefix_length], IndexModel.max_distance)
+                sizes.append(len(deletes))
+                for key in deletes:
+                    yield IndexModel.index_hash(key)
+
+        hash_chunks, id_chunks = [], []
+        for start in range(0, len(self.words), IndexModel.chunk_words):
+            chunk, sizes = self.words[start:start + IndexModel.chunk_words], []
+            hash_chunks.append(np.fromiter(chunk_hashes(chunk, sizes), dtype=np.int64))
+            id_chunks.append(np.repeat(np.arange(start, start + len(chunk), dtype=np.int32), sizes))
+
+        hashes = np.concatenate(hash_chunks) if hash_chunks else np.empty(0, dtype=np.int64)
+        ids = np.concatenate(id_chunks) if id_chunks else np.empty(0, dtype=np.int32)
+        del hash_chunks, id_chunks
+        order = np.argsort(hashes, kind="stable")
+        self.hashes = hashes[order]
+        del hashes  # Keeps the peak at about three arrays of hashes
+        self.ids = ids[order]
+
+    def index_paths(self, path: str) -> tuple:
+        """
+        Returns the paths of the saved hash and id arrays of this fingerprint.
+
+        Args:
+            path (str): Path prefix of the index files.
+
+        Returns:
+            tuple: (hashes path, ids path).
+        """
+        return f"{path}.{self.fingerprint}.hashes.npy", f"{path}.{self.fingerprint}.ids.npy"
+
+    def index_load(self, path: str) -> bool:
+        """
+        Memory-maps the arrays saved for this fingerprint, so processes share one copy through the page cache.
+
+        Args:
+            path (str): Path prefix of the index files.
+
+        Returns:
+            bool: True if the arrays were loaded.
+        """
+        hashes_path, ids_path = self.index_paths(path)
+        if not os.path.exists(hashes_path) or not os.path.exists(ids_path):
+            return False
+        try:
+            hashes = np.load(hashes_path, mmap_mode="r")
+            ids = np.load(ids_path, mmap_mode="r")
+        except (OSError, ValueError) as e:
+            logger.warning("Saved word index %s can't be read, rebuilding it: %s", hashes_path, e)
+            return False
+        if len(hashes) != len(ids):
+            return False
+        self.hashes, self.ids = hashes, ids
+        return True
+
+    def index_save(self, path: str):
+        """
+        Saves the arrays next to the dictionary. Each file is written under a temporary name and renamed, the hashes
+        last, so a reader never maps a partial file. Files of other fingerprints of the same path are removed.
+
+        Args:
+            path (str): Path prefix of the index files.
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        suffix = f"{os.getpid()}.{threading.get_ident()}.tmp"
+        hashes_path, ids_path = self.index_paths(path)
+        for file_path, array in ((ids_path, self.ids), (hashes_path, self.hashes)):
+            with open(f"{file_path}.{suffix}", 'wb') as f:
+                np.save(f, array)
+            os.replace(f"{file_path}.{suffix}", file_path)
+
+        for file_path in glob.glob(f"{glob.escape(path)}.*.hashes.npy") + glob.glob(f"{glob.escape(path)}.*.ids.npy"):
+            if file_path not in (hashes_path, ids_path):
+                try:
+                    os.remove(file_path)
+                except OSError:
+                    pass  # Still mapped by a process on a platform that forbids removing it
+
+    @staticmethod
+    def index_deletes(word: str, distance: int) -> set:
+        """
+        Returns the word and every string obtained by deleting up to distance characters from it.
+
+        Args:
+            word (str): The word.
+            distance (int): Maximum number of deleted characters.
+
+        Returns:
+            set of str: The word and its deletions.
+        """
+        deletes, frontier = {word}, {word}
+        for _ in range(distance):
+            frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+            deletes |= frontier
+        return deletes
+
+    def index_similar(self, word: str, max_distance: int = 2) -> list:
+        """
+        Returns the indexed words within an edit distance of a word.
+
+        Args:
+            word (str): The word to look up.
+            max_distance (int): Maximum edit distance.
+
+        Returns:
+            list of tuple: (word, distance, frequency) of every similar word.
+        """
+        if max_distance > IndexModel.max_distance:
+            word_ids = range(len(self.words))  # Deeper than the index, so every word is a candidate
+        else:
+            deletes = IndexModel.index_deletes(word[:IndexModel.prefix_length], max_distance)
+            query = np.fromiter((IndexModel.index_hash(key) for key in deletes), dtype=np.int64, count=len(deletes))
+            starts = np.searchsorted(self.hashes, query, side="left")
+            ends = np.searchsorted(self.hashes, query, side="right")
+            found = [self.ids[start:end] for start, end in zip(starts.tolist(), ends.tolist()) if end > start]
+            if not found:
+                return []
+            word_ids = np.unique(np.concatenate(found)).tolist()
+
+        similar = []
+        for word_id in word_ids:
+            candidate = self.words[word_id]
+            if abs(len(candidate) - len(word)) > max_distance:
+                continue
+            distance = edit_distance(word, candidate)
+            if distance <= max_distance:
+                similar.append((candidate, distance, int(self.counts[word_id])))
+        return similar
+
+    def index_phonetic(self, word: str):
+        """
+        Returns the most frequent indexed word with the same Double Metaphone code as a word. The phonetic index is built
+        on the first call.
+
+        Args:
+            word (str): The word to look up.
+
+        Returns:
+            str or None: The word found, or None.
+        """
+        with self.lock:
+            if self.phonetic is None:
+                phonetic = {}
+                for word_id in np.argsort(-self.counts, kind="stable").tolist():
+                    phonetic.setdefault(doublemetaphone(self.words[word_id])[0], word_id)
+                self.phonetic = phonetic
+                logger.info("Phonetic index built... Codes: %d", len(phonetic))
+
+        word_id = self.phonetic.get(doublemetaphone(word)[0])
+        return None if word_id is None else self.words[word_id]
@@ -0,0 +1,316 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import hashlib
+import json
+import os
+import threading
+
+from metaphone import doublemetaphone
+from nltk.metrics.distance import edit_distance
+
+from System.handlers.log_handler import LogHandler
+from System.handlers.lexicon_handler import LexiconHandler
+from System.models.correction_model import CorrectionModel
+from System.models.index_model import IndexModel
+from System.models.morphology_model import MorphologyModel
+from System.models.ngram_model import NgramModel
+
+logger = LogHandler.log_get("lexicon")
+
+class LexiconModel:
+    """
+    A layered lexicon: the shared base dictionary of a language plus a small per-user overlay.
+
+    The base layer is the word frequency counter and dictionary of CorrectionModel, loaded once per process and shared
+    by every user without copying. It can be extended with a large imported frequency list (see LexiconHandler), which
+    is loaded once per process as well. Similar-sounding and similar-looking words of the base layer are found through
+    an IndexModel built on first use, so lookups stay fast however large the base layer is. The overlay holds user-specific vocabulary such as names and jargon, with counts, and
+    is stored next to the rules of the user. For Russian and Spanish a MorphologyModel adds every valid inflection of a
+    known lemma to membership checks, without listing the forms. The alphabet and letter n-grams of the lexicon
+    (NgramModel) let candidate generation use the letters of the language and reject impossible edits early. A
+    LexiconModel can be passed wherever CorrectionModel expects a dictionary
+    (membership, iteration) or a word frequency mapping (item lookup returning 0 for unknown words); every lookup
+    consults both layers.
+
+    Attributes:
+        language (str): Language code of the base layer.
+        overlay_path (str): Path to the overlay file, or None for a base-only lexicon.
+        overlay (dict): User words mapped to their counts.
+        fingerprint (str): Content hash of the overlay, used in cache keys.
+        morphology (MorphologyModel): Morphology of the language, or None.
+        alphabet (str): Letters of the lexicon, most frequent first.
+        ngrams (NgramModel): Letter n-grams of every valid word: the tables of the language shared by all users, with
+            the n-grams of the overlay layered over them. None if the valid words are not all listed (Russian with
+            pymorphy3), so edits can't be pruned by n-grams.
+
+    Methods:
+        lexicon_base(language, base_path):
+            Extends the base layer of a language with an imported frequency list.
+        lexicon_index(language) -> IndexModel:
+            Returns the index of the base layer of a language.
+        lexicon_ngrams(language, morphology) -> NgramModel:
+            Returns the letter n-grams of the base layer of a language.
+        lexicon_similar(word, max_distance=2) -> list:
+            Returns the words of both layers within an edit distance of a word.
+        lexicon_phonetic(word) -> str:
+            Returns the most frequent word of both layers that sounds like a word.
+        lexicon_valid(word) -> bool:
+            Checks whether the morphology of the language knows a word.
+        lexicon_listed(word) -> bool:
+            Checks whether a word is listed in either layer.
+        lexicon_forms(word) -> set:
+            Returns the forms of the plausible lemmas of a word.
+        lexicon_add(word, count=1):
+            Adds a word to the overlay or raises its count.
+        lexicon_save():
+            Atomically saves the overlay to its file.
+    """
+    base_paths = {}
+    indexes = {}
+    ngram_models = {}
+    lock = threading.Lock()
+
+    def __init__(self, language: str, overlay_path: str = None, base_path: str = None):
+        """
+        Initializes the lexicon and loads the overlay of the user if it exists.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            overlay_path (str, optional): Path to the overlay file of the user.
+            base_path (str, optional): Path to the imported frequency list of the language, if any.
+        """
+        if language not in CorrectionModel.dictionaries:
+            raise ValueError(f"Language '{language}' is not supported...")
+        LexiconModel.lexicon_base(language, base_path)
+
+        self.language = language
+        self.base_freq = CorrectionModel.word_freqs[language]
+        self.base_words = CorrectionModel.dictionaries[language]
+        self.overlay_path = overlay_path
+        self.overlay = {}
+        self.morphology = MorphologyModel.morphology_get(language)
+
+        if overlay_path and os.path.exists(overlay_path):
+            with open(overlay_path, 'r', encoding='utf-8') as f:
+                self.overlay = json.load(f)["words"]
+            logger.info("Personal vocabulary loaded... Number of words: %d", len(self.overlay))
+        self.fingerprint = self.lexicon_fingerprint()
+
+        ngrams = LexiconModel.lexicon_ngrams(language, self.morphology)
+        self.alphabet = ngrams.alphabet
+        self.ngrams = ngrams
+        if self.morphology is not None and self.morphology.morphology_words() is None:
+            self.ngrams = None
+        elif self.overlay:
+            self.ngrams = NgramModel(self.overlay, base=ngrams)  # Only the n-grams of the overlay are held per user
+            self.alphabet = self.ngrams.alphabet
+
+    def __contains__(self, word):
+        return word in self.overlay or word in self.base_words or self.lexicon_valid(word)
+
+    def __getitem__(self, word):
+        return self.base_freq[word] + self.overlay.get(word, 0)
+
+    def __iter__(self):
+        yield from self.base_words
+        for word in self.overlay:
+            if word not in self.base_words:
+                yield word
+
+    def __len__(self):
+        return len(self.base_words) + sum(1 for word in self.overlay if word not in self.base_words)
+
+    @staticmethod
+    def lexicon_base(language: str, base_path: str):
+        """
+        Extends the base layer of a language with an imported frequency list. The list is streamed into the shared
+        word frequency counter and dictionary once per process; the index of the language is rebuilt on next use.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            base_path (str): Path to the frequency list. Nothing happens if it is None or does not exist.
+        """
+        if not base_path or not os.path.exists(base_path):
+            return
+
+        with LexiconModel.lock:
+            if LexiconModel.base_paths.get(language) == base_path:
+                return
+            word_freq = CorrectionModel.word_freqs[language]
+            dictionary = CorrectionModel.dictionaries[language]
+            for words, counts in LexiconHandler.lexicon_read(base_path):
+                for word, count in zip(words, counts):
+                    word_freq[word] += count
+                    dictionary.add(word)
+            LexiconModel.base_paths[language] = base_path
+            LexiconModel.indexes.pop(language, None)
+            LexiconModel.ngram_models.pop(language, None)
+        logger.info("Base lexicon extended from %s... Number of words: %d", base_path, len(dictionary))
+
+    @staticmethod
+    def lexicon_index(language: str):
+        """
+        Returns the index of the base layer of a language, building it on first use. With an imported word list the
+        index is saved next to it, so other processes memory-map it instead of building it again.
+
+        Args:
+            language (str): Language code (e.g., "en").
+
+        Returns:
+            IndexModel: The index of the base dictionary.
+        """
+        with LexiconModel.lock:
+            index = LexiconModel.indexes.get(language)
+            if index is None:
+                words = sorted(CorrectionModel.dictionaries[language])
+                word_freq = CorrectionModel.word_freqs[language]
+                base_path = LexiconModel.base_paths.get(language)
+                index = IndexModel(words, (word_freq[word] for word in words),
+                                   os.path.splitext(base_path)[0] if base_path else None)
+                LexiconModel.indexes[language] = index
+        return index
+
+    @staticmethod
+    def lexicon_ngrams(language: str, morphology=None):
+        """
+        Returns the letter n-grams of the base layer of a language, building them on first use. The listed forms of
+        the morphology are included, so no valid inflection is pruned.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            morphology (MorphologyModel, optional): Morphology of the language.
+
+        Returns:
+            NgramModel: The letter n-grams of the base dictionary.
+        """
+        with LexiconModel.lock:
+            ngrams = LexiconModel.ngram_models.get(language)
+            if ngrams is None:
+                ngrams = NgramModel(CorrectionModel.dictionaries[language])
+                forms = morphology.morphology_words() if morphology is not None else None
+                for form in forms or ():
+                    ngrams.ngram_add(form)
+                LexiconModel.ngram_models[language] = ngrams
+        return ngrams
+
+    def lexicon_similar(self, word: str, max_distance: int = 2) -> list:
+        """
+        Returns the words of both layers within an edit distance of a word. The base layer is searched through its
+        index, the small overlay is scanned.
+
+        Args:
+            word (str): The word to look up.
+            max_distance (int): Maximum edit distance.
+
+        Returns:
+            list of tuple: (word, distance, frequency) of every similar word.
+        """
+        similar = {candidate: distance
+                   for candidate, distance, _ in LexiconModel.lexicon_index(self.language).index_similar(word, max_distance)}
+        for candidate in self.overlay:
+            if candidate not in similar and abs(len(candidate) - len(word)) <= max_distance:
+                distance = edit_distance(word, candidate)
+                if distance <= max_distance:
+                    similar[candidate] = distance
+        return [(candidate, distance, self[candidate]) for candidate, distance in similar.items()]
+
+    def lexicon_phonetic(self, word: str):
+        """
+        Returns the most frequent word of both layers with the same Double Metaphone code as a word.
+
+        Args:
+            word (str): The word to look up.
+
+        Returns:
+            str or None: The word found, or None.
+        """
+        code = doublemetaphone(word)[0]
+        candidates = [candidate for candidate in self.overlay if doublemetaphone(candidate)[0] == code]
+        base = LexiconModel.lexicon_index(self.language).index_phonetic(word)
+        if base is not None:
+            candidates.append(base)
+        return max(candidates, key=lambda candidate: self[candidate], default=None)
+
+    def lexicon_valid(self, word: str) -> bool:
+        """
+        Checks whether the morphology of the language knows a word as a valid form.
+
+        Args:
+            word (str): The word to check.
+
+        Returns:
+            bool: True if the word is a valid form. Always False for languages without morphology.
+        """
+        return self.morphology is not None and self.morphology.morphology_known(word)
+
+    def lexicon_listed(self, word: str) -> bool:
+        """
+        Checks whether a word is listed in the base layer or the overlay, so the similarity indexes know it. Valid forms
+        known only to the morphology are not listed.
+
+        Args:
+            word (str): The word to check.
+
+        Returns:
+            bool: True if the word is listed.
+        """
+        return word in self.overlay or word in self.base_words
+
+    def lexicon_forms(self, word: str) -> set:
+        """
+        Returns the forms of the plausible lemmas of a word, the candidates of a morphology-aware correction.
+
+        Args:
+            word (str): The word to correct.
+
+        Returns:
+            set of str: The candidate forms. Empty for languages without morphology.
+        """
+        if self.morphology is None:
+            return set()
+        return self.morphology.morphology_forms(word)
+
+    def lexicon_fingerprint(self) -> str:
+        """
+        Computes the content hash of the overlay.
+
+        Returns:
+            str: Hex SHA-256 digest of the overlay, or an empty string if the overlay is empty.
+        """
+        if not self.overlay:
+            return ""
+        content = json.dumps(self.overlay, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    def lexicon_add(self, word: str, count: int = 1):
+        """
+        Adds a word to the overlay or raises its count.
+
+        Args:
+            word (str): The word to add. It is stored in lowercase.
+            count (int): Count to add to the frequency of the word.
+        """
+        word = word.strip().lower()
+        if word:
+            self.overlay[word] = self.overlay.get(word, 0) + count
+            self.fingerprint = self.lexicon_fingerprint()
+            if self.ngrams is not None:
+                if self.ngrams.base is None:
+                    self.ngrams = NgramModel(base=self.ngrams)  # Never change the tables shared by all users
+                self.ngrams.ngram_add(word)
+                self.alphabet = self.ngrams.alphabet
+
+    def lexicon_save(self):
+        """
+        Saves the overlay to its file. The file is written to a temporary path and then renamed.
+        """
+        if not self.overlay_path:
+            return
+
+        temp_path = f"{self.overlay_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "language": self.language, "words": self.overlay}, f, ensure_ascii=False)
+        os.replace(temp_path, self.overlay_path)
+        logger.info("Personal vocabulary saved... Number of words: %d", len(self.overlay))
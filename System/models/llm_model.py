@@ -0,0 +1,249 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("llm")
+
+class LLMModel:
+    """
+    A pluggable backend for sentence correction with a large language model.
+
+    A backend is created once per process and shared: it keeps one client, and with it one pool of HTTP connections, for
+    every request. Sentences are corrected in batches: the uncached sentences of a call are split into groups of
+    batch_size, every group is sent as one request, and at most concurrency requests are in flight at a time. Every
+    request has a timeout and is retried on transient errors. Corrections are cached by (sentence, model, prompt
+    version), so a repeated sentence is never sent again and a new prompt or model never returns stale results. When a
+    request finally fails, its sentences are returned unchanged and not cached.
+
+    Backends register themselves in llm_backends under a name; subclasses implement llm_complete.
+
+    Configuration is read from the environment:
+        SPEECH_ALIGNER_LLM_BACKEND: backend name (default "openai").
+        SPEECH_ALIGNER_LLM_API_KEY: API key (falls back to OPENAI_API_KEY).
+        SPEECH_ALIGNER_LLM_BASE_URL: API endpoint, e.g. a local mock server (default: the provider's endpoint).
+        SPEECH_ALIGNER_LLM_MODEL: model name (default "gpt-4o-mini").
+        SPEECH_ALIGNER_LLM_BATCH, SPEECH_ALIGNER_LLM_CONCURRENCY, SPEECH_ALIGNER_LLM_TIMEOUT, SPEECH_ALIGNER_LLM_RETRIES.
+
+    Attributes:
+        model (str): Model name.
+        batch_size (int): Maximum number of sentences per request.
+        concurrency (int): Maximum number of requests in flight.
+        timeout (float): Timeout of one request in seconds.
+        retries (int): Number of retries of a failed request.
+        cache (dict): Corrections keyed by (sentence, model, prompt version).
+
+    Methods:
+        llm_get(name=None) -> LLMModel:
+            Returns the shared backend configured in the environment.
+        llm_correct(sentences) -> list:
+            Corrects a list of sentences.
+        llm_batch(sentences) -> list:
+            Corrects one batch of sentences with one request and caches the result.
+        llm_complete(sentences) -> list:
+            Sends one batch of sentences to the model and returns the corrections.
+        llm_prompt(sentences) -> list:
+            Builds the chat messages of one batch.
+        llm_parse(content, sentences) -> list:
+            Extracts the corrections of one batch from the reply of the model.
+    """
+    prompt_version = 1
+    system_prompt = (
+        "You correct the grammar and spelling of sentences transcribed from speech. "
+        "You receive a JSON array of sentences and reply with a JSON array of the corrected sentences, "
+        "in the same order and with the same length, and nothing else. Keep the meaning and the wording; "
+        "return a sentence unchanged if it is already correct."
+    )
+    llm_backends = {}
+    llm_instances = {}
+    lock = threading.Lock()
+    cache_size = 10000
+
+    def __init__(self, model: str = None, batch_size: int = None, concurrency: int = None,
+                 timeout: float = None, retries: int = None):
+        """
+        Initializes the backend from arguments, falling back to the environment.
+
+        Args:
+            model (str, optional): Model name.
+            batch_size (int, optional): Maximum number of sentences per request.
+            concurrency (int, optional): Maximum number of requests in flight.
+            timeout (float, optional): Timeout of one request in seconds.
+            retries (int, optional): Number of retries of a failed request.
+        """
+        self.model = model or os.environ.get("SPEECH_ALIGNER_LLM_MODEL", "gpt-4o-mini")
+        self.batch_size = batch_size or int(os.environ.get("SPEECH_ALIGNER_LLM_BATCH", "8"))
+        self.concurrency = concurrency or int(os.environ.get("SPEECH_ALIGNER_LLM_CONCURRENCY", "4"))
+        self.timeout = timeout or float(os.environ.get("SPEECH_ALIGNER_LLM_TIMEOUT", "30"))
+        self.retries = retries if retries is not None else int(os.environ.get("SPEECH_ALIGNER_LLM_RETRIES", "3"))
+        self.cache = {}
+        self.cache_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="llm")
+
+    @staticmethod
+    def llm_get(name: str = None):
+        """
+        Returns the shared backend of the given name, creating it on first use.
+
+        Args:
+            name (str, optional): Backend name. Defaults to SPEECH_ALIGNER_LLM_BACKEND or "openai".
+
+        Returns:
+            LLMModel: The shared backend.
+        """
+        name = name or os.environ.get("SPEECH_ALIGNER_LLM_BACKEND", "openai")
+        with LLMModel.lock:
+            backend = LLMModel.llm_instances.get(name)
+            if backend is None:
+                if name not in LLMModel.llm_backends:
+                    raise ValueError(f"LLM backend '{name}' is not supported...")
+                backend = LLMModel.llm_backends[name]()
+                LLMModel.llm_instances[name] = backend
+        return backend
+
+    def llm_correct(self, sentences: list) -> list:
+        """
+        Corrects a list of sentences. Cached sentences are answered from the cache, the others are sent in batches.
+
+        Args:
+            sentences (list of str): Sentences to correct.
+
+        Returns:
+            list of str: The corrected sentences, in the order of the input.
+        """
+        results = {}
+        with self.cache_lock:
+            for sentence in sentences:
+                corrected = self.cache.get((sentence, self.model, self.prompt_version))
+                if corrected is not None:
+                    results[sentence] = corrected
+        pending = list(dict.fromkeys(sentence for sentence in sentences if sentence not in results))
+
+        batches = [pending[start:start + self.batch_size] for start in range(0, len(pending), self.batch_size)]
+        for batch, corrections in zip(batches, self.executor.map(self.llm_batch, batches)):
+            results.update(zip(batch, corrections))
+
+        logger.debug("LLM correction: %d sentences, %d from cache, %d requests",
+                     len(sentences), len(sentences) - len(pending), len(batches))
+        return [results[sentence] for sentence in sentences]
+
+    def llm_batch(self, sentences: list) -> list:
+        """
+        Corrects one batch of sentences with one request and caches the result.
+
+        Args:
+            sentences (list of str): Sentences of the batch.
+
+        Returns:
+            list of str: The corrected sentences, or the input sentences if the request failed.
+        """
+        try:
+            corrections = self.llm_complete(sentences)
+        except Exception as e:
+            logger.error("Error while accessing the LLM backend: %s", e)
+            return list(sentences)
+
+        with self.cache_lock:
+            for sentence, corrected in zip(sentences, corrections):
+                if len(self.cache) >= LLMModel.cache_size:
+                    del self.cache[next(iter(self.cache))]  # Evict the oldest entry
+                self.cache[(sentence, self.model, self.prompt_version)] = corrected
+        return corrections
+
+    def llm_complete(self, sentences: list) -> list:
+        """
+        Sends one batch of sentences to the model and returns the corrections. Implemented by every backend.
+
+        Args:
+            sentences (list of str): Sentences of the batch.
+
+        Returns:
+            list of str: The corrected sentences.
+        """
+        raise NotImplementedError
+
+    def llm_prompt(self, sentences: list) -> list:
+        """
+        Builds the chat messages of one batch.
+
+        Args:
+            sentences (list of str): Sentences of the batch.
+
+        Returns:
+            list of dict: Chat messages.
+        """
+        return [
+            {"role": "system", "content": LLMModel.system_prompt},
+            {"role": "user", "content": json.dumps(sentences, ensure_ascii=False)},
+        ]
+
+    @staticmethod
+    def llm_parse(content: str, sentences: list) -> list:
+        """
+        Extracts the corrections of one batch from the reply of the model. A reply that is not an array of the same
+        length is rejected, so a sentence is never paired with the correction of another.
+
+        Args:
+            content (str): Text of the reply.
+            sentences (list of str): Sentences of the batch.
+
+        Returns:
+            list of str: The corrected sentences.
+
+        Raises:
+            ValueError: If the reply is not a JSON array of one string per sentence.
+        """
+        start, end = content.find("["), content.rfind("]")
+        corrections = json.loads(content[start:end + 1]) if start >= 0 and end > start else None
+        if (not isinstance(corrections, list) or len(corrections) != len(sentences)
+                or not all(isinstance(corrected, str) for corrected in corrections)):
+            raise ValueError(f"Unexpected reply for a batch of {len(sentences)} sentences")
+        return [corrected.strip() for corrected in corrections]
+
+class OpenAIModel(LLMModel):
+    """
+    LLM backend for the OpenAI chat completions API or any server compatible with it (such as the local mock server in
+    benchmarks/llm_mock.py). The client, and its connection pool, is created once and shared by all requests.
+
+    Methods:
+        llm_complete(sentences) -> list:
+            Sends one batch of sentences to the chat completions API.
+    """
+    def __init__(self, **kwargs):
+        """
+        Initializes the backend and its client. The key and endpoint are read from the environment.
+        """
+        super().__init__(**kwargs)
+        from openai import OpenAI
+
+        self.client = OpenAI(
+            api_key=os.environ.get("SPEECH_ALIGNER_LLM_API_KEY") or os.environ.get("OPENAI_API_KEY"),
+            base_url=os.environ.get("SPEECH_ALIGNER_LLM_BASE_URL") or None,
+            timeout=self.timeout,
+            max_retries=self.retries,
+        )
+
+    def llm_complete(self, sentences: list) -> list:
+        """
+        Sends one batch of sentences to the chat completions API.
+
+        Args:
+            sentences (list of str): Sentences of the batch.
+
+        Returns:
+            list of str: The corrected sentences.
+        """
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=self.llm_prompt(sentences),
+            temperature=0.0,
+        )
+        return LLMModel.llm_parse(response.choices[0].message.content, sentences)
+
+LLMModel.llm_backends["openai"] = OpenAIModel
@@ -0,0 +1,248 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import importlib
+import importlib.util
+import threading
+from collections import Counter, defaultdict
+
+from nltk.metrics.distance import edit_distance
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("morphology")
+
+class MorphologyModel:
+    """
+    A morphological lexicon that stores lemmas with their inflection paradigms instead of every surface form.
+
+    - Russian uses the pymorphy3 dictionary (OpenCorpora), which is itself stored as lemmas plus paradigms. A word is
+      valid if the analyzer knows it, and the forms of a lemma are its lexeme. pymorphy2 is used if pymorphy3 is not
+      installed; with neither, or if the analyzer fails to load, Russian has no morphology.
+    - Spanish uses a lemma + suffix-paradigm table derived from the tagged cess_esp corpus: every stem observed with two
+      or more suffixes is assigned the most common paradigm (set of suffixes seen with at least min_stems stems of the
+      same part of speech) that contains all of them. A form is valid if it splits into a known stem and a suffix of the
+      paradigm of that stem, so inflections missing from the corpus are accepted as well.
+
+    Candidate forms of a misrecognized word are limited to the forms of plausible lemmas: the lemmas of the valid words
+    one edit away from it (with the alphabet of the language). Only forms within max_distance edits are kept.
+
+    Attributes:
+        language (str): Language code.
+        alphabet (str): Letters of the language used to generate one-edit variants.
+        analyzer (pymorphy3.MorphAnalyzer): Russian analyzer, or None.
+        stems (dict): Spanish stems mapped to the ids of their paradigms.
+        paradigms (list of frozenset): Spanish suffix sets by id.
+
+    Methods:
+        morphology_get(language) -> MorphologyModel:
+            Returns the shared morphology of a language, or None if it has none or it failed to load.
+        morphology_analyzer() -> str:
+            Returns the name of the installed Russian analyzer package.
+        morphology_build(tagged_words, max_suffix=5, min_stems=5):
+            Derives the stem and paradigm tables from part-of-speech tagged words.
+        morphology_known(word) -> bool:
+            Checks whether a word is a valid form.
+        morphology_lemmas(word) -> set:
+            Returns the lemmas of a valid word.
+        morphology_forms(word, max_distance=2) -> set:
+            Returns the forms of the plausible lemmas of a word.
+        morphology_words() -> generator:
+            Lists every valid form, if the morphology can do so cheaply.
+    """
+    alphabets = {
+        "ru": "абвгдеёжзийклмнопрстуфхцчшщъыьэюя",
+        "es": "abcdefghijklmnopqrstuvwxyzáéíóúüñ",
+    }
+    analyzers = ("pymorphy3", "pymorphy2")
+    morphology_models = {}
+    lock = threading.Lock()
+
+    def __init__(self, language: str):
+        """
+        Initializes the morphology of a language.
+
+        Args:
+            language (str): "ru" or "es".
+        """
+        self.language = language
+        self.alphabet = MorphologyModel.alphabets[language]
+        self.analyzer = None
+        self.stems = {}
+        self.paradigms = []
+        self.max_suffix = 0
+
+        if language == "ru":
+            # Imported with the first Russian lexicon, its dictionary takes a while to load
+            self.analyzer = importlib.import_module(MorphologyModel.morphology_analyzer()).MorphAnalyzer()
+        else:
+            from nltk.corpus import cess_esp
+            self.morphology_build((word.lower(), tag[:1].lower()) for word, tag in cess_esp.tagged_words())
+
+    @staticmethod
+    def morphology_get(language: str):
+        """
+        Returns the shared morphology of a language, creating it on first use.
+
+        Args:
+            language (str): Language code (e.g., "ru").
+
+        Returns:
+            MorphologyModel: The morphology, or None if the language has none, its analyzer is not installed or it
+            failed to load. A failure is logged once and not retried.
+        """
+        if language not in MorphologyModel.alphabets:
+            return None
+        if language == "ru" and MorphologyModel.morphology_analyzer() is None:
+            return None  # The analyzer is optional: without it Russian has no morphology
+
+        with MorphologyModel.lock:
+            if language not in MorphologyModel.morphology_models:
+                try:
+                    MorphologyModel.morphology_models[language] = MorphologyModel(language)
+                except Exception as e:  # e.g. pymorphy2 on Python 3.11+, which calls the removed inspect.getargspec
+                    logger.warning("Morphology for '%s' failed to load, correcting without it: %s", language, e)
+                    MorphologyModel.morphology_models[language] = None
+            return MorphologyModel.morphology_models[language]
+
+    @staticmethod
+    def morphology_analyzer():
+        """
+        Returns the name of the installed Russian analyzer package, preferring the maintained pymorphy3 fork.
+
+        Returns:
+            str: "pymorphy3" or "pymorphy2", or None if neither is installed.
+        """
+        for name in MorphologyModel.analyzers:
+            if importlib.util.find_spec(name) is not None:
+                return name
+        return None
+
+    def morphology_build(self, tagged_words, max_suffix: int = 5, min_stems: int = 5):
+        """
+        Derives the stem and paradigm tables from part-of-speech tagged words.
+
+        Args:
+            tagged_words (iterable of tuple): (lowercase word, part of speech) pairs.
+            max_suffix (int): Maximum length of a suffix.
+            min_stems (int): Minimum number of stems sharing a suffix set for it to be a paradigm.
+        """
+        # Every split of every word is a candidate (stem, suffix) pair, grouped by part of speech
+        suffixes = defaultdict(set)
+        words = {(word, pos) for word, pos in tagged_words if word.isalpha() and len(word) > 2}
+        for word, pos in words:
+            for k in range(min(max_suffix, len(word) - 2) + 1):
+                suffixes[(pos, word[:len(word) - k])].add(word[len(word) - k:])
+
+        observed = {key: frozenset(found) for key, found in suffixes.items() if len(found) >= 2}
+        signatures = Counter((pos, found) for (pos, _), found in observed.items())
+        productive = [(pos, found) for (pos, found), count in signatures.most_common() if count >= min_stems]
+
+        # Paradigms containing a suffix, by part of speech, in order of productivity
+        by_suffix = defaultdict(list)
+        for paradigm_id, (pos, found) in enumerate(productive):
+            for suffix in found:
+                by_suffix[(pos, suffix)].append(paradigm_id)
+
+        stems = defaultdict(set)
+        for (pos, stem), found in observed.items():
+            candidates = None
+            for suffix in found:
+                ids = set(by_suffix.get((pos, suffix), ()))
+                candidates = ids if candidates is None else candidates & ids
+                if not candidates:
+                    break
+            if candidates:
+                stems[stem].add(min(candidates))  # The most productive paradigm
+
+        self.paradigms = [found for _, found in productive]
+        self.stems = {stem: tuple(sorted(ids)) for stem, ids in stems.items()}
+        self.max_suffix = max_suffix
+        logger.info("Morphology built for '%s'... Stems: %d, paradigms: %d (from %d forms)",
+                    self.language, len(self.stems), len(self.paradigms), len(words))
+
+    def morphology_known(self, word: str) -> bool:
+        """
+        Checks whether a word is a valid form of a known lemma.
+
+        Args:
+            word (str): Lowercase word.
+
+        Returns:
+            bool: True if the word is valid.
+        """
+        if self.analyzer is not None:
+            return self.analyzer.word_is_known(word)
+        return bool(self.morphology_lemmas(word))
+
+    def morphology_lemmas(self, word: str) -> set:
+        """
+        Returns the lemmas of a valid word. A Russian lemma is its normal form, a Spanish lemma is a (stem, paradigm id)
+        pair.
+
+        Args:
+            word (str): Lowercase word.
+
+        Returns:
+            set: The lemmas, empty if the word is not valid.
+        """
+        if self.analyzer is not None:
+            return {parse.normal_form for parse in self.analyzer.parse(word) if parse.is_known}
+
+        lemmas = set()
+        for k in range(min(self.max_suffix, len(word) - 2) + 1):
+            stem, suffix = word[:len(word) - k], word[len(word) - k:]
+            for paradigm_id in self.stems.get(stem, ()):
+                if suffix in self.paradigms[paradigm_id]:
+                    lemmas.add((stem, paradigm_id))
+        return lemmas
+
+    def morphology_forms(self, word: str, max_distance: int = 2) -> set:
+        """
+        Returns the forms of the plausible lemmas of a word: the lemmas of the word itself and of every valid word one
+        edit away from it. Only forms within max_distance edits of the word are returned.
+
+        Args:
+            word (str): Lowercase word.
+            max_distance (int): Maximum edit distance of a returned form.
+
+        Returns:
+            set of str: The candidate forms.
+        """
+        splits = [(word[:i], word[i:]) for i in range(len(word) + 1)]
+        variants = {word}
+        variants.update(left + right[1:] for left, right in splits if right)
+        variants.update(left + right[1] + right[0] + right[2:] for left, right in splits if len(right) > 1)
+        variants.update(left + char + right[1:] for left, right in splits if right for char in self.alphabet)
+        variants.update(left + char + right for left, right in splits for char in self.alphabet)
+
+        lemmas = set()
+        for variant in variants:
+            lemmas |= self.morphology_lemmas(variant)
+
+        forms = set()
+        for lemma in lemmas:
+            if self.analyzer is not None:
+                for parse in self.analyzer.parse(lemma):
+                    if parse.is_known and parse.normal_form == lemma:
+                        forms.update(form.word for form in parse.lexeme)
+            else:
+                stem, paradigm_id = lemma
+                forms.update(stem + suffix for suffix in self.paradigms[paradigm_id])
+
+        return {form for form in forms
+                if abs(len(form) - len(word)) <= max_distance and edit_distance(word, form) <= max_distance}
+
+    def morphology_words(self):
+        """
+        Lists every valid form of the Spanish paradigm table. The Russian dictionary has millions of forms, so it is not
+        listed.
+
+        Returns:
+            generator or None: The valid forms, or None if they are not listed.
+        """
+        if self.analyzer is not None:
+            return None
+        return (stem + suffix for stem, ids in self.stems.items() for paradigm_id in ids
+                for suffix in self.paradigms[paradigm_id])
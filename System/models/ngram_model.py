@@ -0,0 +1,97 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+from collections import Counter
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("ngram")
+
+class NgramModel:
+    """
+    The alphabet and the letter bigrams and trigrams of a lexicon, used to reject edit candidates before any dictionary
+    lookup.
+
+    Words are padded with "^" and "$", so n-grams at the start and end of words are distinguished. An edit (inserting,
+    substituting, deleting or swapping letters) only creates the n-grams that overlap the edited region; if any of them
+    never occurs in the lexicon, the candidate cannot be a word of the lexicon and is dropped. The check is exact for
+    the words the tables were built from.
+
+    A model can be layered over a base model: it holds only the n-grams of its own words and checks both, so the
+    n-grams of a personal vocabulary are kept per user while the tables of the language are shared without copying.
+
+    Attributes:
+        alphabet (str): Letters of the lexicon, those of the base first, then the others most frequent first.
+        bigrams (set of str): Letter bigrams of the padded words, not counting the base.
+        trigrams (set of str): Letter trigrams of the padded words, not counting the base.
+        base (NgramModel): The model this one is layered over, or None.
+
+    Methods:
+        ngram_add(word):
+            Adds the letters and n-grams of a word.
+        ngram_allowed(word, start, end) -> bool:
+            Checks the n-grams overlapping an edited region of a word.
+    """
+    def __init__(self, words=(), base=None):
+        """
+        Builds the tables from a word list.
+
+        Args:
+            words (iterable of str): The words of the lexicon.
+            base (NgramModel, optional): Model to layer the tables over. It is never modified.
+        """
+        letters = Counter()
+        self.bigrams = set()
+        self.trigrams = set()
+        for word in words:
+            letters.update(word)
+            padded = f"^{word}$"
+            self.bigrams.update(padded[i:i + 2] for i in range(len(padded) - 1))
+            self.trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+        self.base = base
+        alphabet = base.alphabet if base is not None else ""
+        self.alphabet = alphabet + "".join(letter for letter, _ in letters.most_common()
+                                           if letter.isalpha() and letter not in alphabet)
+        logger.debug("Letter n-grams built... Letters: %d, bigrams: %d, trigrams: %d",
+                     len(self.alphabet), len(self.bigrams), len(self.trigrams))
+
+    def ngram_add(self, word: str):
+        """
+        Adds the letters and n-grams of a word, e.g. of a word added to a personal vocabulary.
+
+        Args:
+            word (str): The word.
+        """
+        for letter in word:
+            if letter.isalpha() and letter not in self.alphabet:
+                self.alphabet += letter
+        padded = f"^{word}$"
+        self.bigrams.update(padded[i:i + 2] for i in range(len(padded) - 1))
+        self.trigrams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    def ngram_allowed(self, word: str, start: int, end: int) -> bool:
+        """
+        Checks the n-grams of a candidate that overlap its edited region. For a deletion the region is empty
+        (start == end) and the n-grams across the junction are checked.
+
+        Args:
+            word (str): The candidate word.
+            start (int): Start of the edited region in the candidate.
+            end (int): End of the edited region in the candidate.
+
+        Returns:
+            bool: False if the edit created a bigram or trigram never seen in the lexicon.
+        """
+        padded = f"^{word}$"
+        start, end = start + 1, end + 1
+        base = self.base
+        for i in range(max(0, start - 1), min(len(padded) - 1, end)):
+            bigram = padded[i:i + 2]
+            if bigram not in self.bigrams and (base is None or bigram not in base.bigrams):
+                return False
+        for i in range(max(0, start - 2), min(len(padded) - 2, end)):
+            trigram = padded[i:i + 3]
+            if trigram not in self.trigrams and (base is None or trigram not in base.trigrams):
+                return False
+        return True
@@ -0,0 +1,327 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import hashlib
+import json
+import os
+import pickle
+import threading
+
+from System.handlers.log_handler import LogHandler
+from System.models.automaton_model import AutomatonModel
+
+logger = LogHandler.log_get("rules")
+
+class _RulesUnpickler(pickle.Unpickler):
+    """
+    Unpickles only built-in containers and scalars. Loading any class or function is refused, so a crafted pickle
+    can't run code.
+    """
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Refusing to load '{module}.{name}' from a legacy rules pickle")
+
+class RulesModel(dict):
+    """
+    A compiled set of replacement rules stored in a versioned, non-executable file format.
+
+    The model behaves like the plain rules dictionary (incorrect character or character sequence mapped to its
+    correction) used everywhere in the system, and additionally carries structures precomputed at compile time, so
+    consumers don't rebuild them:
+    - replacements: incorrect sequence mapped to the tuple of sequences it is replaced with during candidate
+      generation.
+    - automaton: Aho–Corasick automaton over the incorrect sequences, built on first use, which finds every rewrite
+      site of a word in one scan.
+    - weights: incorrect character mapped to {correct character: confusion weight} from the error statistics.
+    - fingerprint: SHA-256 of the rules and weights, used as a cache key.
+    - source_hash: SHA-256 of the errors log the rules were trained from, used to skip unchanged logs.
+
+    The file is a single JSON document, so it is loaded with one read and loading it cannot execute code:
+        {"format": "speech-aligner-rules", "version": 1, "fingerprint": ..., "source_hash": ..., "rules": ...,
+         "weights": ..., "replacements": ...}
+
+    The model must be treated as read-only; build a new one with rules_compile to change the rules.
+
+    Attributes:
+        weights (dict): Confusion weights of the incorrect characters.
+        replacements (dict): Replacement tuples of the incorrect characters.
+        automaton (AutomatonModel): Automaton over the incorrect sequences, or None until first used.
+        fingerprint (str): Content hash of the rules and weights.
+        source_hash (str): Content hash of the errors log the rules were trained from, if known.
+
+    Methods:
+        rules_compile(rules, errors=None, source_hash=None) -> RulesModel:
+            Compiles a rules dictionary and optional error statistics into a model.
+        rules_replacements(rules) -> dict:
+            Returns the replacement tuples of a model or of a plain rules dictionary.
+        rules_automaton(rules) -> AutomatonModel:
+            Returns the automaton over the incorrect sequences of a model or of a plain rules dictionary.
+        rules_dump(file_path):
+            Atomically publishes the model to a rules file.
+        rules_load(file_path) -> RulesModel:
+            Loads a model from a rules file.
+        rules_convert(pickle_path, file_path) -> RulesModel:
+            Converts a legacy pickled rules dictionary into a rules file.
+    """
+    format_name = "speech-aligner-rules"
+    version = 1
+
+    def __init__(self, rules=None, weights=None, source_hash=None):
+        """
+        Initializes the model and precomputes its lookup structures.
+
+        Args:
+            rules (dict, optional): Incorrect characters mapped to their corrections.
+            weights (dict, optional): Incorrect characters mapped to {correct character: confusion weight}.
+            source_hash (str, optional): Content hash of the errors log the rules were trained from.
+        """
+        super().__init__(rules or {})
+        self.weights = weights or {}
+        self.source_hash = source_hash
+        self.replacements = {incorrect: (correct,) for incorrect, correct in self.items()}
+        self.automaton = None
+        self.fingerprint = RulesModel.rules_fingerprint(dict(self), self.weights)
+
+    @staticmethod
+    def rules_fingerprint(rules, weights) -> str:
+        """
+        Computes the content hash of rules and weights.
+
+        Args:
+            rules (dict): Incorrect characters mapped to their corrections.
+            weights (dict): Confusion weights.
+
+        Returns:
+            str: Hex SHA-256 digest of the canonical JSON encoding.
+        """
+        content = json.dumps({"rules": rules, "weights": weights}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def rules_compile(rules, errors=None, source_hash=None):
+        """
+        Compiles a rules dictionary and the error statistics it was generated from into a model.
+
+        Args:
+            rules (dict): Incorrect characters mapped to their corrections.
+            errors (dict, optional): Correct characters mapped to counters of incorrect characters, as returned by
+                ErrorsHandler.errors_analyze.
+            source_hash (str, optional): Content hash of the errors log the rules were trained from.
+
+        Returns:
+            RulesModel: The compiled model.
+        """
+        weights = {}
+        for correct_letter, incorrect_counts in (errors or {}).items():
+            total_errors = sum(incorrect_counts.values())
+            for incorrect_letter, count in incorrect_counts.items():
+                if correct_letter and incorrect_letter:
+                    weights.setdefault(incorrect_letter, {})[correct_letter] = count / total_errors
+        return RulesModel(rules, weights, source_hash)
+
+    @staticmethod
+    def rules_replacements(rules) -> dict:
+        """
+        Returns the replacement tuples used for candidate generation.
+
+        Args:
+            rules (dict): A RulesModel or a plain rules dictionary.
+
+        Returns:
+            dict: Incorrect characters mapped to tuples of replacement characters.
+        """
+        if isinstance(rules, RulesModel):
+            return rules.replacements
+        return {incorrect: (correct,) for incorrect, correct in rules.items()}
+
+    @staticmethod
+    def rules_automaton(rules):
+        """
+        Returns the Aho–Corasick automaton over the incorrect sequences of the rules. The automaton of a model is built
+        once, on first use, and kept with the model.
+
+        Args:
+            rules (dict): A RulesModel or a plain rules dictionary.
+
+        Returns:
+            AutomatonModel: The automaton over the incorrect sequences.
+        """
+        if not isinstance(rules, RulesModel):
+            return AutomatonModel(rules)
+        if rules.automaton is None:
+            rules.automaton = AutomatonModel(rules.replacements)
+        return rules.automaton
+
+    def rules_dump(self, file_path: str):
+        """
+        Saves the model to a rules file. The file is written to a temporary path, synced and then renamed over the
+        target, so a running session watching the file never reads a partially written model.
+
+        Args:
+            file_path (str): Path to the rules file.
+        """
+        data = {
+            "format": RulesModel.format_name,
+            "version": RulesModel.version,
+            "fingerprint": self.fingerprint,
+            "source_hash": self.source_hash,
+            "rules": dict(self),
+            "weights": self.weights,
+            "replacements": {incorrect: list(options) for incorrect, options in self.replacements.items()},
+        }
+        temp_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(data, ensure_ascii=False, sort_keys=True))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+
+    @staticmethod
+    def rules_load(file_path: str):
+        """
+        Loads a model from a rules file.
+
+        Args:
+            file_path (str): Path to the rules file.
+
+        Returns:
+            RulesModel: The loaded model.
+
+        Raises:
+            ValueError: If the file is not a rules file of a supported version or its content does not match the
+                stored fingerprint.
+        """
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.loads(f.read())
+
+        if data.get("format") != RulesModel.format_name or data.get("version") != RulesModel.version:
+            raise ValueError(f"'{file_path}' is not a rules file of version {RulesModel.version}")
+
+        model = RulesModel.__new__(RulesModel)
+        dict.__init__(model, data["rules"])
+        model.weights = data["weights"]
+        model.replacements = {incorrect: tuple(options) for incorrect, options in data["replacements"].items()}
+        model.automaton = None
+        model.fingerprint = data["fingerprint"]
+        model.source_hash = data.get("source_hash")
+
+        if RulesModel.rules_fingerprint(data["rules"], data["weights"]) != model.fingerprint:
+            raise ValueError(f"Rules file '{file_path}' is corrupted: fingerprint mismatch")
+        return model
+
+    @staticmethod
+    def rules_convert(pickle_path: str, file_path: str):
+        """
+        Converts a legacy pickled rules dictionary into a rules file. The pickle is read with an unpickler that
+        refuses every class and function, so only a plain dictionary of strings loads and a crafted file can't run code.
+
+        Args:
+            pickle_path (str): Path to the legacy pickle file.
+            file_path (str): Path to the rules file to write.
+
+        Returns:
+            RulesModel: The converted model.
+
+        Raises:
+            ValueError: If the pickle is not a plain dictionary of strings.
+        """
+        with open(pickle_path, 'rb') as f:
+            try:
+                rules = _RulesUnpickler(f).load()
+            except (pickle.UnpicklingError, EOFError) as e:
+                raise ValueError(f"'{pickle_path}' is not a legacy rules pickle: {e}") from e
+
+        if not isinstance(rules, dict) or not all(isinstance(incorrect, str) and isinstance(correct, str)
+                                                  for incorrect, correct in rules.items()):
+            raise ValueError(f"'{pickle_path}' is not a legacy rules pickle: expected a dictionary of strings")
+
+        model = RulesModel(rules)
+        model.rules_dump(file_path)
+        logger.info("Converted legacy rules model %s to %s", pickle_path, file_path)
+        return model
+
+class RulesWatcher:
+    """
+    Watches a rules file and swaps in new rules published by another session (e.g., a training run).
+
+    The watcher is polled between utterances. A poll only compares the modification time and size of the file with the
+    last seen values. When they change, the new model is loaded in a background thread, so the pipeline is never
+    blocked; it is swapped in by the first poll after loading completed, if its fingerprint differs from the current one.
+
+    Attributes:
+        file_path (str): Path to the watched rules file.
+        rules (RulesModel): The rules currently in use.
+        on_swap (callable): Called with (old_rules, new_rules) after a swap, e.g. to invalidate caches.
+
+    Methods:
+        rules_poll() -> RulesModel:
+            Returns the rules to use for the next utterance.
+    """
+    def __init__(self, file_path: str, rules, on_swap=None):
+        """
+        Initializes the watcher.
+
+        Args:
+            file_path (str): Path to the watched rules file.
+            rules (RulesModel): The rules loaded from the file.
+            on_swap (callable, optional): Called with (old_rules, new_rules) after a swap.
+        """
+        self.file_path = file_path
+        self.rules = rules
+        self.on_swap = on_swap
+        self.signature = self.rules_signature()
+        self.loaded = None
+        self.loader = None
+        self.lock = threading.Lock()
+
+    def rules_signature(self):
+        """
+        Returns the modification time and size of the rules file, or None if it does not exist.
+        """
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def rules_load(self, signature):
+        """
+        Loads the rules file in the background and stores the result for the next poll.
+
+        Args:
+            signature (tuple): File signature the load was started for.
+        """
+        try:
+            model = RulesModel.rules_load(self.file_path)
+        except (OSError, ValueError) as e:
+            logger.warning("Could not reload rules from %s: %s", self.file_path, e)
+            model = None
+        with self.lock:
+            self.loaded = model
+            self.signature = signature
+            self.loader = None
+
+    def rules_poll(self):
+        """
+        Returns the rules to use for the next utterance, starting a background reload if the file changed.
+
+        Returns:
+            RulesModel: The current rules, or the newly published ones once they are loaded.
+        """
+        with self.lock:
+            loaded, self.loaded = self.loaded, None
+            loading = self.loader is not None
+
+        if loaded is not None and loaded.fingerprint != self.rules.fingerprint:
+            old_rules, self.rules = self.rules, loaded
+            logger.info("Replacement rules reloaded... Number of rules: %d", len(loaded))
+            if self.on_swap:
+                self.on_swap(old_rules, loaded)
+
+        signature = self.rules_signature()
+        if not loading and signature is not None and signature != self.signature:
+            with self.lock:
+                self.loader = threading.Thread(target=self.rules_load, args=(signature,), daemon=True)
+                self.loader.start()
+
+        return self.rules
@@ -0,0 +1,201 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("store")
+
+class StoreModel:
+    """
+    A persistent correction cache shared by every process and thread on the machine, so a new session starts with the
+    corrections earlier sessions already computed.
+
+    Corrections are stored in one SQLite database in WAL mode: readers never block the single writer, and writers of
+    other processes wait up to timeout seconds for the lock instead of failing. Each thread uses its own connection.
+    Entries are keyed by (language, rules key, word), where the rules key hashes everything the correction depends on
+    (rules and lexicon fingerprints, lexicon layers, dictionary size, kind of entry), so entries of outdated rules are simply never read again. Values
+    are JSON.
+
+    Entries older than ttl seconds are ignored and deleted; when there are more than max_entries, the oldest are
+    deleted. Eviction runs when the store is opened and after every evict_interval written entries.
+
+    Attributes:
+        file_path (str): Path to the SQLite database.
+        ttl (float): Lifetime of an entry in seconds (env SPEECH_ALIGNER_STORE_TTL).
+        max_entries (int): Maximum number of entries (env SPEECH_ALIGNER_STORE_SIZE).
+
+    Methods:
+        store_get(file_path) -> StoreModel:
+            Returns the shared store of a database file.
+        store_key(*parts) -> str:
+            Hashes the parts a correction depends on into a rules key.
+        store_connect() -> sqlite3.Connection:
+            Returns the connection of the current thread.
+        store_load(language, rules_key, words) -> dict:
+            Returns the stored values of words.
+        store_save(language, rules_key, items):
+            Stores the values of words.
+        store_evict() -> int:
+            Deletes expired entries and the oldest entries above max_entries.
+    """
+    version = 1
+    batch_size = 500
+    evict_interval = 10000
+    store_models = {}
+    lock = threading.Lock()
+
+    def __init__(self, file_path: str, ttl: float = None, max_entries: int = None, timeout: float = 30.0):
+        """
+        Opens the database, creating it if needed, and evicts outdated entries.
+
+        Args:
+            file_path (str): Path to the SQLite database.
+            ttl (float, optional): Lifetime of an entry in seconds. Defaults to 30 days.
+            max_entries (int, optional): Maximum number of entries. Defaults to one million.
+            timeout (float): Seconds to wait for the lock held by another writer.
+        """
+        self.file_path = file_path
+        self.ttl = ttl if ttl is not None else float(os.environ.get("SPEECH_ALIGNER_STORE_TTL", str(30 * 24 * 3600)))
+        self.max_entries = max_entries if max_entries is not None else int(
+            os.environ.get("SPEECH_ALIGNER_STORE_SIZE", "1000000"))
+        self.timeout = timeout
+        self.local = threading.local()
+        self.written = 0
+
+        directory = os.path.dirname(file_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        connection = self.store_connect()
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS corrections ("
+                "language TEXT NOT NULL, rules TEXT NOT NULL, word TEXT NOT NULL, value TEXT NOT NULL, "
+                "created REAL NOT NULL, PRIMARY KEY (language, rules, word))")
+            connection.execute("CREATE INDEX IF NOT EXISTS corrections_created ON corrections (created)")
+        self.store_evict()
+
+    @staticmethod
+    def store_get(file_path: str):
+        """
+        Returns the shared store of a database file, opening it once per process.
+
+        Args:
+            file_path (str): Path to the SQLite database.
+
+        Returns:
+            StoreModel: The store.
+        """
+        with StoreModel.lock:
+            store = StoreModel.store_models.get(file_path)
+            if store is None:
+                store = StoreModel(file_path)
+                StoreModel.store_models[file_path] = store
+        return store
+
+    @staticmethod
+    def store_key(*parts) -> str:
+        """
+        Hashes the parts a correction depends on (e.g., rules fingerprint, lexicon fingerprint, kind) into a rules key.
+
+        Args:
+            *parts: Values converted to strings.
+
+        Returns:
+            str: The rules key.
+        """
+        digest = hashlib.sha256(str(StoreModel.version).encode("utf-8"))
+        for part in parts:
+            digest.update(b"\x00" + str(part).encode("utf-8"))
+        return digest.hexdigest()[:32]
+
+    def store_connect(self):
+        """
+        Returns the connection of the current thread, opening it on first use.
+
+        Returns:
+            sqlite3.Connection: The connection.
+        """
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.file_path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")  # WAL stays consistent, only the last commits may be lost
+            self.local.connection = connection
+        return connection
+
+    def store_load(self, language: str, rules_key: str, words) -> dict:
+        """
+        Returns the stored values of words, in batches of batch_size words per query.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            rules_key (str): Key returned by store_key.
+            words (list of str): Words to look up.
+
+        Returns:
+            dict: Words found mapped to their decoded values. Expired entries are left out.
+        """
+        words = list(words)
+        connection = self.store_connect()
+        oldest = time.time() - self.ttl
+        found = {}
+        for start in range(0, len(words), StoreModel.batch_size):
+            batch = words[start:start + StoreModel.batch_size]
+            rows = connection.execute(
+                f"SELECT word, value FROM corrections WHERE language = ? AND rules = ? AND created >= ? "
+                f"AND word IN ({','.join('?' * len(batch))})", [language, rules_key, oldest, *batch])
+            for word, value in rows:
+                found[word] = json.loads(value)
+        return found
+
+    def store_save(self, language: str, rules_key: str, items):
+        """
+        Stores the values of words in one transaction, replacing older values.
+
+        Args:
+            language (str): Language code (e.g., "en").
+            rules_key (str): Key returned by store_key.
+            items (dict): Words mapped to JSON-serializable values.
+        """
+        now = time.time()
+        rows = [(language, rules_key, word, json.dumps(value, ensure_ascii=False), now) for word, value in items.items()]
+        if not rows:
+            return
+
+        connection = self.store_connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO corrections (language, rules, word, value, created) VALUES (?, ?, ?, ?, ?)", rows)
+
+        self.written += len(rows)
+        if self.written >= StoreModel.evict_interval:
+            self.written = 0
+            self.store_evict()
+
+    def store_evict(self) -> int:
+        """
+        Deletes the entries older than ttl, then the oldest entries above max_entries.
+
+        Returns:
+            int: Number of deleted entries.
+        """
+        connection = self.store_connect()
+        with connection:
+            deleted = connection.execute("DELETE FROM corrections WHERE created < ?", (time.time() - self.ttl,)).rowcount
+            excess = connection.execute("SELECT COUNT(*) FROM corrections").fetchone()[0] - self.max_entries
+            if excess > 0:
+                deleted += connection.execute(
+                    "DELETE FROM corrections WHERE rowid IN "
+                    "(SELECT rowid FROM corrections ORDER BY created LIMIT ?)", (excess,)).rowcount
+        if deleted:
+            logger.info("Correction store evicted... Entries deleted: %d", deleted)
+        return deleted
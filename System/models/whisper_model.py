@@ -2,8 +2,18 @@
 # This code is for educational use only.
 # Do not reuse, copy, modify, or redistribute.
 
-import whisper
-import torch
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from System.handlers.metrics_handler import MetricsHandler
+from System.handlers.audio_handler import AudioHandler
+from System.handlers.log_handler import LogHandler
+
+logger = LogHandler.log_get("whisper")
 
 class WhisperModel:
     """
@@ -12,14 +22,57 @@ class WhisperModel:
     This class initializes a Whisper model of the specified size and provides
     a method to transcribe audio files into text.
 
+    When the spoken text is known in advance (train mode), whisper_score checks it against the audio in one
+    teacher-forced decoder pass instead of a free-running decode: every expected word gets the probability the decoder
+    assigns to it and a timestamp from the cross-attention alignment, and only the spans of improbable words are
+    decoded freely to find out what was actually said.
+
+    Recordings longer than one 30-second window (lectures, long files) are decoded in long-form mode instead of Whisper's
+    sequential sliding window: the audio is split at silences into overlapping chunks of one window each
+    (AudioHandler.audio_chunks), the chunks are decoded in parallel by worker processes that each load the model once,
+    and the words of the chunks are stitched at the cut points in the middle of the overlaps.
+
     Attributes:
         model (whisper.Whisper): The loaded Whisper model.
         device (str): The device on which the model will run_train_mode ("cuda" or "cpu").
+        score_threshold (float): Word probability below which a word of the expected text is considered divergent.
+        score_padding (float): Seconds of audio added around a divergent span before decoding it.
+        long_overlap (float): Seconds of audio shared by consecutive chunks in long-form mode.
+        long_workers (int): Number of decoding processes in long-form mode (env SPEECH_ALIGNER_DECODE_WORKERS,
+            default 2, at most the number of CPUs). Every worker holds a full copy of the model, so raise it only if
+            there is memory for that many copies; on a GPU the chunks are always decoded in this process.
+        pools (dict): Worker pools shared by all instances, keyed by (model size, device, workers).
+        worker (WhisperModel): Model of a pool worker process, loaded by whisper_worker_start. Unused in the main
+            process, which passes its model to whisper_worker_decode.
 
     Methods:
-        whisper_transcriber(audio_path, language) -> str:
+        whisper_load(audio) -> numpy.ndarray:
+            Decodes an audio file into samples, so several passes over one recording decode it once.
+        whisper_transcriber(audio, language) -> str:
             Transcribes an audio file into text using the Whisper model.
+        whisper_transcribe_words(audio, language) -> tuple:
+            Transcribes an audio file into text and the confidence of every word.
+        whisper_score(audio, language, expected_text) -> tuple:
+            Scores the expected text against the audio and decodes only the divergent spans.
+        whisper_transcribe_long(audio, language, workers=None) -> tuple:
+            Decodes a long recording in parallel chunks, with timestamps.
+        whisper_pool(workers) -> ProcessPoolExecutor:
+            Returns the shared worker pool of the model, starting it on first use.
+        whisper_shutdown():
+            Stops every worker pool.
+        whisper_worker_start(model_size, device, threads):
+            Loads the model of a decoding process.
+        whisper_worker_decode(audio, language, offset, model=None) -> list:
+            Decodes one chunk in a decoding process.
     """
+    score_threshold = 0.4
+    score_padding = 0.2
+    long_overlap = 2.0
+    long_workers = int(os.environ.get("SPEECH_ALIGNER_DECODE_WORKERS", "2"))
+    worker = None
+    pools = {}
+    lock = threading.Lock()
+
     def __init__(self, model_size: str = "turbo", device: str = None):
         """
         Initializes the Whisper model.
@@ -28,24 +81,298 @@ class WhisperModel:
             model_size (str): The size of the Whisper model to file_model_load (e.g., "base", "large").
             device (str, optional): The device to run_train_mode the model on (e.g., "cuda", "cpu"). Defaults to automatic detection.
         """
+        import torch  # Heavy imports are deferred to the first transcription, so the CLI starts without them
+        import whisper
+
         self.model = whisper.load_model(model_size)
+        self.model_size = model_size
         self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
 
-    def whisper_transcriber(self, audio_path: str, language: str) -> str:
+    @staticmethod
+    def whisper_load(audio):
+        """
+        Decodes an audio file into the 16 kHz mono samples every transcription method works on. Decoding runs ffmpeg,
+        so a recording that goes through several methods is decoded once and its samples are passed on.
+
+        Args:
+            audio (str or numpy.ndarray): Path to the audio file, or samples that are returned as they are.
+
+        Returns:
+            numpy.ndarray: The samples.
+        """
+        if not isinstance(audio, str):
+            return audio
+
+        import whisper
+
+        with MetricsHandler.metrics_span("audio_decode"):
+            return whisper.load_audio(audio)
+
+    def whisper_transcriber(self, audio, language: str) -> str:
         """
         Transcribes the audio file into text.
 
         Args:
-            audio_path (str): Path to the audio file.
+            audio (str or numpy.ndarray): Path to the audio file, or its samples as returned by whisper_load.
             language (str): Language of the audio content.
 
         Returns:
             str: Transcribed text.
         """
-        result = self.model.transcribe(
-            audio_path,
+        audio = WhisperModel.whisper_load(audio)
+
+        with MetricsHandler.metrics_span("whisper_decode"):
+            result = self.model.transcribe(
+                audio,
+                language=language,
+                temperature=0.0,  # Avoid guessing
+                without_timestamps=True
+            )
+        return result["text"].strip()
+
+    def whisper_transcribe_words(self, audio, language: str):
+        """
+        Transcribes the audio file into text and the confidence of every word.
+
+        The confidence of a word is the probability Whisper assigned to its tokens, scaled by the probability that its
+        segment contains speech at all (1 - no_speech_prob). A word whose probability is missing or zero gets the
+        average token probability of its segment (exp(avg_logprob)) instead.
+
+        Args:
+            audio (str or numpy.ndarray): Path to the audio file, or its samples as returned by whisper_load.
+            language (str): Language of the audio content.
+
+        Returns:
+            tuple: (text, words), where words is a list of (word, confidence) pairs in spoken order.
+        """
+        audio = WhisperModel.whisper_load(audio)
+
+        with MetricsHandler.metrics_span("whisper_decode"):
+            result = self.model.transcribe(
+                audio,
+                language=language,
+                temperature=0.0,  # Avoid guessing
+                word_timestamps=True
+            )
+
+        words = []
+        for segment in result["segments"]:
+            speech = 1.0 - segment.get("no_speech_prob", 0.0)
+            average = math.exp(segment.get("avg_logprob", 0.0))
+            for word in segment.get("words", []):
+                words.append((word["word"].strip(), (word.get("probability") or average) * speech))
+        return result["text"].strip(), words
+
+    def whisper_score(self, audio, language: str, expected_text: str):
+        """
+        Scores the expected text against the audio with one teacher-forced decoder pass.
+
+        The expected tokens are fed to the decoder as if it had produced them, so one forward pass yields the
+        probability of every expected word and, from the cross-attention weights, its start and end time. Runs of
+        words below score_threshold are divergent spans: only their audio (padded by score_padding) is decoded
+        freely, and the decoded text replaces them in the transcription.
+
+        The pass covers a single 30-second window, so longer recordings are not scored.
+
+        Args:
+            audio (str or numpy.ndarray): Path to the audio file, or its samples as returned by whisper_load.
+            language (str): Language of the audio content.
+            expected_text (str): The text the speaker was asked to say.
+
+        Returns:
+            tuple: (text, words), where text is the expected text with the divergent spans replaced by what was decoded
+            there and words is a list of {"word", "start", "end", "probability"} dicts of the expected words. None if
+            the recording is longer than one window or the expected text is empty, so a full decode is needed.
+        """
+        import whisper
+        import whisper.timing
+
+        audio = WhisperModel.whisper_load(audio)
+
+        if len(audio) > whisper.audio.N_SAMPLES or not expected_text.strip():
+            return None
+
+        with MetricsHandler.metrics_span("whisper_align"):
+            mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), self.model.dims.n_mels).to(self.model.device)
+            tokenizer = whisper.tokenizer.get_tokenizer(
+                self.model.is_multilingual,
+                num_languages=self.model.num_languages,
+                language=language,
+                task="transcribe",
+            )
+            text_tokens = tokenizer.encode(" " + expected_text.strip())
+            timings = whisper.timing.find_alignment(
+                self.model, tokenizer, text_tokens, mel, len(audio) // whisper.audio.HOP_LENGTH
+            )
+
+        words = [{"word": timing.word.strip(), "start": timing.start, "end": timing.end,
+                  "probability": timing.probability} for timing in timings]
+
+        # Group consecutive improbable words into divergent spans
+        spans = []
+        for index, word in enumerate(words):
+            if word["probability"] >= WhisperModel.score_threshold:
+                continue
+            if spans and spans[-1][1] == index:
+                spans[-1][1] = index + 1
+            else:
+                spans.append([index, index + 1])
+
+        parts, position = [], 0
+        with MetricsHandler.metrics_span("whisper_decode"):
+            for start, end in spans:
+                parts.extend(word["word"] for word in words[position:start])
+                first = max(0, int((words[start]["start"] - WhisperModel.score_padding) * whisper.audio.SAMPLE_RATE))
+                last = int((words[end - 1]["end"] + WhisperModel.score_padding) * whisper.audio.SAMPLE_RATE)
+                result = self.model.transcribe(
+                    audio[first:last],
+                    language=language,
+                    temperature=0.0,  # Avoid guessing
+                    without_timestamps=True
+                )
+                parts.append(result["text"].strip())
+                position = end
+        parts.extend(word["word"] for word in words[position:])
+
+        logger.debug("Teacher-forced scoring: %d of %d words divergent in %d spans",
+                     sum(end - start for start, end in spans), len(words), len(spans))
+        return " ".join(part for part in parts if part), words
+
+    def whisper_transcribe_long(self, audio, language: str, workers: int = None):
+        """
+        Transcribes a long recording in parallel chunks.
+
+        The audio is split at silences into chunks of at most one window that overlap by long_overlap seconds. Each
+        chunk is decoded with word timestamps by the shared worker pool of the model (whisper_pool), which is kept for
+        later calls, so the model is loaded once per worker. A word of the overlap is taken from the chunk whose side
+        of the cut point its middle falls on, so no word is lost or doubled at a chunk border.
+
+        Args:
+            audio (str or numpy.ndarray): Path to the audio file, or its samples as returned by whisper_load.
+            language (str): Language of the audio content.
+            workers (int, optional): Number of decoding processes. Defaults to long_workers.
+
+        Returns:
+            tuple: (text, chunks), where chunks is a list of {"start", "end", "text", "words"} dicts with times in
+            seconds from the start of the recording, and words is a list of {"word", "start", "end", "probability"}
+            dicts as in whisper_score. None if the recording fits in one window, so a plain decode is enough.
+        """
+        import whisper
+
+        audio = WhisperModel.whisper_load(audio)
+
+        if len(audio) <= whisper.audio.N_SAMPLES:
+            return None
+
+        sample_rate = whisper.audio.SAMPLE_RATE
+        spans = AudioHandler.audio_chunks(audio, sample_rate, whisper.audio.CHUNK_LENGTH, WhisperModel.long_overlap)
+        workers = 1 if self.device == "cuda" else max(1, min(workers or WhisperModel.long_workers, os.cpu_count() or 1))
+
+        with MetricsHandler.metrics_span("whisper_decode"):
+            if workers == 1:
+                decoded = [WhisperModel.whisper_worker_decode(audio[start:end], language, start / sample_rate, self)
+                           for start, end, _ in spans]
+            else:
+                pool = self.whisper_pool(workers)
+                futures = [pool.submit(WhisperModel.whisper_worker_decode, audio[start:end], language,
+                                       start / sample_rate) for start, end, _ in spans]
+                decoded = [future.result() for future in futures]
+
+        chunks, previous_cut = [], 0.0
+        for (start, end, cut), words in zip(spans, decoded):
+            cut_time = cut / sample_rate if cut < len(audio) else math.inf
+            kept = [word for word in words if previous_cut <= (word["start"] + word["end"]) / 2 < cut_time]
+            chunks.append({"start": start / sample_rate, "end": end / sample_rate,
+                           "text": " ".join(word["word"] for word in kept), "words": kept})
+            previous_cut = cut_time
+
+        logger.info("Long-form decoding: %.1f seconds in %d chunks on %d workers",
+                    len(audio) / sample_rate, len(spans), workers)
+        return " ".join(chunk["text"] for chunk in chunks if chunk["text"]), chunks
+
+    def whisper_pool(self, workers: int):
+        """
+        Returns the worker pool of the model size and device of this instance, starting it on first use. Pools are
+        shared by all instances, so a new WhisperModel for the same model does not start new workers.
+
+        Args:
+            workers (int): Number of worker processes.
+
+        Returns:
+            ProcessPoolExecutor: The pool.
+        """
+        key = (self.model_size, self.device, workers)
+        with WhisperModel.lock:
+            pool = WhisperModel.pools.get(key)
+            if pool is None:
+                pool = ProcessPoolExecutor(
+                    max_workers=workers,
+                    mp_context=multiprocessing.get_context("spawn"),  # CUDA and threads don't survive a fork
+                    initializer=WhisperModel.whisper_worker_start,
+                    initargs=(self.model_size, self.device, max(1, (os.cpu_count() or 1) // workers)),
+                )
+                WhisperModel.pools[key] = pool
+        return pool
+
+    @staticmethod
+    def whisper_shutdown():
+        """
+        Stops every worker pool and frees the models of its workers. Pools are started again on the next long
+        recording.
+        """
+        with WhisperModel.lock:
+            pools = list(WhisperModel.pools.values())
+            WhisperModel.pools.clear()
+        for pool in pools:
+            pool.shutdown()
+
+    @staticmethod
+    def whisper_worker_start(model_size: str, device: str, threads: int):
+        """
+        Loads the model of a decoding process, once per process.
+
+        Args:
+            model_size (str): The size of the Whisper model.
+            device (str): The device to run the model on.
+            threads (int): Number of CPU threads of the process, so the workers don't compete for the same cores.
+        """
+        import torch
+
+        torch.set_num_threads(threads)
+        WhisperModel.worker = WhisperModel(model_size, device)
+
+    @staticmethod
+    def whisper_worker_decode(audio, language: str, offset: float, model=None) -> list:
+        """
+        Decodes one chunk with the given model, or in a pool worker with the model of the worker process.
+
+        Args:
+            audio (numpy.ndarray): Samples of the chunk.
+            language (str): Language of the audio content.
+            offset (float): Start of the chunk in the recording, in seconds.
+            model (WhisperModel, optional): Model to decode with in this process. Defaults to the model loaded by
+                whisper_worker_start.
+
+        Returns:
+            list of dict: {"word", "start", "end", "probability"} of every word, with times in the recording. The
+            probability is computed as in whisper_transcribe_words.
+        """
+        result = (model or WhisperModel.worker).model.transcribe(
+            audio,
             language=language,
             temperature=0.0,  # Avoid guessing
-            without_timestamps=True
+            word_timestamps=True,
+            condition_on_previous_text=False  # Every chunk is decoded on its own
         )
-        return result["text"].strip()
\ No newline at end of file
+
+        words = []
+        for segment in result["segments"]:
+            speech = 1.0 - segment.get("no_speech_prob", 0.0)
+            average = math.exp(segment.get("avg_logprob", 0.0))
+            for word in segment.get("words", []):
+                words.append({"word": word["word"].strip(), "start": word["start"] + offset, "end": word["end"] + offset,
+                              "probability": (word.get("probability") or average) * speech})
+        return words
+
+
+atexit.register(WhisperModel.whisper_shutdown)
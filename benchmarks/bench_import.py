@@ -0,0 +1,72 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+"""
+Import-time budget check of the command line entry point.
+
+Imports a module in fresh interpreters with "python -X importtime", prints the slowest imports of the fastest run and
+fails if the import takes longer than the budget or loads a module that must only be imported on first use (Whisper,
+PyTorch, MeloTTS, OpenAI, audio devices, file dialogs).
+
+Usage:
+    python benchmarks/bench_import.py --module main --budget 1.0 --runs 3 --top 15
+
+Exits with status 1 if the budget is exceeded or a deferred module was imported.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFERRED = ("whisper", "torch", "melo", "openai", "sounddevice", "tkinter", "pymorphy2", "pymorphy3")
+
+def bench_importtime(module: str) -> list:
+    """
+    Imports a module in a fresh interpreter and returns its import times.
+
+    Returns:
+        list of tuple: (module, self microseconds, cumulative microseconds) of every imported module, in import order.
+    """
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                               cwd=ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(completed.stderr.strip().splitlines()[-1], file=sys.stderr)
+        sys.exit(2)
+
+    times = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.append((name.strip(), int(self_us), int(cumulative_us)))
+    return times
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the import time of the command line entry point.")
+    parser.add_argument("--module", default="main", help="Module to import.")
+    parser.add_argument("--budget", type=float, default=1.0, help="Maximum import time in seconds.")
+    parser.add_argument("--runs", type=int, default=3, help="Number of fresh interpreters; the fastest run counts.")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to print.")
+    args = parser.parse_args()
+
+    runs = [bench_importtime(args.module) for _ in range(args.runs)]
+    times = min(runs, key=lambda run: sum(self_us for _, self_us, _ in run))
+    total = sum(self_us for _, self_us, _ in times) / 1e6
+
+    print(f"{'module':<48} {'self [ms]':>10} {'cumulative [ms]':>16}")
+    for name, self_us, cumulative_us in sorted(times, key=lambda row: -row[2])[:args.top]:
+        print(f"{name:<48} {self_us / 1000:10.1f} {cumulative_us / 1000:16.1f}")
+
+    deferred = sorted({name for name, _, _ in times if name.split(".")[0] in DEFERRED})
+    print(f"\nimport {args.module}: {total:.3f}s (budget {args.budget:.3f}s)")
+    failed = False
+    if total > args.budget:
+        print(f"FAIL: import time exceeds the budget by {total - args.budget:.3f}s")
+        failed = True
+    if deferred:
+        print(f"FAIL: modules that must be imported on first use were imported: {', '.join(deferred)}")
+        failed = True
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,59 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+"""
+Benchmark of the LLM correction backend against the local mock server.
+
+Compares one request per sentence (the previous behaviour) with batched, concurrent requests, and measures a second,
+fully cached pass over the same sentences.
+
+Usage:
+    python benchmarks/bench_llm.py --sentences 200 --latency 0.1 --batch 8 --concurrency 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.llm_mock import mock_start
+from System.models.llm_model import OpenAIModel
+
+def bench_run(label: str, backend, sentences: list, server):
+    """
+    Corrects the sentences with a backend and prints the elapsed time and the number of requests.
+    """
+    requests_before = server.requests
+    start = time.perf_counter()
+    corrected = backend.llm_correct(sentences)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.3f}s  {len(sentences) / elapsed:9.1f} sentences/s  "
+          f"{server.requests - requests_before:5d} requests")
+    return corrected
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the LLM correction backend against a local mock server.")
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.1, help="Delay of every mock reply in seconds.")
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    server = mock_start(latency=args.latency)
+    os.environ["SPEECH_ALIGNER_LLM_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    os.environ.setdefault("SPEECH_ALIGNER_LLM_API_KEY", "mock")
+
+    sentences = [f"this is test sentence number {index}" for index in range(args.sentences)]
+
+    sequential = OpenAIModel(batch_size=1, concurrency=1)
+    bench_run("one request per sentence", sequential, sentences, server)
+
+    batched = OpenAIModel(batch_size=args.batch, concurrency=args.concurrency)
+    corrected = bench_run(f"batch {args.batch}, concurrency {args.concurrency}", batched, sentences, server)
+    bench_run("cached", batched, sentences, server)
+
+    assert corrected[0] == "This is test sentence number 0."
+    server.shutdown()
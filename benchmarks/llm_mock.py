@@ -0,0 +1,109 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+"""
+A local stand-in for an OpenAI-compatible chat completions endpoint, to test and benchmark the LLM correction backend
+offline.
+
+The server answers POST /v1/chat/completions. The user message of a request is expected to be a JSON array of
+sentences, as sent by LLMModel; the reply is the same array with every sentence "corrected" (first letter capitalized,
+final period added) after a configurable delay that simulates the latency of a remote model.
+
+Usage:
+    python benchmarks/llm_mock.py --port 8765 --latency 0.2
+    SPEECH_ALIGNER_LLM_BASE_URL=http://127.0.0.1:8765/v1 SPEECH_ALIGNER_LLM_API_KEY=mock python main.py
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class LLMMockHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of the mock server. The latency and the request counter are kept on the server.
+    """
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients can reuse their connections
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.latency)
+
+        try:
+            sentences = json.loads(body["messages"][-1]["content"])
+        except (ValueError, KeyError, IndexError):
+            sentences = []
+        corrected = [LLMMockHandler.mock_correct(str(sentence)) for sentence in sentences]
+
+        reply = json.dumps({
+            "id": f"chatcmpl-mock-{self.server.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(corrected, ensure_ascii=False)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }).encode('utf-8')
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    @staticmethod
+    def mock_correct(sentence: str) -> str:
+        """
+        Returns a deterministic "correction" of a sentence.
+        """
+        sentence = sentence.strip()
+        if not sentence:
+            return sentence
+        sentence = sentence[0].upper() + sentence[1:]
+        return sentence if sentence.endswith((".", "!", "?")) else sentence + "."
+
+def mock_start(port: int = 0, latency: float = 0.2):
+    """
+    Starts the mock server in a background thread.
+
+    Args:
+        port (int): Port to listen on; 0 picks a free one.
+        latency (float): Delay of every reply in seconds.
+
+    Returns:
+        ThreadingHTTPServer: The running server. Its base URL is http://127.0.0.1:<server.server_port>/v1.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), LLMMockHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.requests = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of an OpenAI-compatible chat completions endpoint.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.2, help="Delay of every reply in seconds.")
+    args = parser.parse_args()
+
+    server = mock_start(args.port, args.latency)
+    print(f"Mock LLM server listening on http://127.0.0.1:{server.server_port}/v1 (Ctrl+C to stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
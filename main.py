@@ -2,49 +2,86 @@
 # This code is for educational use only.
 # Do not reuse, copy, modify, or redistribute.
 
+import argparse
 import os
-import threading
+import sys
 import warnings
 
 from System.main import System
+from System.models.whisper_model import WhisperModel
+from System.models.lexicon_model import LexiconModel
+from System.models.correction_model import CorrectionModel
+from System.models.store_model import StoreModel
 from System.handlers.file_handler import FileHandler
 from System.handlers.errors_handler import ErrorsHandler
+from System.handlers.job_handler import JobHandler
+from System.handlers.training_handler import TrainingHandler
+from System.handlers.lexicon_handler import LexiconHandler
 
 # Suppress specific future warnings to avoid unnecessary clutter in the console
 warnings.filterwarnings("ignore", category=FutureWarning)
 
-def train_model(model_name, model_size, csv_path, model_path, language):
+def rebuild_stats(errors_path, stats_path, job=None):
     """
-    Trains a speech alignment model with specified parameters.
+    Rebuilds the confusion-count store from the whole error log.
+
+    Args:
+        errors_path (str): Path to the errors log.
+        stats_path (str): Path to the confusion-count store to overwrite.
+        job (Job, optional): Scheduler job used to report progress and check for cancellation.
+
+    Returns:
+        dict: The rebuilt character-level error counts, or None if the job was cancelled.
+    """
+    # Stream every error ever logged in chunks and analyze it from scratch
+    rebuilt = FileHandler.file_stats_rebuild(errors_path, stats_path, job=job)
+    return None if rebuilt is None else rebuilt[0]
+
+def train_model(model_name, model_size, errors_path, stats_path, language, job=None):
+    """
+    Collects training errors for a speech alignment model with specified parameters.
 
     Args:
         model_name (str): Name of the model to be trained.
         model_size (str): Size of the model (e.g., 'small', 'medium', 'large').
-        csv_path (str): Path to the CSV file for logging errors.
-        model_path (str): Path to save the trained model.
+        errors_path (str): Path to the errors log.
+        stats_path (str): Path to the confusion-count store updated while training.
         language (str): Language of the data for model training.
+        job (Job, optional): Scheduler job running the session.
 
     Workflow:
         1. Initializes a System instance and starts the training process.
-        2. Loads error data from the CSV file.
-        3. Analyzes errors and generates replacement rules.
-        4. Updates the model with the generated rules.
+        2. Logs the errors of every utterance and updates the error statistics.
     """
-    # Run the training mode of the aligner system
+    # Run the training mode of the aligner system, which keeps the error statistics up to date
     aligner = System()
-    aligner.run_train_mode(model_name=model_name, model_size=model_size, language=language, csv_path=csv_path)
+    aligner.run_train_mode(model_name=model_name, model_size=model_size, language=language, errors_path=errors_path, stats_path=stats_path)
 
-    # Load errors identified during training from the specified CSV file
-    incorrect, correct = FileHandler.file_errors_load(csv_path)
+def train_rules(errors_path, stats_path, model_path, job=None):
+    """
+    Generates replacement rules from the error statistics and publishes them.
+
+    Args:
+        errors_path (str): Path to the errors log.
+        stats_path (str): Path to the confusion-count store.
+        model_path (str): Path to save the trained model.
+        job (Job, optional): Scheduler job used to check for cancellation.
+
+    Workflow:
+        1. Loads the incrementally updated error statistics.
+        2. Generates replacement rules from the statistics.
+        3. Updates the model with the generated rules.
+    """
+    # Load the error statistics, counting the errors logged since they were last updated
+    letter_errors, records = FileHandler.file_stats_sync(stats_path, errors_path)
 
-    # Analyze the errors and generate replacement rules for corrections
-    letter_errors = ErrorsHandler.errors_analyze(incorrect, correct)
+    # Generate replacement rules for corrections
     replacement_rules = ErrorsHandler.errors_rules_generate(letter_errors)
 
     # Update the correction model with the newly generated rules
-    FileHandler.file_model_update(model_path, replacement_rules)
+    FileHandler.file_model_update(model_path, replacement_rules, letter_errors)
 
-def use_model(model_name, model_size, model_path, language, method):
+def use_model(model_name, model_size, model_path, lexicon_path, language, method, bigram_path=None, base_path=None, store_path=None, job=None):
     """
     Uses a trained speech alignment model to process input audio and apply corrections.
 
@@ -52,8 +89,13 @@ def use_model(model_name, model_size, model_path, language, method):
         model_name (str): Name of the model to be used.
         model_size (str): Size of the model (e.g., 'small', 'medium', 'large').
         model_path (str): Path to the model to be used.
+        lexicon_path (str): Path to the personal vocabulary overlay of the user.
         language (str): Language of the data to be processed.
         method (str): Method to apply additional checks or fixes.
+        bigram_path (str, optional): Path to the bigram model used by the "beam" method.
+        base_path (str, optional): Path to the imported word list extending the shared dictionary.
+        store_path (str, optional): Path to the persistent correction store shared by all sessions.
+        job (Job, optional): Scheduler job running the session.
 
     Workflow:
         1. Initializes a System instance and sets it to use mode.
@@ -61,16 +103,21 @@ def use_model(model_name, model_size, model_path, language, method):
     """
     # Run the aligner in use mode to process input audio and apply corrections
     aligner = System()
-    aligner.run_use_mode(model_name=model_name, model_size=model_size, language=language, model_path=model_path, method=method)
+    aligner.run_use_mode(model_name=model_name, model_size=model_size, language=language, model_path=model_path, method=method, lexicon_path=lexicon_path, bigram_path=bigram_path, base_path=base_path, store_path=store_path)
 
-def use_model_test(model_path, language, method):
+def use_model_test(model_path, lexicon_path, language, method, bigram_path=None, base_path=None, store_path=None, job=None):
     """
     Tests the model using predefined test cases to validate correction capabilities.
 
     Args:
         model_path (str): Path to the model to be tested.
+        lexicon_path (str): Path to the personal vocabulary overlay of the user.
         language (str): Language of the data for testing.
         method (str): Method to apply additional checks or fixes.
+        bigram_path (str, optional): Path to the bigram model used by the "beam" method.
+        base_path (str, optional): Path to the imported word list extending the shared dictionary.
+        store_path (str, optional): Path to the persistent correction store shared by all sessions.
+        job (Job, optional): Scheduler job running the session.
 
     Workflow:
         1. Initializes a System instance and sets it to test mode.
@@ -78,9 +125,126 @@ def use_model_test(model_path, language, method):
     """
     # Test the aligner's correction capabilities using predefined input
     aligner = System()
-    aligner.run_use_model_test(language=language, model_path=model_path, method=method)
+    aligner.run_use_model_test(language=language, model_path=model_path, method=method, lexicon_path=lexicon_path, bigram_path=bigram_path, base_path=base_path, store_path=store_path)
+
+def prefill_store(user_dir, store_path, method="", job=None):
+    """
+    Corrects the distinct incorrect words of every historical errors log ahead of time, so new sessions start with a
+    warm correction store. Each log is corrected with the rules and personal vocabulary of its user.
+
+    Args:
+        user_dir (str): Directory path for user files.
+        store_path (str): Path to the persistent correction store.
+        method (str): Correction method the entries are made for ("beam" or any other).
+        job (Job, optional): Scheduler job used to report progress and check for cancellation.
+
+    Returns:
+        int: Number of distinct words processed.
+    """
+    store = StoreModel.store_get(store_path)
+    base_paths = {}
+    processed = 0
+    for user_name, language in FileHandler.file_errors_discover(user_dir):
+        if job and job.job_cancelled():
+            break
+        if language not in base_paths:
+            base_paths[language] = FileHandler.file_wordlist_create(language, user_dir)
+        rules = FileHandler.file_model_load(FileHandler.file_model_create(language, user_name, user_dir))
+        if rules is None:
+            continue
+        lexicon = LexiconModel(language, FileHandler.file_lexicon_create(language, user_name, user_dir), base_paths[language])
+        errors_path = FileHandler.file_errors_create(language, user_name, user_dir)
+
+        for incorrect, correct in FileHandler.file_errors_load(errors_path):
+            processed += CorrectionModel.correction_prefill(incorrect, rules, method, language, store, lexicon)
+            if job:
+                job.job_progress(processed)
+        print(f"Correction store prefilled for {user_name} ({language})...")
+    return processed
+
+def add_vocabulary(lexicon_path, language, words):
+    """
+    Adds words such as names and jargon to the personal vocabulary of the user.
+
+    Args:
+        lexicon_path (str): Path to the personal vocabulary overlay of the user.
+        language (str): Language of the vocabulary.
+        words (list of str): Words to add.
+    """
+    lexicon = LexiconModel(language, lexicon_path)
+    for word in words:
+        lexicon.lexicon_add(word)
+    lexicon.lexicon_save()
+
+def batch_transcribe(model_name, model_size, audio_dir, language, job=None):
+    """
+    Re-transcribes every audio file of a directory and saves each transcript next to its audio file. Files longer than
+    one Whisper window are decoded in parallel chunks.
+
+    Args:
+        model_name (str): Name of the model to be used.
+        model_size (str): Size of the model (e.g., 'small', 'medium', 'large').
+        audio_dir (str): Directory with ".wav" and ".mp3" files.
+        language (str): Language of the audio content.
+        job (Job, optional): Scheduler job used to report progress and check for cancellation.
+
+    Returns:
+        int: Number of transcribed files.
+    """
+    if model_name.lower() != "whisper":
+        raise ValueError("Unsupported model. Select 'Whisper...'")
+
+    audio_paths = sorted(
+        os.path.join(audio_dir, name) for name in os.listdir(audio_dir)
+        if name.lower().endswith((".wav", ".mp3"))
+    )
+    model = WhisperModel(model_size)
+
+    try:
+        for index, audio_path in enumerate(audio_paths):
+            if job and job.job_cancelled():
+                return index
+            audio = WhisperModel.whisper_load(audio_path)
+            decoded = model.whisper_transcribe_long(audio, language)
+            transcribed_text = decoded[0] if decoded else model.whisper_transcriber(audio, language)
+            with open(f"{os.path.splitext(audio_path)[0]}.txt", 'w', encoding='utf-8') as f:
+                f.write(transcribed_text)
+            if job:
+                job.job_progress(index + 1, len(audio_paths))
+    finally:
+        WhisperModel.whisper_shutdown()  # Free the worker copies of the model once the batch is done
+
+    return len(audio_paths)
 
 if __name__ == "__main__":
+    # Non-interactive commands, e.g. the nightly "python main.py train-all"
+    parser = argparse.ArgumentParser(description="Speech Aligner System")
+    commands = parser.add_subparsers(dest="command")
+    train_all = commands.add_parser("train-all", help="Train the rules of every user and language in parallel.")
+    train_all.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    train_all.add_argument("--force", action="store_true", help="Retrain logs that did not change.")
+    import_lexicon = commands.add_parser("import-lexicon", help="Import word<TAB>count frequency lists into the shared lexicon of a language.")
+    import_lexicon.add_argument("language", choices=["en", "es", "ru"])
+    import_lexicon.add_argument("files", nargs="+", help="Frequency list files.")
+    import_lexicon.add_argument("--min-count", type=int, default=2, help="Minimum count of a kept word.")
+    import_lexicon.add_argument("--max-words", type=int, default=1000000, help="Maximum number of words kept.")
+    prefill = commands.add_parser("prefill-store", help="Correct the words of every errors log ahead of time into the shared correction store.")
+    prefill.add_argument("--method", default="", help="Correction method the entries are made for (\"beam\" or default).")
+    arguments = parser.parse_args()
+
+    if arguments.command == "train-all":
+        results = TrainingHandler.training_all(os.getcwd(), workers=arguments.workers, force=arguments.force)
+        sys.exit(1 if any(status == "failed" for _, _, status, _ in results) else 0)
+
+    if arguments.command == "import-lexicon":
+        wordlist_path = FileHandler.file_wordlist_create(arguments.language, os.getcwd())
+        LexiconHandler.lexicon_import(arguments.files, wordlist_path, min_count=arguments.min_count, max_words=arguments.max_words)
+        sys.exit(0)
+
+    if arguments.command == "prefill-store":
+        prefill_store(os.getcwd(), FileHandler.file_store_create(os.getcwd()), method=arguments.method)
+        sys.exit(0)
+
     supported_languages = {
         "en",
         "es",
@@ -94,57 +258,95 @@ if __name__ == "__main__":
         print(f"Language '{language}' is not supported. Please try again.")
         language = input("Enter the language ('en', 'es', 'ru'): ").strip()
 
-    method = input("Enter \"gpt\" fix if you want to enable additional checks or just click \"Enter\": ").strip().lower()
+    method = input("Enter \"gpt\" fix if you want to enable additional checks, \"beam\" for context-aware correction or just click \"Enter\": ").strip().lower()
 
     # Set up working directories and paths for files
     my_dir = os.path.join(os.getcwd())
-    csv_path = FileHandler.file_errors_create(language, user_name, my_dir)
+    errors_path = FileHandler.file_errors_create(language, user_name, my_dir)
+    stats_path = FileHandler.file_stats_create(language, user_name, my_dir)
     model_path = FileHandler.file_model_create(language, user_name, my_dir)
+    lexicon_path = FileHandler.file_lexicon_create(language, user_name, my_dir)
+    bigram_path = FileHandler.file_bigram_create(language, my_dir)
+    base_path = FileHandler.file_wordlist_create(language, my_dir)
+    store_path = FileHandler.file_store_create(my_dir)
 
     # Default model parameters for training and usage
     model_name = "whisper"
     model_size = "turbo"
 
+    # Interactive sessions run in the foreground, training and batch jobs run side by side in the background
+    scheduler = JobHandler(workers=int(os.environ.get("SPEECH_ALIGNER_WORKERS", "3")))
+
     while True:
         print(f"\nWelcome to the System! Dear {user_name}, selected language is: {language}")
         print("1. Train model.")
         print("2. Use model.")
         print("3. Test use model.")
-        print("4. Exit.")
+        print("4. Rebuild error statistics.")
+        print("5. Batch re-transcribe a folder.")
+        print("6. Add words to personal vocabulary.")
+        print("7. Show jobs.")
+        print("8. Cancel a job.")
+        print("9. Exit.")
         action = input("Choose an option: ").strip()
 
         if action == '1':
-            # Start a separate thread for training to avoid blocking the main program
-            print("Starting training thread...")
-            training_thread = threading.Thread(target=train_model, args=(model_name, model_size, csv_path, model_path, language))
-            training_thread.start()
-
-            # Wait for the training thread to complete
-            training_thread.join()
-            print("Training thread completed...")
+            # Collect errors interactively, then retrain the rules in the background
+            print("Starting training session...")
+            session = scheduler.job_submit("train session", train_model, args=(model_name, model_size, errors_path, stats_path, language), interactive=True)
+            session.job_wait()
+            print("Training session completed, retraining rules in the background...")
+            scheduler.job_submit("train rules", train_rules, args=(errors_path, stats_path, model_path))
 
         elif action == '2':
-            # Start a separate thread for using the model in mode
-            print("Starting usage thread...")
-            training_thread = threading.Thread(target=use_model, args=(model_name, model_size, model_path, language, method))
-            training_thread.start()
-
-            # Wait for the usage thread to complete
-            training_thread.join()
-            print("Usage thread completed...")
+            # Use the model in an interactive session, which always comes before background jobs
+            print("Starting usage session...")
+            session = scheduler.job_submit("use session", use_model, args=(model_name, model_size, model_path, lexicon_path, language, method, bigram_path, base_path, store_path), interactive=True)
+            session.job_wait()
+            print("Usage session completed...")
 
         elif action == '3':
-            # Start a separate thread for testing the model with specific input
-            print("Starting testing thread...")
-            training_thread = threading.Thread(target=use_model_test, args=(model_path, language, method))
-            training_thread.start()
-
-            # Wait for the testing thread to complete
-            training_thread.join()
-            print("Testing thread completed...")
+            # Test the model with specific input in an interactive session
+            print("Starting testing session...")
+            session = scheduler.job_submit("test session", use_model_test, args=(model_path, lexicon_path, language, method, bigram_path, base_path, store_path), interactive=True)
+            session.job_wait()
+            print("Testing session completed...")
 
         elif action == "4":
-            print("Exiting the program...")
+            # Recount the error statistics from the whole error log on demand
+            print("Rebuilding error statistics in the background...")
+            scheduler.job_submit("rebuild statistics", rebuild_stats, args=(errors_path, stats_path))
+
+        elif action == "5":
+            audio_dir = input("Enter the folder with audio files: ").strip()
+            if os.path.isdir(audio_dir):
+                print("Re-transcribing in the background...")
+                scheduler.job_submit("batch transcription", batch_transcribe, args=(model_name, model_size, audio_dir, language))
+            else:
+                print(f"Folder '{audio_dir}' does not exist...")
+
+        elif action == "6":
+            # Names, jargon and other words missing from the shared dictionary
+            words = input("Enter words separated by commas: ").split(",")
+            add_vocabulary(lexicon_path, language, words)
+
+        elif action == "7":
+            jobs = scheduler.job_list()
+            if not jobs:
+                print("No jobs yet...")
+            for job in jobs:
+                print(job.job_describe())
+
+        elif action == "8":
+            job_id = input("Enter the job number to cancel: ").strip().lstrip("#")
+            if job_id.isdigit() and scheduler.job_cancel(int(job_id)):
+                print(f"Job #{job_id} cancelled...")
+            else:
+                print(f"Job #{job_id} is not running or queued...")
+
+        elif action == "9":
+            print("Exiting the program, waiting for running jobs to stop...")
+            scheduler.job_shutdown()
             break
 
         else:
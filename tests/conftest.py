@@ -0,0 +1,89 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from System.models.correction_model import CorrectionModel
+from System.models.lexicon_model import LexiconModel
+from System.models.morphology_model import MorphologyModel
+
+SPANISH_STEMS = {"n": ("cas", "gat", "niñ", "mes", "caz", "plaz"), "m": ("perr", "libr", "carr", "pas", "vas")}
+SPANISH_SUFFIXES = {"n": ("a", "as", "ita"), "m": ("o", "os", "ito")}
+
+class RussianAnalyzer:
+    """
+    Stand-in for the pymorphy analyzer with the lexeme of one noun.
+    """
+    lexeme = ("дом", "дома", "дому", "домом", "доме", "домов", "домам", "домами", "домах")
+
+    def word_is_known(self, word):
+        return word in self.lexeme
+
+    def parse(self, word):
+        if word not in self.lexeme:
+            return [SimpleNamespace(is_known=False, normal_form=word, lexeme=[])]
+        return [SimpleNamespace(is_known=True, normal_form="дом",
+                                lexeme=[SimpleNamespace(word=form) for form in self.lexeme])]
+
+@pytest.fixture
+def corpus(monkeypatch):
+    """
+    Replaces the corpus of a language with given word counts and the morphology with a given model, so tests never
+    read the NLTK corpora. The part-of-speech check of candidate generation, which needs the NLTK tagger, treats every
+    word as a content word. The tables are restored afterwards.
+
+    Returns:
+        callable: corpus(language, counts, morphology=None) -> LexiconModel of the language without an overlay.
+    """
+    replaced = []
+    monkeypatch.setattr(MorphologyModel, "morphology_models", {})
+    monkeypatch.setattr(MorphologyModel, "morphology_analyzer", staticmethod(lambda: "pymorphy3"))  # Never imported
+    monkeypatch.setattr(LexiconModel, "indexes", {})
+    monkeypatch.setattr(LexiconModel, "ngram_models", {})
+    monkeypatch.setattr(CorrectionModel, "correction_pronoun_or_possessive", staticmethod(lambda word: False))
+
+    def install(language, counts, morphology=None):
+        word_freq = Counter(counts)
+        for table, value in ((CorrectionModel.word_freqs, word_freq),
+                             (CorrectionModel.dictionaries, {word for word, freq in word_freq.items() if freq > 1})):
+            replaced.append((table, language, dict.get(table, language)))
+            dict.__setitem__(table, language, value)  # Bypasses the lazy build of CorpusTable
+        MorphologyModel.morphology_models[language] = morphology
+        return LexiconModel(language)
+
+    yield install
+
+    for table, language, previous in reversed(replaced):
+        if previous is None:
+            dict.pop(table, language, None)
+        else:
+            dict.__setitem__(table, language, previous)
+
+@pytest.fixture
+def spanish_morphology():
+    """
+    Spanish morphology derived from a small synthetic tagged word list.
+    """
+    morphology = MorphologyModel.__new__(MorphologyModel)
+    morphology.language = "es"
+    morphology.alphabet = MorphologyModel.alphabets["es"]
+    morphology.analyzer = None
+    morphology.morphology_build(((stem + suffix, pos) for pos, stems in SPANISH_STEMS.items()
+                                 for stem in stems for suffix in SPANISH_SUFFIXES[pos]), min_stems=2)
+    return morphology
+
+@pytest.fixture
+def russian_morphology():
+    """
+    Russian morphology with a stand-in analyzer.
+    """
+    morphology = MorphologyModel.__new__(MorphologyModel)
+    morphology.language = "ru"
+    morphology.alphabet = MorphologyModel.alphabets["ru"]
+    morphology.analyzer = RussianAnalyzer()
+    morphology.stems, morphology.paradigms, morphology.max_suffix = {}, [], 0
+    return morphology
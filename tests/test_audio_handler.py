@@ -0,0 +1,36 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import numpy as np
+
+from System.handlers.audio_handler import AudioHandler
+
+SAMPLE_RATE = 16000
+
+def speech(seconds, pauses):
+    audio = np.random.default_rng(0).uniform(-1, 1, int(seconds * SAMPLE_RATE)).astype(np.float32)
+    for pause in pauses:
+        audio[int(pause * SAMPLE_RATE):int((pause + 0.3) * SAMPLE_RATE)] = 0
+    return audio
+
+def test_short_audio_is_one_chunk():
+    assert AudioHandler.audio_chunks(speech(12, [])) == [(0, 12 * SAMPLE_RATE, 12 * SAMPLE_RATE)]
+
+def test_chunks_are_cut_in_pauses_and_overlap():
+    pauses = list(range(3, 95, 4))  # Every 5 s search window holds a pause
+    audio = speech(95, pauses)
+    chunks = AudioHandler.audio_chunks(audio)
+
+    assert chunks[0][0] == 0 and chunks[-1][1:] == (len(audio), len(audio))
+    for (start, end, cut), (next_start, _, _) in zip(chunks, chunks[1:]):
+        assert end - start <= 30 * SAMPLE_RATE
+        assert end - cut == cut - next_start == SAMPLE_RATE  # 2 s of overlap centered on the cut
+        assert any(pause * SAMPLE_RATE <= cut < (pause + 0.3) * SAMPLE_RATE for pause in pauses)
+    assert chunks[-1][1] - chunks[-1][0] <= 30 * SAMPLE_RATE
+
+def test_chunks_of_audio_without_pauses_stay_bounded():
+    audio = speech(200, [])
+    chunks = AudioHandler.audio_chunks(audio)
+    assert all(end - start <= 30 * SAMPLE_RATE for start, end, _ in chunks)
+    assert all(next_start < end for (_, end, _), (next_start, _, _) in zip(chunks, chunks[1:]))
@@ -0,0 +1,28 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import random
+
+from System.models.automaton_model import AutomatonModel
+
+def brute_force(patterns, text):
+    return sorted((start, pattern) for pattern in set(patterns) if pattern
+                  for start in range(len(text) - len(pattern) + 1) if text.startswith(pattern, start))
+
+def test_search_finds_overlapping_occurrences():
+    automaton = AutomatonModel(["he", "she", "his", "hers", ""])
+    assert automaton.automaton_search("ushers") == [(1, "she"), (2, "he"), (2, "hers")]
+    assert automaton.patterns == ("he", "hers", "his", "she")
+
+def test_search_matches_brute_force():
+    rng = random.Random(4)
+    for _ in range(100):
+        patterns = [''.join(rng.choices("abc", k=rng.randint(1, 4))) for _ in range(rng.randint(1, 12))]
+        text = ''.join(rng.choices("abcd", k=rng.randint(0, 30)))
+        assert AutomatonModel(patterns).automaton_search(text) == brute_force(patterns, text)
+
+def test_empty_automaton():
+    automaton = AutomatonModel([""])
+    assert not automaton
+    assert automaton.automaton_search("text") == []
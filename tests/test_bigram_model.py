@@ -0,0 +1,60 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+from System.models.bigram_model import BigramModel
+from System.models.correction_model import CorrectionModel
+
+SENTENCES = [["the", "cat", "sat", "on", "the", "mat"]] * 5 + [["we", "cut", "the", "rope"]] + [["a", "cut"]] * 3
+
+@pytest.fixture
+def bigram(monkeypatch):
+    monkeypatch.setattr(BigramModel, "bigram_sentences", staticmethod(lambda language: SENTENCES))
+    return BigramModel.bigram_build("en")
+
+def sentence_score(bigram, words, channels):
+    score, previous = 0.0, bigram.bigram_id(BigramModel.start)
+    for word, channel in zip(words, channels):
+        score += channel + float(bigram.bigram_scores([previous], [bigram.bigram_id(word)])[0])
+        previous = bigram.bigram_id(word)
+    return score
+
+def test_probabilities_of_a_context_sum_to_one(bigram):
+    for previous in ("the", "cut", BigramModel.start):
+        ids = np.arange(bigram.size)
+        scores = bigram.bigram_scores(np.full(bigram.size, bigram.bigram_id(previous)), ids)
+        assert np.exp(scores).sum() == pytest.approx(1.0)
+
+def test_unknown_words_fall_back(bigram):
+    unknown, cat = bigram.bigram_scores([bigram.bigram_id("the"), -1], [-1, bigram.bigram_id("cat")])
+    assert unknown == pytest.approx(bigram.unknown_log)
+    assert cat == pytest.approx(bigram.unigram_log[bigram.bigram_id("cat")])
+
+def test_dump_and_load(bigram, tmp_path):
+    file_path = str(tmp_path / "Models" / "bigram_en.npz")
+    bigram.bigram_dump(file_path)
+    loaded = BigramModel.bigram_load(file_path)
+    assert loaded.vocabulary == bigram.vocabulary
+    assert np.array_equal(loaded.keys, bigram.keys) and np.array_equal(loaded.counts, bigram.counts)
+    assert os.listdir(tmp_path / "Models") == ["bigram_en.npz"]
+
+def test_beam_uses_the_previous_word(bigram):
+    lattices = [[("the", 0.0)], [("cut", 0.0), ("cat", -0.5)], [(",", 0.0)], [("sat", 0.0), ("set", -0.1)]]
+    assert CorrectionModel.correction_beam(lattices, bigram, beam_width=4) == ["the", "cat", ",", "sat"]
+
+    lattices = [[("a", 0.0)], [("cut", -0.5), ("cat", 0.0)]]
+    assert CorrectionModel.correction_beam(lattices, bigram, beam_width=4) == ["a", "cut"]
+
+def test_wide_beam_finds_the_best_sentence(bigram):
+    lattices = [[("the", 0.0), ("a", -0.2)], [("cat", -0.3), ("cut", 0.0), ("cot", -0.1)],
+                [("sat", 0.0), ("set", -0.05)], [("on", 0.0), ("in", -0.1)], [("the", 0.0), ("a", -0.1)],
+                [("mat", -0.2), ("map", 0.0)]]
+    best = max(itertools.product(*lattices),
+               key=lambda path: sentence_score(bigram, [w for w, _ in path], [c for _, c in path]))
+    assert CorrectionModel.correction_beam(lattices, bigram, beam_width=100) == [w for w, _ in best]
@@ -0,0 +1,59 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import random
+from collections import defaultdict
+
+from nltk.metrics.distance import edit_distance
+
+from System.handlers.errors_handler import ErrorsHandler
+
+def scripts(incorrect_words, correct_words, **kwargs):
+    pair_ops, positions, correct_ops, incorrect_ops = ErrorsHandler.errors_align(incorrect_words, correct_words,
+                                                                                 **kwargs)
+    operations = defaultdict(list)
+    for pair, position, c_code, i_code in zip(pair_ops.tolist(), positions.tolist(), correct_ops.tolist(),
+                                              incorrect_ops.tolist()):
+        operations[pair].append((position, c_code, i_code))
+    for pair in sorted(operations):
+        ops = sorted(operations[pair], reverse=True)  # Reading order
+        yield ([chr(i) for _, _, i in ops if i >= 0], [chr(c) for _, c, _ in ops if c >= 0],
+               sum(c != i for _, c, i in ops))
+
+def test_align_edit_scripts_are_optimal():
+    rng = random.Random(2)
+    incorrect_words, correct_words = [], []
+    for _ in range(300):
+        incorrect_words.append(''.join(rng.choices("abcñя", k=rng.randint(0, 12))))
+        correct_words.append(''.join(rng.choices("abcñя", k=rng.randint(0, 12))))
+    pairs = {(i, c) for i, c in zip(incorrect_words, correct_words) if i != c}
+
+    # Small batches, so pairs of several batches are numbered apart
+    aligned = list(scripts(incorrect_words, correct_words, max_cells=500, max_batch=16))
+    assert len(aligned) == len([1 for i, c in zip(incorrect_words, correct_words) if i != c])
+    for incorrect, correct, edits in aligned:
+        pair = (''.join(incorrect), ''.join(correct))
+        assert pair in pairs
+        assert edits == edit_distance(*pair)
+
+def test_align_skips_equal_and_non_string_pairs():
+    pair_ops, _, _, _ = ErrorsHandler.errors_align(["same", None, 3], ["same", "word", "word"])
+    assert len(pair_ops) == 0
+
+def test_analyze_counts_aligned_confusions():
+    errors = ErrorsHandler.errors_analyze(["fone", "foto", "hous"], ["phone", "photo", "house"])
+    assert errors["ph"]["f"] == 2
+    assert errors["e"][""] == 1
+    assert errors["se"]["s"] == 1
+    # A missing letter does not shift the comparison of the rest of the word
+    assert "o" not in errors and "n" not in errors
+
+def test_rules_generate():
+    errors = ErrorsHandler.errors_merge({}, ErrorsHandler.errors_analyze(["fone", "foto", "kat"],
+                                                                         ["phone", "photo", "cat"]))
+    rules = ErrorsHandler.errors_rules_generate(errors, threshold=0.5, min_count=2)
+    assert rules == {"f": "ph", "k": "c"}
+
+    # Without enough occurrences of "ph", only the single-letter confusion is left
+    assert ErrorsHandler.errors_rules_generate(errors, threshold=0.5, min_count=3) == {"f": "h", "k": "c"}
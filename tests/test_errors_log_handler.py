@@ -0,0 +1,100 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import csv
+import os
+import time
+
+import pytest
+
+from System.handlers.errors_log_handler import ErrorsLogHandler
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = str(tmp_path / "errors_en.bin")
+    ErrorsLogHandler.errors_log_init(path)
+    return path
+
+def read_all(path, **kwargs):
+    incorrect, correct = [], []
+    for chunk_incorrect, chunk_correct in ErrorsLogHandler.errors_log_read(path, **kwargs):
+        incorrect += chunk_incorrect
+        correct += chunk_correct
+    return incorrect, correct
+
+def test_append_and_read(log_path):
+    writer = ErrorsLogHandler(log_path)
+    assert writer.errors_log_append([("helo", "hello"), ("wrld", "world"), ("año", "ano")]) == 3
+    writer.errors_log_close()
+    assert read_all(log_path) == (["helo", "wrld", "año"], ["hello", "world", "ano"])
+    # Records split across chunk borders are completed by the next chunk
+    assert read_all(log_path, chunk_bytes=3) == (["helo", "wrld", "año"], ["hello", "world", "ano"])
+
+def test_encode_truncates_at_character_boundary():
+    encoded = ErrorsLogHandler.errors_log_encode("я" * 40000)
+    assert len(encoded) == 65534
+    assert encoded.decode("utf-8") == "я" * 32767
+
+def test_scan_resumes_from_offset(log_path):
+    writer = ErrorsLogHandler(log_path)
+    writer.errors_log_append([("a", "b")])
+    writer.errors_log_close()
+    end = [end for _, _, end in ErrorsLogHandler.errors_log_scan(log_path)][-1]
+    assert end == os.path.getsize(log_path)
+
+    writer = ErrorsLogHandler(log_path)
+    writer.errors_log_append([("cc", "dd"), ("ee", "ff")])
+    writer.errors_log_close()
+    scanned = list(ErrorsLogHandler.errors_log_scan(log_path, start=end, chunk_bytes=8))
+    assert sum((incorrect for incorrect, _, _ in scanned), []) == ["cc", "ee"]
+    assert scanned[-1][2] == os.path.getsize(log_path)
+
+def test_incomplete_record_is_ignored(log_path):
+    writer = ErrorsLogHandler(log_path)
+    writer.errors_log_append([("helo", "hello")])
+    writer.errors_log_close()
+    with open(log_path, "ab") as f:
+        f.write(ErrorsLogHandler.record.pack(4, 5) + b"wr")
+    assert read_all(log_path) == (["helo"], ["hello"])
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / "errors_en.bin"
+    path.write_bytes(b"Incorrect,Correct\n")
+    with pytest.raises(ValueError):
+        read_all(str(path))
+
+def test_timer_syncs_idle_records(log_path):
+    writer = ErrorsLogHandler(log_path, sync_records=100, sync_seconds=0.05)
+    writer.last_sync = time.monotonic()
+    writer.errors_log_append([("helo", "hello")])
+    assert writer.pending == 1
+    deadline = time.monotonic() + 5
+    while writer.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        assert writer.pending == 0
+        assert writer.timer is None
+        assert read_all(log_path) == (["helo"], ["hello"])
+    finally:
+        writer.errors_log_close()
+
+def test_close_syncs_and_stops_timer(log_path):
+    writer = ErrorsLogHandler(log_path, sync_records=100, sync_seconds=60)
+    writer.errors_log_append([("helo", "hello")])
+    timer = writer.timer
+    writer.errors_log_close()
+    assert writer.pending == 0
+    assert timer.finished.is_set()
+    assert read_all(log_path) == (["helo"], ["hello"])
+
+def test_migrate_csv(tmp_path, log_path):
+    csv_path = str(tmp_path / "errors_en.csv")
+    with open(csv_path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Incorrect", "Correct"])
+        writer.writerow(["helo", "hello"])
+        writer.writerow(["wrld", "world"])
+    assert ErrorsLogHandler.errors_log_migrate(csv_path, log_path) == 2
+    assert read_all(log_path) == (["helo", "wrld"], ["hello", "world"])
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith(".tmp")]
@@ -0,0 +1,60 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import os
+import random
+
+import numpy as np
+import pytest
+from nltk.metrics.distance import edit_distance
+
+from System.models.index_model import IndexModel
+
+@pytest.fixture(scope="module")
+def words():
+    rng = random.Random(7)
+    return sorted({''.join(rng.choices("abcdefgh", k=rng.randint(3, 11))) for _ in range(3000)})
+
+def edited(word, rng, edits):
+    letters = list(word)
+    for _ in range(edits):
+        position = rng.randrange(len(letters) + 1)
+        operation = rng.choice(("insert", "replace", "delete")) if position < len(letters) else "insert"
+        if operation == "insert":
+            letters.insert(position, rng.choice("abcdefgh"))
+        elif operation == "replace":
+            letters[position] = rng.choice("abcdefgh")
+        else:
+            del letters[position]
+    return ''.join(letters)
+
+def test_similar_finds_every_word_within_the_distance(words, monkeypatch):
+    monkeypatch.setattr(IndexModel, "chunk_words", 500)  # Several build chunks
+    index = IndexModel(words, range(len(words)))
+    rng = random.Random(3)
+    for word in rng.sample(words, 25):
+        query = edited(word, rng, 2)
+        expected = {w for w in words if edit_distance(query, w) <= 2}
+        assert {w for w, _, _ in index.index_similar(query, 2)} == expected
+
+def test_scan_beyond_the_indexed_distance(words):
+    index = IndexModel(words[:300], [1] * 300)
+    expected = {w for w in words[:300] if edit_distance("abcabc", w) <= 3}
+    assert {w for w, _, _ in index.index_similar("abcabc", 3)} == expected
+
+def test_hash_is_stable():
+    assert IndexModel.index_hash("casa") == IndexModel.index_hash("casa")
+    assert IndexModel.index_hash("casa") == -673376753008730280  # Same value in every process and run
+
+def test_saved_index_is_memory_mapped(words, tmp_path):
+    path = str(tmp_path / "wordlist_en")
+    built = IndexModel(words, range(len(words)), path)
+    loaded = IndexModel(words, range(len(words)), path)
+    assert isinstance(loaded.hashes, np.memmap)
+    assert np.array_equal(built.hashes, loaded.hashes) and np.array_equal(built.ids, loaded.ids)
+    assert loaded.index_similar("abcd") == built.index_similar("abcd")
+
+    changed = IndexModel(words[1:], range(len(words) - 1), path)  # A new word list replaces the saved files
+    assert not isinstance(changed.hashes, np.memmap)
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(p) for p in changed.index_paths(path))
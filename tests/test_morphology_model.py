@@ -0,0 +1,37 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import pytest
+
+from System.models.correction_model import CorrectionModel
+
+@pytest.fixture
+def spanish(corpus, spanish_morphology):
+    return corpus("es", {"casa": 50, "casas": 20, "perro": 40, "perros": 10, "gato": 30}, spanish_morphology)
+
+@pytest.fixture
+def russian(corpus, russian_morphology):
+    return corpus("ru", {"дом": 30, "дома": 12}, russian_morphology)
+
+@pytest.mark.parametrize("word", ["casita", "perrito", "casas", "gatas", "plazas"])
+def test_valid_spanish_inflection_is_kept(spanish, word):
+    assert spanish.lexicon_valid(word)
+    assert CorrectionModel.correction_sentence(word, {}, spanish, spanish) == word
+
+@pytest.mark.parametrize("word", ["домами", "дому", "дома"])
+def test_valid_russian_inflection_is_kept(russian, word):
+    assert CorrectionModel.correction_sentence(word, {"а": "о"}, russian, russian) == word
+
+def test_more_frequent_rule_correction_replaces_valid_word(spanish):
+    assert spanish.lexicon_valid("caza")
+    assert CorrectionModel.correction_sentence("caza", {"z": "s"}, spanish, spanish) == "casa"
+
+def test_invalid_word_is_corrected_to_a_form(spanish):
+    assert not spanish.lexicon_valid("casws")
+    assert CorrectionModel.correction_sentence("casws", {}, spanish, spanish) in {"casas", "casa"}
+
+def test_unlisted_forms_are_not_listed(spanish):
+    assert spanish.lexicon_valid("casita")
+    assert not spanish.lexicon_listed("casita")
+    assert spanish.lexicon_listed("casa")
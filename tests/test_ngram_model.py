@@ -0,0 +1,42 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import json
+
+from System.models.correction_model import CorrectionModel
+from System.models.lexicon_model import LexiconModel
+from System.models.ngram_model import NgramModel
+
+def test_allowed_checks_only_the_edited_region():
+    ngrams = NgramModel(["cat", "dog"])
+    assert ngrams.ngram_allowed("cot", 1, 2) is False  # "co" and "cot" never occur
+    assert ngrams.ngram_allowed("dat", 0, 1) is False
+    assert ngrams.ngram_allowed("cat", 1, 2) is True
+    assert ngrams.ngram_allowed("ct", 1, 1) is False  # Deletion junction "ct"
+
+def test_layered_model_checks_both_layers_and_leaves_the_base_alone():
+    base = NgramModel(["cat", "dog"])
+    bigrams, trigrams = set(base.bigrams), set(base.trigrams)
+    overlay = NgramModel(["zed"], base=base)
+
+    assert overlay.alphabet.startswith(base.alphabet) and "z" in overlay.alphabet
+    assert overlay.ngram_allowed("cat", 0, 3) and overlay.ngram_allowed("zed", 0, 3)
+    assert not overlay.ngram_allowed("zat", 0, 2)
+    overlay.ngram_add("quiz")
+    assert overlay.ngram_allowed("quiz", 0, 4) and not base.ngram_allowed("quiz", 0, 4)
+    assert base.bigrams == bigrams and base.trigrams == trigrams
+
+def test_overlay_lexicons_share_the_tables_of_the_language(corpus, tmp_path):
+    corpus("en", {"cat": 5, "dog": 5, "cats": 3})
+    overlay_path = tmp_path / "lexicon.json"
+    overlay_path.write_text(json.dumps({"words": {"zed": 2}}), encoding='utf-8')
+
+    shared = LexiconModel.lexicon_ngrams("en")
+    plain, personal = LexiconModel("en"), LexiconModel("en", str(overlay_path))
+    assert plain.ngrams is shared
+    assert personal.ngrams.base is shared and personal.ngrams.bigrams == {"^z", "ze", "ed", "d$"}
+
+    plain.lexicon_add("qat")
+    assert plain.ngrams.base is shared and not shared.ngram_allowed("qat", 0, 1)
+    assert "qat" in CorrectionModel.correction_insert_missing_letter("qt", plain)
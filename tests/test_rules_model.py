@@ -0,0 +1,87 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import json
+import os
+import pickle
+import threading
+
+import pytest
+
+from System.models.rules_model import RulesModel
+
+class Payload:
+    """
+    Pickles into a call of os.system, like a crafted rules file would.
+    """
+    def __reduce__(self):
+        return os.system, ("echo pwned",)
+
+def test_dump_and_load_round_trip(tmp_path):
+    model = RulesModel.rules_compile({"a": "o", "th": "t"})
+    file_path = str(tmp_path / "rules.json")
+    model.rules_dump(file_path)
+
+    loaded = RulesModel.rules_load(file_path)
+    assert dict(loaded) == {"a": "o", "th": "t"}
+    assert loaded.fingerprint == model.fingerprint
+    assert loaded.replacements == model.replacements
+    assert os.listdir(tmp_path) == ["rules.json"]
+
+def test_threads_dump_concurrently(tmp_path):
+    file_path = str(tmp_path / "rules.json")
+    models = [RulesModel.rules_compile({"a": "o" * (i + 1)}) for i in range(8)]
+    errors = []
+
+    def dump(model):
+        try:
+            for _ in range(20):
+                model.rules_dump(file_path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=dump, args=(model,)) for model in models]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert RulesModel.rules_load(file_path).fingerprint in {model.fingerprint for model in models}
+    assert os.listdir(tmp_path) == ["rules.json"]
+
+def test_load_rejects_a_tampered_file(tmp_path):
+    file_path = str(tmp_path / "rules.json")
+    RulesModel.rules_compile({"a": "o"}).rules_dump(file_path)
+    with open(file_path, encoding='utf-8') as f:
+        data = json.load(f)
+    data["rules"]["a"] = "e"
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    with pytest.raises(ValueError, match="fingerprint"):
+        RulesModel.rules_load(file_path)
+
+def test_automaton_finds_every_rewrite_site():
+    model = RulesModel.rules_compile({"a": "o", "th": "t", "h": ""})
+    assert sorted(RulesModel.rules_automaton(model).automaton_search("thatha")) == \
+        [(0, "th"), (1, "h"), (2, "a"), (3, "th"), (4, "h"), (5, "a")]
+
+def test_convert_plain_pickle(tmp_path):
+    pickle_path, file_path = str(tmp_path / "rules.pkl"), str(tmp_path / "rules.json")
+    with open(pickle_path, 'wb') as f:
+        pickle.dump({"a": "o"}, f)
+
+    assert dict(RulesModel.rules_convert(pickle_path, file_path)) == {"a": "o"}
+    assert dict(RulesModel.rules_load(file_path)) == {"a": "o"}
+
+@pytest.mark.parametrize("payload", [Payload(), {"a": Payload()}, ["a", "o"], {"a": 1}])
+def test_convert_refuses_anything_but_a_dictionary_of_strings(tmp_path, payload):
+    pickle_path, file_path = str(tmp_path / "rules.pkl"), str(tmp_path / "rules.json")
+    with open(pickle_path, 'wb') as f:
+        pickle.dump(payload, f)
+
+    with pytest.raises(ValueError):
+        RulesModel.rules_convert(pickle_path, file_path)
+    assert not os.path.exists(file_path)
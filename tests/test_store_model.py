@@ -0,0 +1,63 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import sqlite3
+import threading
+
+import pytest
+
+from System.models.correction_model import CorrectionModel
+from System.models.store_model import StoreModel
+
+@pytest.fixture
+def store(tmp_path):
+    return StoreModel(str(tmp_path / "Cache" / "corrections.sqlite"))
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(CorrectionModel, "correction_cache", {})
+    return CorrectionModel.correction_cache
+
+def test_save_and_load(store):
+    key = StoreModel.store_key("rules", "", "base", 10, "word")
+    store.store_save("en", key, {"helo": "hello", "wrld": ["world", 1.0]})
+    assert store.store_load("en", key, ["helo", "wrld", "nope"]) == {"helo": "hello", "wrld": ["world", 1.0]}
+    assert store.store_load("es", key, ["helo"]) == {}
+    assert StoreModel.store_key("rules", "", "base", 11, "word") != key
+
+def test_threads_write_concurrently(store):
+    key = StoreModel.store_key("threads")
+
+    def write(thread):
+        for batch in range(20):
+            store.store_save("en", key, {f"w{thread}_{batch}_{i}": "x" for i in range(10)})
+
+    threads = [threading.Thread(target=write, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sqlite3.connect(store.file_path).execute("SELECT COUNT(*) FROM corrections").fetchone()[0] == 800
+
+def test_evict_keeps_the_newest_entries(tmp_path):
+    store = StoreModel(str(tmp_path / "corrections.sqlite"), max_entries=5)
+    key = StoreModel.store_key("evict")
+    for i in range(8):
+        store.store_save("en", key, {f"w{i}": "x"})
+    store.store_evict()
+    assert sorted(store.store_load("en", key, [f"w{i}" for i in range(8)])) == ["w3", "w4", "w5", "w6", "w7"]
+
+def test_cache_keeps_lexicon_layers_apart(corpus, cache, store, spanish_morphology):
+    lexicon = corpus("es", {"casa": 50, "casas": 20, "gato": 30}, spanish_morphology)
+    assert lexicon.fingerprint == ""  # Same overlay fingerprint as no lexicon at all
+
+    assert CorrectionModel.correction_cached(["casita"], {}, "", "es", lexicon, store) == {"casita": "casita"}
+    assert CorrectionModel.correction_cached(["casita"], {}, "", "es", None, store) != {"casita": "casita"}
+
+def test_cache_follows_the_dictionary_size(corpus, cache):
+    corpus("en", {"cat": 5, "cart": 3})
+    assert CorrectionModel.correction_cached(["catt"], {}, "", "en")["catt"] == "cat"
+    CorrectionModel.dictionaries["en"].add("catt")  # A word list import grows the shared dictionary
+    CorrectionModel.word_freqs["en"]["catt"] = 9
+    assert CorrectionModel.correction_cached(["catt"], {}, "", "en")["catt"] == "catt"
@@ -0,0 +1,65 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import random
+
+import pytest
+from nltk.metrics.distance import edit_distance
+
+from System.handlers.text_handler import TextHandler
+
+def alignment_cost(alignment, transcribed_words, expected_words):
+    t_pos = e_pos = cost = 0
+    for op, t_start, t_end, e_start, e_end in alignment:
+        assert (t_start, e_start) == (t_pos, e_pos)
+        if op == "equal":
+            assert transcribed_words[t_start:t_end] == expected_words[e_start:e_end]
+        elif op == "substitute":
+            assert t_end - t_start == e_end - e_start
+            assert all(t != e for t, e in zip(transcribed_words[t_start:t_end], expected_words[e_start:e_end]))
+        elif op == "insert":
+            assert e_start == e_end
+        else:
+            assert op == "delete" and t_start == t_end
+        cost += max(t_end - t_start, e_end - e_start) if op != "equal" else 0
+        t_pos, e_pos = t_end, e_end
+    assert (t_pos, e_pos) == (len(transcribed_words), len(expected_words))
+    return cost
+
+def test_align_is_optimal_and_covers_both_texts():
+    rng = random.Random(5)
+    for _ in range(200):
+        transcribed = rng.choices("abcde", k=rng.randint(0, 40))
+        expected = rng.choices("abcde", k=rng.randint(0, 40))
+        alignment = TextHandler.text_align(transcribed, expected)
+        assert alignment_cost(alignment, transcribed, expected) == edit_distance(transcribed, expected)
+
+def test_align_long_texts():
+    rng = random.Random(11)
+    expected = rng.choices(["the", "a", "cat", "sat", "on", "mat", "dog"], k=3000)
+    transcribed = list(expected)
+    for _ in range(60):
+        position = rng.randrange(len(transcribed))
+        operation = rng.choice(("insert", "replace", "delete"))
+        if operation == "insert":
+            transcribed.insert(position, "uh")
+        elif operation == "replace":
+            transcribed[position] = "xx"
+        else:
+            del transcribed[position]
+    alignment = TextHandler.text_align(transcribed, expected)
+    assert alignment_cost(alignment, transcribed, expected) <= 60
+
+def test_compare_does_not_shift_after_a_dropped_word():
+    incorrect, correct = TextHandler.text_compare("the cat sad on mat", "the cat sat on the mat")
+    assert (incorrect, correct) == (["sad"], ["sat"])
+
+def test_score():
+    transcribed, expected = "the cat sad on mat".split(), "the cat sat on the mat".split()
+    score = TextHandler.text_score(TextHandler.text_align(transcribed, expected), transcribed, expected)
+    assert score["wer"] == pytest.approx(2 / 6)
+    assert score["cer"] == pytest.approx(4 / 17)
+    assert score["similarity"] == pytest.approx(8 / 11)
+
+    assert TextHandler.text_score([], [], []) == {"wer": 0.0, "cer": 0.0, "similarity": 1.0}
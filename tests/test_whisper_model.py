@@ -0,0 +1,69 @@
+# © 2025 eXdesy — All rights reserved.
+# This code is for educational use only.
+# Do not reuse, copy, modify, or redistribute.
+
+import sys
+from types import ModuleType, SimpleNamespace
+
+import numpy as np
+import pytest
+
+from System.models.whisper_model import WhisperModel
+
+SAMPLE_RATE = 16000
+STEP = 1e-7  # Every sample holds its own position, so the stand-in model knows where a chunk starts
+
+class ScriptedModel:
+    """
+    Stand-in for a Whisper model that hears the word "w<T>" from second T to T + 0.5 of the recording.
+    """
+    def transcribe(self, audio, language, **options):
+        start = round((audio[0] - 0.1) / STEP)
+        seconds = range(-(-start // SAMPLE_RATE), (start + len(audio)) // SAMPLE_RATE + 1)
+        words = [{"word": f" w{second}", "start": second - start / SAMPLE_RATE,
+                  "end": second + 0.5 - start / SAMPLE_RATE, "probability": 0.9}
+                 for second in seconds if (second + 0.5) * SAMPLE_RATE <= start + len(audio)]
+        return {"text": "", "segments": [{"no_speech_prob": 0.0, "avg_logprob": 0.0, "words": words}]}
+
+@pytest.fixture
+def whisper(monkeypatch):
+    module = ModuleType("whisper")
+    module.audio = SimpleNamespace(SAMPLE_RATE=SAMPLE_RATE, N_SAMPLES=30 * SAMPLE_RATE, CHUNK_LENGTH=30)
+    module.loads = []
+    module.load_audio = lambda path: module.loads.append(path) or recording(10)
+    monkeypatch.setitem(sys.modules, "whisper", module)
+    return module
+
+@pytest.fixture
+def model():
+    model = WhisperModel.__new__(WhisperModel)
+    model.model, model.model_size, model.device = ScriptedModel(), "tiny", "cuda"
+    return model
+
+def recording(seconds):
+    return 0.1 + STEP * np.arange(seconds * SAMPLE_RATE, dtype=np.float64)
+
+def test_load_decodes_a_path_once_and_passes_samples_through(whisper):
+    audio = WhisperModel.whisper_load("utterance.wav")
+    assert whisper.loads == ["utterance.wav"]
+    assert WhisperModel.whisper_load(audio) is audio
+    assert whisper.loads == ["utterance.wav"]
+
+def test_short_recording_is_left_to_a_plain_decode(whisper, model):
+    assert model.whisper_transcribe_long(recording(20), "en") is None
+    assert whisper.loads == []
+
+def test_long_recording_chunks_are_stitched_without_lost_or_doubled_words(whisper, model):
+    text, chunks = model.whisper_transcribe_long(recording(95), "en")
+
+    assert len(chunks) == 4
+    assert text.split() == [f"w{second}" for second in range(95)]
+    words = [word for chunk in chunks for word in chunk["words"]]
+    assert [word["start"] for word in words] == pytest.approx(list(range(95)))
+    assert all(chunk["start"] <= word["start"] and word["end"] <= chunk["end"]
+               for chunk in chunks for word in chunk["words"])
+
+def test_in_process_decoding_does_not_touch_the_worker_global(whisper, model, monkeypatch):
+    monkeypatch.setattr(WhisperModel, "worker", None)
+    model.whisper_transcribe_long(recording(40), "en")
+    assert WhisperModel.worker is None